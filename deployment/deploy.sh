@@ -22,6 +22,8 @@ function deploy() {
     git reset --hard HEAD~1
     git pull --no-edit
     $python_bin setup.py install
+    echo "migrating database..."
+    os3-rocket-league-ladder migrate
 }
 
 function start() {
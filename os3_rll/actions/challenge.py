@@ -2,19 +2,24 @@ from logging import getLogger
 from datetime import datetime, timedelta
 from copy import deepcopy
 
+from os3_rll.models.async_db import run_in_database_executor
+from os3_rll.models.db import UnitOfWork
 from os3_rll.models.player import Player
+from os3_rll.models.records import PlayerRecord
 from os3_rll.models.challenge import Challenge, ChallengeException
+from os3_rll.models.replicas import read_only
+from os3_rll.models.retry import retry_on_conflict
 from os3_rll.operations.challenge import (
     do_challenge_sanity_check,
     process_completed_challenge_args,
-    get_latest_challenge_from_player_id,
-    get_player_objects_from_challenge_info,
+    get_latest_challenge_record_from_player_id,
 )
 from os3_rll.operations.utils import check_date_is_older_than_x_days
 
 logger = getLogger(__name__)
 
 
+@retry_on_conflict
 def create_challenge(p1, p2, search_by_discord_name=True):
     """
     Create a challenge between p1 and p2. Where p1 is the one challenging and p2 is the one defending
@@ -24,39 +29,41 @@ def create_challenge(p1, p2, search_by_discord_name=True):
     param bool search_by_discord_name: Searches for player by full discord_name instead of gamertag
     raises ChallengeException/PlayerException on error
     """
-    logger.debug("Getting info for challenge creation between {} and {}".format(p1, p2))
-    # First check if gamertags were passed and convert them to player IDs
-    if isinstance(p1, str):
-        p1 = Player.get_player_id_by_username(p1, discord_name=search_by_discord_name)
-    if isinstance(p2, str):
-        p2 = Player.get_player_id_by_username(p2, discord_name=search_by_discord_name)
-
-    # Get the player objects
-    p1 = Player(p1)
-    p2 = Player(p2)
-
-    # Checks
-    logger.debug("Preforming sanity checks for challenge between player {} and {}".format(p1.gamertag, p2.gamertag))
-    do_challenge_sanity_check(p1, p2)
-
-    # Create the challenge
-    logger.info("Trying to create challenge between {} and {}".format(p1.gamertag, p2.gamertag))
-    with Challenge() as c:
-        c.p1 = p1.id
-        c.p2 = p2.id
-        c.date = datetime.now()
-        c.save()
+    with UnitOfWork():
+        logger.debug("Getting info for challenge creation between {} and {}".format(p1, p2))
+        # First check if gamertags were passed and convert them to player IDs
+        if isinstance(p1, str):
+            p1 = Player.get_player_id_by_username(p1, discord_name=search_by_discord_name)
+        if isinstance(p2, str):
+            p2 = Player.get_player_id_by_username(p2, discord_name=search_by_discord_name)
+
+        # Get the player objects
+        p1 = Player(p1)
+        p2 = Player(p2)
+
+        # Checks
+        logger.debug("Preforming sanity checks for challenge between player {} and {}".format(p1.gamertag, p2.gamertag))
+        do_challenge_sanity_check(p1, p2)
+
+        # Create the challenge
+        logger.info("Trying to create challenge between {} and {}".format(p1.gamertag, p2.gamertag))
+        with Challenge() as c:
+            c.p1 = p1.id
+            c.p2 = p2.id
+            c.date = datetime.now()
+            c.save()
 
-    # Set players challenged state
-    logger.debug("Setting the challenged state of players {} and {} to True".format(p1.gamertag, p2.gamertag))
-    p1.challenged = True
-    p2.challenged = True
-    p1.save()
-    p2.save()
+        # Set players challenged state
+        logger.debug("Setting the challenged state of players {} and {} to True".format(p1.gamertag, p2.gamertag))
+        p1.challenged = True
+        p2.challenged = True
+        p1.save()
+        p2.save()
 
-    logger.info("Challenge between player {} and {} successfully created".format(p1.gamertag, p2.gamertag))
+        logger.info("Challenge between player {} and {} successfully created".format(p1.gamertag, p2.gamertag))
 
 
+@retry_on_conflict
 def complete_challenge(player1, player2, match_results, search_by_discord_name=True, may_be_expired=False):
     """
     Complete a challenge between two players
@@ -79,7 +86,7 @@ def complete_challenge(player1, player2, match_results, search_by_discord_name=T
     logger.debug("Parsing challenge scores")
     p1_wins, p2_wins, p1_score, p2_score = process_completed_challenge_args(match_results)
 
-    with Player(player1) as p1, Player(player2) as p2:
+    with UnitOfWork(), Player(player1) as p1, Player(player2) as p2:
         c = Challenge.get_latest_challenge_from_player(p1.id, p2.id)
         # Check the challenge first any weirdness
         do_challenge_sanity_check(p1, p2, may_already_by_challenged=True, may_be_expired=may_be_expired)
@@ -96,8 +103,9 @@ def complete_challenge(player1, player2, match_results, search_by_discord_name=T
             c.save()
         if winner == p1.id:
             logger.info("Challenger has won the challenge updating ranks...")
-            p1.db.execute("UPDATE `users` SET `rank` = `rank` + 1 WHERE `rank` >= {} AND `rank` < {}".format(p2.rank, p1.rank))
-            # Lastly give player 1 his new rank and reload player 2
+            # Shift everybody between the two players down one rank, the players themselves are updated through their models
+            p1.db.execute_statement("player.shift_ranks_down", (p2.rank, p1.rank))
+            # Lastly give player 1 his new rank and move player 2 down
             p1.rank = p2.rank
             p2.rank = p2.rank + 1
             # Update the player stats
@@ -123,6 +131,17 @@ def complete_challenge(player1, player2, match_results, search_by_discord_name=T
     return winner
 
 
+async def complete_challenge_async(player1, player2, match_results, search_by_discord_name=True, may_be_expired=False):
+    """
+    Asyncio variant of complete_challenge, does not block the event loop
+    Takes the same parameters and returns the ID of the winner
+    """
+    return await run_in_database_executor(
+        complete_challenge, player1, player2, match_results, search_by_discord_name=search_by_discord_name, may_be_expired=may_be_expired
+    )
+
+
+@retry_on_conflict
 def reset_challenge(player1, player2, search_by_discord_name=True):
     """
     Resets the last challenge between two players
@@ -140,7 +159,7 @@ def reset_challenge(player1, player2, search_by_discord_name=True):
         player2 = Player.get_player_id_by_username(player2, discord_name=search_by_discord_name)
 
     logger.debug("Getting Player and Challenge objects to be reset")
-    with Player(player1) as p1, Player(player2) as p2:
+    with UnitOfWork(), Player(player1) as p1, Player(player2) as p2:
         # Players can also reset a challenge if they are not challenged atm. To ensure consistency
         if p1.challenged or p2.challenged:
             raise ChallengeException("One of the players is currently in an active challenge, previous challenge cannot be reset")
@@ -197,26 +216,19 @@ def get_challenge(player, should_be_completed=False, search_by_discord_name=True
     """
     logger.debug("Getting challenge info for player with id {}".format(player))
     try:
-        # First check if gamertags were passed and convert them to player IDs
-        if isinstance(player, str):
-            player = Player.get_player_id_by_username(player, discord_name=search_by_discord_name)
-        # Try to find the challenge
-        challenge = get_latest_challenge_from_player_id(player, should_be_completed=should_be_completed)
-        # Try to get the players
-        p1, p2 = get_player_objects_from_challenge_info(player, should_be_completed=should_be_completed)
+        # Only reads, so the lookups can be served by a replica and read-only records are enough
+        with read_only():
+            # First check if gamertags were passed and convert them to player IDs
+            if isinstance(player, str):
+                player = Player.get_player_id_by_username(player, discord_name=search_by_discord_name)
+            # Try to find the challenge
+            challenge = get_latest_challenge_record_from_player_id(player, should_be_completed=should_be_completed)
+            # Get the players of the challenge
+            p1, p2 = PlayerRecord.load_many((challenge.p1, challenge.p2))
     except Exception as e:
         # Raise our own exception
         logger.error("Encountered exception while trying to retrieve challenge info")
         raise ChallengeException(e)
-    finally:
-        # Cleanup
-        try:
-            challenge.db.close()
-            p1.db.close()
-            p2.db.close()
-        except UnboundLocalError:
-            # Variable didn't exist
-            pass
     # Get the deadline
     deadline = challenge.date + timedelta(weeks=1)
     # Return relevant data
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from logging import getLogger
+
+from os3_rll.conf import settings
+from os3_rll.models.challenge import ChallengeException
+from os3_rll.models.db import UnitOfWork
+from os3_rll.models.retry import retry_on_conflict
+from os3_rll.operations.challenge import move_completed_challenges_to_archive
+
+logger = getLogger(__name__)
+
+# Completed challenges can be reset for a week, those have to stay in the challenges table
+MINIMUM_ARCHIVE_DAYS = 7
+
+
+@retry_on_conflict
+def archive_challenge_batch(before):
+    with UnitOfWork():
+        return move_completed_challenges_to_archive(before, batch_size=settings.CHALLENGE_ARCHIVE_BATCH_SIZE)
+
+
+def archive_completed_challenges(days=None):
+    """
+    Moves the completed challenges older than days to the challenges_archive table, so the challenges table stays small
+    Every batch of challenges is moved in its own transaction, so the ladder isn't locked while a large backlog is archived
+
+    param int days: Archive the challenges created more than this many days ago, defaults to settings.CHALLENGE_ARCHIVE_AFTER_DAYS
+    returns int: The amount of archived challenges
+    raises ChallengeException: When days is shorter than the period completed challenges can be reset in
+    """
+    days = settings.CHALLENGE_ARCHIVE_AFTER_DAYS if days is None else days
+    if days < MINIMUM_ARCHIVE_DAYS:
+        raise ChallengeException(
+            "Challenges can be reset for {} days, not archiving challenges younger than that".format(MINIMUM_ARCHIVE_DAYS)
+        )
+    before = datetime.now() - timedelta(days=days)
+    logger.info("Archiving completed challenges created before {}".format(before))
+    archived = 0
+    while True:
+        moved = archive_challenge_batch(before)
+        if not moved:
+            break
+        archived += moved
+    logger.info("Archived {} completed challenges".format(archived))
+    return archived
@@ -15,16 +15,16 @@ def check_uncompleted_challenges():
     """
     with Database() as db:
         logger.info("Checking for expired challenges")
-        db.execute("SELECT `id`, `date`, `p1`, `p2` FROM `challenges` WHERE `winner` is NULL")
-        challenges = db.fetchall()
+        # Stream the open challenges, so the sweep doesn't have to hold all of them in memory
+        challenges = db.iter_statement("challenge.uncompleted")
         for challenge in challenges:
             logger.info("Challenge {} is passed the deadline, completing it".format(challenge[0]))
             if check_date_is_older_than_x_days(challenge[1], 7):
                 # Challenge expired
                 # Complete the challenge
-                complete_challenge(int(challenge[2]), int(challenge[3]), "1-0", may_be_expired=True)
+                complete_challenge(challenge[2], challenge[3], "1-0", may_be_expired=True)
                 # Announce the expired challenge to discord
-                info = get_challenge(int(challenge[2]), should_be_completed=True)
+                info = get_challenge(challenge[2], should_be_completed=True)
                 message = announce_expired_challenge(info)
                 discord_message_queue.put(message)
                 logger.info("Challenge {} has been completed".format(challenge[0]))
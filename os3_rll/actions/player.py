@@ -1,8 +1,11 @@
 from logging import getLogger
 
-from os3_rll.models.db import Database, DBException
+from os3_rll.models.async_db import AsyncDatabase, run_in_database_executor
+from os3_rll.models.db import Database, DBException, UnitOfWork
 from os3_rll.models.player import Player
-from os3_rll.operations.player import get_all_player_ids_ordered, get_average_goals_per_challenge
+from os3_rll.models.records import PlayerRecord
+from os3_rll.models.replicas import read_only
+from os3_rll.operations.player import get_average_goals_per_challenge_of_all_players
 from os3_rll.utils.password import generate_password
 
 logger = getLogger(__name__)
@@ -14,16 +17,34 @@ def get_player_ranking():
 
     returns dict: {str discord: int rank, ...}
     """
-    players = {}
     logger.info("Getting current player ranking from DB")
-    with Database() as db:
-        db.execute("SELECT `discord`, `rank`, `gamertag` FROM `users` WHERE `rank` > 0 ORDER BY `rank`")
+    with read_only(), Database() as db:
+        db.execute_statement("player.ranking")
         if db.rowcount == 0:
             raise DBException("No players found")
-        rows = db.fetchall()
-        for row in rows:
-            # Fill the dict with discord => rank
-            players[row[0]] = (row[1], row[2])
+        return _rows_to_player_ranking(db.fetchall())
+
+
+async def get_player_ranking_async():
+    """
+    Asyncio variant of get_player_ranking, does not block the event loop
+
+    returns dict: {str discord: int rank, ...}
+    """
+    logger.info("Getting current player ranking from DB")
+    with read_only():
+        async with AsyncDatabase() as db:
+            await db.execute_statement("player.ranking")
+            if db.rowcount == 0:
+                raise DBException("No players found")
+            return _rows_to_player_ranking(await db.fetchall())
+
+
+def _rows_to_player_ranking(rows):
+    players = {}
+    for row in rows:
+        # Fill the dict with discord => rank
+        players[row[0]] = (row[1], row[2])
     return players
 
 
@@ -45,11 +66,16 @@ def get_player_stats():
     """
     players = {}
     logger.info("Retrieving player stats")
-    ids = get_all_player_ids_ordered()
-    for player in ids:
-        # Get the basic info
-        # TODO: We shouldn't mix up name and gamertag here, needs a refactor
-        with Player(player) as p:
+    # Only reads, the stats can be served by a replica and read-only records are enough
+    with read_only():
+        # Get the basic info of all players at once
+        records = PlayerRecord.load_all(order_by="rank")
+        if not records:
+            raise DBException("No users returned")
+        # And the average goals per challenge of all players at once
+        averages = get_average_goals_per_challenge_of_all_players()
+        for p in records:
+            # TODO: We shouldn't mix up name and gamertag here, needs a refactor
             players[p.id] = {
                 "name": p.gamertag,
                 "discord": p.discord,
@@ -57,12 +83,18 @@ def get_player_stats():
                 "wins": p.wins,
                 "losses": p.losses,
                 "is_challenged": p.challenged,
+                "avg_goals_per_challenge": averages.get(p.id, 0.0),
             }
-        # Now get the average goals per challenge
-        players[player]["avg_goals_per_challenge"] = get_average_goals_per_challenge(player)
     return players
 
 
+async def get_player_stats_async():
+    """
+    Asyncio variant of get_player_stats, does not block the event loop
+    """
+    return await run_in_database_executor(get_player_stats)
+
+
 def add_player(name, gamertag, discord):
     """
     Creates a new player in the database.
@@ -75,13 +107,16 @@ def add_player(name, gamertag, discord):
     """
     logger.info("Adding player with properties: {}, {}, {}".format(name, gamertag, discord))
     password = generate_password()
-    p = Player()
-    p.name = name
-    p.gamertag = gamertag
-    p.discord = discord
-    p.password = password
-    p.save()
-    return Player(Player.get_player_id_by_username(gamertag)), password
+    with UnitOfWork():
+        p = Player()
+        p.name = name
+        p.gamertag = gamertag
+        p.discord = discord
+        p.password = password
+        p.save()
+        player_id = Player.get_player_id_by_username(gamertag)
+    # Load the player once the unit of work has ended, its connection goes back to the pool
+    return Player(player_id), password
 
 
 def reset_player_password(player, discord_name=False):
@@ -94,8 +129,9 @@ def reset_player_password(player, discord_name=False):
     return str: new password
     """
     logger.info("Resetting password for {}".format(player))
-    p = Player(Player.get_player_id_by_username(player, discord_name=discord_name))
-    password = generate_password()
-    p.password = password
-    p.save()
+    with UnitOfWork():
+        p = Player(Player.get_player_id_by_username(player, discord_name=discord_name))
+        password = generate_password()
+        p.password = password
+        p.save()
     return password
@@ -0,0 +1,49 @@
+from logging import getLogger
+from time import perf_counter
+
+from os3_rll.conf import settings
+from os3_rll.actions.player import get_player_ranking
+from os3_rll.models.db import DBException, check_database, get_query_cache, warm_up_connection_pool
+from os3_rll.models.player import Player
+
+logger = getLogger(__name__)
+
+_last_warm_up = None
+
+
+def get_warm_up_statistics():
+    """
+    Returns the statistics of the last warm up, or None when the database hasn't been warmed up yet
+    """
+    return _last_warm_up
+
+
+def warm_up():
+    """
+    Prepares the database for the first commands
+    Opens settings.DB_POOL_MIN_SIZE connections, checks the database answers and, when the query cache is enabled,
+    caches the ranking and the player ids of the ranked players
+
+    returns dict: {float duration, int connections, int cached}
+    raises DatabaseUnavailable: When the database can't be reached
+    """
+    global _last_warm_up  # pylint: disable=global-statement
+    start = perf_counter()
+    connections = warm_up_connection_pool(settings.DB_POOL_MIN_SIZE)
+    check_database()
+    cached = 0
+    cache = get_query_cache()
+    if cache.enabled:
+        try:
+            ranking = get_player_ranking()
+        except DBException as e:
+            logger.debug("Not caching the ranking: {}".format(e))
+            ranking = {}
+        for discord in ranking:
+            Player.get_player_id_by_username(discord, discord_name=True)
+        cached = cache.get_statistics()["size"]
+    _last_warm_up = {"duration": perf_counter() - start, "connections": connections, "cached": cached}
+    logger.info(
+        "Warmed up the database in {duration:.3f}s, opened {connections} connections and cached {cached} results".format(**_last_warm_up)
+    )
+    return _last_warm_up
@@ -39,8 +39,8 @@ def announce_winner(p1, p2, winner_id: int, match_results: str):
     """Generates an announcement to be posted by the discord bot as an embed
 
        Params:
-           p1: Player() object.
-           p2: Player() object.
+           p1: Player() object or os3_rll.models.records.PlayerRecord, only the id and gamertag are used.
+           p2: Player() object or os3_rll.models.records.PlayerRecord, only the id and gamertag are used.
 
        return:
            Dictionary with content, title, description, footer and colour as keys.
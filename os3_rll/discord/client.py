@@ -11,7 +11,15 @@ from discord.ext.commands import ExtensionAlreadyLoaded
 from os3_rll.discord.queue import discord_message_queue as message_queue
 from os3_rll.conf import settings
 from os3_rll.discord import utils
+from os3_rll.discord.executor import action_executor, run_action
+from os3_rll.models.async_db import shutdown_database_executor
+from os3_rll.models.db import DatabaseUnavailable, DBException, close_connection_pool
+from os3_rll.models.identity_map import reset_identity_map, set_identity_map
+from os3_rll.models.instrumentation import command_scope, reset_current_command, set_current_command
+from os3_rll.models.replicas import reset_current_user, set_current_user
+from os3_rll.actions.challenge_tasks.archive_completed_challenges import archive_completed_challenges
 from os3_rll.actions.challenge_tasks.check_uncompleted_challenges import check_uncompleted_challenges
+from os3_rll.actions.warm_up import warm_up
 
 
 logger = getLogger(__name__)
@@ -80,6 +88,12 @@ async def listavailable(ctx):
 
 @bot.event
 async def on_ready():
+    # Warm up before the cogs are loaded, so the first commands don't pay for opening the connections
+    with command_scope("warm_up"):
+        try:
+            await run_action(warm_up)
+        except (DatabaseUnavailable, DBException) as e:
+            logger.warning("Unable to warm up the database, starting anyway: {}".format(e))
     for guild in bot.guilds:
         if guild.name == settings.DISCORD_GUILD:
             logger.info("{} is connected to the following guild:".format(bot.user))
@@ -103,6 +117,30 @@ async def on_ready():
             logger.info("completed loading modules")
 
 
+@bot.before_invoke
+async def attribute_queries_to_command(ctx):
+    # Every statement executed while handling this command is attributed to it in the query statistics
+    ctx.query_attribution_token = set_current_command(ctx.command.qualified_name)
+    # Reads following a write by the same user skip the replicas, so users always see their own changes
+    ctx.user_attribution_token = set_current_user(str(ctx.author))
+    # Players and challenges loaded more than once while handling this command are only loaded the first time
+    ctx.identity_map_token = set_identity_map()
+
+
+@bot.after_invoke
+async def stop_attributing_queries_to_command(ctx):
+    token = getattr(ctx, "query_attribution_token", None)
+    if token is not None:
+        reset_current_command(token)
+    token = getattr(ctx, "user_attribution_token", None)
+    if token is not None:
+        reset_current_user(token)
+    token = getattr(ctx, "identity_map_token", None)
+    if token is not None:
+        # Handing the connections back may roll back uncommitted work, keep that off the event loop
+        await run_action(reset_identity_map(token).close)
+
+
 @bot.event
 async def on_command_error(ctx, error):
     logger.error("bot.on_command_error: {} - {}".format(type(error).__name__, error))
@@ -111,6 +149,8 @@ async def on_command_error(ctx, error):
         logger.error("Stack Trace: {}".format(error), exc_info=True)
     if isinstance(error, commands.CommandNotFound):
         await ctx.send(utils.pebkak())
+    elif isinstance(error, commands.CommandInvokeError) and isinstance(error.original, DatabaseUnavailable):
+        await ctx.send("The ladder database is taking a break right now, please try again in a minute.")
     elif isinstance(error, commands.CommandInvokeError):
         error_msg = str(error)
         if "Command raised an exception" in error_msg:
@@ -141,11 +181,29 @@ async def check_expired_challenges():
     logger.debug("Checking for expired challenges")
     await bot.wait_until_ready()
     while not bot.is_closed():
-        check_uncompleted_challenges()
+        with command_scope("check_expired_challenges"):
+            try:
+                await run_action(check_uncompleted_challenges)
+            except DatabaseUnavailable as e:
+                # Try again next round instead of stopping the background task
+                logger.warning("Unable to check for expired challenges: {}".format(e))
         logger.debug("Done with checking for expired challenges, sleeping for {} seconds".format(settings.EXPIRED_CHALLENGES_WAIT_TIMER))
+        logger.debug("Action executor statistics: {}".format(action_executor.get_statistics()))
         await asyncio.sleep(settings.EXPIRED_CHALLENGES_WAIT_TIMER)
 
 
+async def archive_challenges():
+    logger.debug("Archiving completed challenges")
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        with command_scope("archive_challenges"):
+            try:
+                await run_action(archive_completed_challenges)
+            except DatabaseUnavailable as e:
+                logger.warning("Unable to archive completed challenges: {}".format(e))
+        await asyncio.sleep(settings.CHALLENGE_ARCHIVE_WAIT_TIMER)
+
+
 def discord_client():
     logger.info("Initializing Discord client")
 
@@ -162,5 +220,8 @@ def discord_client():
     except RuntimeError:
         logger.info("Caught RunTimeError, this is probably the EventLoop closing, as we are shutting down. That's okay")
     finally:
+        action_executor.shutdown(wait=True)
+        shutdown_database_executor()
+        close_connection_pool()
         logger.info("Shutting down. Bye!")
         sys.exit(0)
@@ -2,12 +2,18 @@ import discord
 import re
 from discord.ext import commands
 from logging import getLogger
+from tabulate import tabulate
 from os3_rll.actions.player import add_player, reset_player_password
+from os3_rll.actions.warm_up import get_warm_up_statistics
 
 # from os3_rll.discord.announcements.challenge import announce_new_season
 from os3_rll.discord.announcements.player import announce_new_player
 from os3_rll.discord.client import is_rll_admin
+from os3_rll.discord.executor import action_executor, run_action
 from os3_rll.discord.utils import get_player, not_implemented
+from os3_rll.models.db import get_circuit_breaker, get_query_cache
+from os3_rll.models.instrumentation import get_top_statements
+from os3_rll.models.retry import get_retry_statistics
 from os3_rll.conf import settings
 
 logger = getLogger(__name__)
@@ -45,7 +51,7 @@ class Admin(commands.Cog):
             raise commands.BadArgument("{} is not a member of this guild.".format(str(player)))
 
         name, gamertag = input_match.group(2, 3)
-        player_info, password = add_player(name, gamertag, str(player))
+        player_info, password = await run_action(add_player, name, gamertag, str(player))
         logger.info("Player successfully created")
         # TODO: Bug below this line
         # TypeError:  'Player' object is not subscriptable
@@ -80,7 +86,7 @@ class Admin(commands.Cog):
         if get_player(str(player)) is None:
             raise commands.BadArgument("{} is not a member of this guild.".format(str(player)))
 
-        password = reset_player_password(str(player), discord_name=True)
+        password = await run_action(reset_player_password, str(player), discord_name=True)
         player_channel = await player.create_dm()
         msg = "Reset password for player for {}".format(str(player))
         player_msg = "{} has reset your password your new password is {} please change this password at {} ASAP.".format(
@@ -89,6 +95,65 @@ class Admin(commands.Cog):
         await player_channel.send(player_msg)
         await ctx.send(msg)
 
+    @commands.command(pass_context=True)
+    @is_rll_admin()
+    async def executor_stats(self, ctx):
+        """Shows how busy the worker threads running the ladder actions are and if the database is reachable."""
+        stats = action_executor.get_statistics()
+        breaker = get_circuit_breaker().get_statistics()
+        warm_up = get_warm_up_statistics()
+        await ctx.send(
+            "Action executor: {active_workers}/{max_workers} workers busy, {queue_depth} calls waiting in the queue\n".format(**stats)
+            + "Database circuit breaker: {state} ({failures} failures in a row, tripped {trips} times)\n".format(**breaker)
+            + (
+                "Database warm up: {duration:.3f}s, opened {connections} connections, cached {cached} results".format(**warm_up)
+                if warm_up
+                else "Database warm up: not done"
+            )
+        )
+
+    @commands.command(pass_context=True)
+    @is_rll_admin()
+    async def query_stats(self, ctx, top: int = 5, order_by: str = "total_time"):
+        """Shows the database statements which took the most time (or count, rows, max_time, average_time)."""
+        logger.debug("query_stats: called by {}".format(ctx.author))
+        try:
+            statements = get_top_statements(n=top, order_by=order_by)
+        except KeyError as e:
+            raise commands.BadArgument(str(e))
+        table = [
+            [s["fingerprint"][:60], s["count"], round(s["total_time"] * 1000, 1), round(s["max_time"] * 1000, 1), s["rows"]]
+            for s in statements
+        ]
+        header = ["Statement", "Count", "Total ms", "Max ms", "Rows"]
+        await ctx.send("```\n{}\n```".format(tabulate(table, headers=header, tablefmt="pretty")))
+
+    @commands.command(pass_context=True)
+    @is_rll_admin()
+    async def retry_stats(self, ctx):
+        """Shows how often the ladder writes were retried because of deadlocks or lock wait timeouts."""
+        logger.debug("retry_stats: called by {}".format(ctx.author))
+        table = [
+            [s["action"], s["calls"], s["retries"], s["exhausted"], ", ".join("{}: {}".format(e, n) for e, n in s["errors"].items())]
+            for s in get_retry_statistics()
+        ]
+        header = ["Action", "Calls", "Retries", "Gave up", "Conflicts"]
+        await ctx.send("```\n{}\n```".format(tabulate(table, headers=header, tablefmt="pretty")))
+
+    @commands.command(pass_context=True)
+    @is_rll_admin()
+    async def cache_stats(self, ctx):
+        """Shows how often the ladder queries were answered from the query cache."""
+        logger.debug("cache_stats: called by {}".format(ctx.author))
+        stats = get_query_cache().get_statistics()
+        if not stats["max_size"]:
+            await ctx.send("The query cache is disabled")
+            return
+        await ctx.send(
+            "Query cache: {hits} hits, {misses} misses ({hit_ratio:.0%} hit ratio), "
+            "{size}/{max_size} results cached, {evictions} evicted, {invalidations} invalidated".format(**stats)
+        )
+
 
 def setup(bot):
     bot.add_cog(Admin(bot))
@@ -1,11 +1,12 @@
 import discord
 from discord.ext import commands
 from logging import getLogger
-from os3_rll.actions.challenge import create_challenge, complete_challenge, get_challenge, reset_challenge
-from os3_rll.actions.player import get_player_ranking, get_player_stats
+from os3_rll.actions.challenge import create_challenge, complete_challenge_async, get_challenge, reset_challenge
+from os3_rll.actions.player import get_player_ranking_async, get_player_stats_async
 from os3_rll.actions import stub
 from os3_rll.discord.announcements.challenge import announce_challenge, announce_reset, announce_challenge_info, announce_winner
 from os3_rll.discord.announcements.player import announce_rankings, announce_stats
+from os3_rll.discord.executor import run_action
 from os3_rll.operations.challenge import get_player_objects_from_challenge_info
 
 logger = getLogger(__name__)
@@ -21,7 +22,7 @@ class RLL(commands.Cog):
         Returns the current player ranking leaderboard.
         """
         logger.debug("get_ranking: called by".format(ctx.author))
-        rankings = get_player_ranking()  # returns dict with {'gamertag':'rank'}
+        rankings = await get_player_ranking_async()  # returns dict with {'gamertag':'rank'}
         announcement = announce_rankings(rankings)
         await ctx.send(announcement["content"], embed=announcement["embed"])
 
@@ -31,7 +32,7 @@ class RLL(commands.Cog):
         Returns the current player stats.
         """
         logger.debug("get_stats: called by".format(ctx.author))
-        stats = get_player_stats()
+        stats = await get_player_stats_async()
         await ctx.send(announce_stats(stats))
 
     @commands.command(pass_context=True)
@@ -47,7 +48,7 @@ class RLL(commands.Cog):
         """Gives your current challenge deadline."""
         player = str(ctx.author)
         logger.debug("get_challenge: called for player {}".format(player))
-        res = get_challenge(player)
+        res = await run_action(get_challenge, player)
         announcement = announce_challenge_info(res)
         await ctx.send(announcement["content"], embed=announcement["embed"])
 
@@ -60,7 +61,7 @@ class RLL(commands.Cog):
         p1 = str(ctx.author)
         p2 = str(p)
         logger.debug("creating challenge between {} and {}".format(p1, p2))
-        create_challenge(p1, p2)
+        await run_action(create_challenge, p1, p2)
         announcement = announce_challenge(ctx.author, p)
         await ctx.send(announcement["content"], embed=announcement["embed"])
 
@@ -70,8 +71,9 @@ class RLL(commands.Cog):
         match_res = " ".join(match_results)
         requester = str(ctx.author)
         logger.debug("complete_challenge requested by {} with args: {}".format(requester, match_results))
-        challenger, defender = get_player_objects_from_challenge_info(requester)
-        winner_id = complete_challenge(challenger.id, defender.id, match_res)
+        # The players are loaded by complete_challenge through the identity map of this command, before the announcement uses them
+        challenger, defender = await run_action(get_player_objects_from_challenge_info, requester, lazy=True)
+        winner_id = await complete_challenge_async(challenger.id, defender.id, match_res)
         announcement = announce_winner(challenger, defender, winner_id, match_res)
         await ctx.send(announcement["content"], embed=announcement["embed"])
 
@@ -79,9 +81,11 @@ class RLL(commands.Cog):
     async def reset_challenge(self, ctx):
         """Resets the challenge you are parcitipating in."""
         logger.debug("reset challenge requested by {}".format(str(ctx.author)))
-        challenger, defender = get_player_objects_from_challenge_info(str(ctx.author), should_be_completed=True)
-        reset_challenge(challenger.id, defender.id)
-        res = get_challenge(str(ctx.author))
+        challenger, defender = await run_action(
+            get_player_objects_from_challenge_info, str(ctx.author), should_be_completed=True, lazy=True
+        )
+        await run_action(reset_challenge, challenger.id, defender.id)
+        res = await run_action(get_challenge, str(ctx.author))
         announcement = announce_reset(res)
         await ctx.send(announcement["content"], embed=announcement["embed"])
 
@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial, wraps
+from logging import getLogger
+from threading import Lock
+
+from os3_rll.conf import settings
+
+logger = getLogger(__name__)
+
+
+class ActionExecutor(ThreadPoolExecutor):
+    """
+    A size limited ThreadPoolExecutor which keeps track of how busy it is
+    Used to run the blocking ladder actions outside of the discord.py event loop
+    """
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers=max_workers, thread_name_prefix="os3rll-action")
+        self.max_workers = max_workers
+        self._active_workers = 0
+        self._active_lock = Lock()
+
+    @property
+    def queue_depth(self):
+        """
+        The amount of submitted calls waiting for a free worker
+        """
+        return self._work_queue.qsize()
+
+    @property
+    def active_workers(self):
+        """
+        The amount of workers currently running a call
+        """
+        return self._active_workers
+
+    def get_statistics(self):
+        return {"max_workers": self.max_workers, "active_workers": self.active_workers, "queue_depth": self.queue_depth}
+
+    def submit(self, fn, *args, **kwargs):  # pylint: disable=arguments-differ
+        return super().submit(self._track, fn, *args, **kwargs)
+
+    def _track(self, fn, *args, **kwargs):
+        with self._active_lock:
+            self._active_workers += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._active_lock:
+                self._active_workers -= 1
+
+
+action_executor = ActionExecutor(settings.DISCORD_ACTION_WORKERS)
+
+
+async def run_action(func, *args, **kwargs):
+    """
+    Runs a blocking function on the action executor and waits for it without blocking the event loop
+
+    param callable func: The (blocking) function to run, for example one of the os3_rll.actions
+    returns: Whatever func returns, exceptions raised by func are raised here
+    """
+    loop = asyncio.get_event_loop()
+    logger.debug("Offloading {} to the action executor ({})".format(func.__name__, action_executor.get_statistics()))
+    context = copy_context()
+    return await loop.run_in_executor(action_executor, partial(context.run, func, *args, **kwargs))
+
+
+def offload(func):
+    """
+    Decorator which turns a blocking function into a coroutine that runs on the action executor
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_action(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,71 @@
+"""
+Create the users and challenges tables
+"""
+
+MYSQL_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS `challenges` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `date` datetime(6) NOT NULL COMMENT 'Challenge creation date',
+  `p1` varchar(255) NOT NULL COMMENT 'ID of player 1 (challenger)',
+  `p2` varchar(255) NOT NULL COMMENT 'ID of player 2 (challenged)',
+  `p1_wins` int(11) DEFAULT NULL COMMENT 'How many games were won by p1',
+  `p2_wins` int(11) DEFAULT NULL COMMENT 'How many games were won by p2',
+  `p1_score` int(11) DEFAULT NULL COMMENT 'The total amount of goals by p1',
+  `p2_score` int(11) DEFAULT NULL COMMENT 'The total amount of goals by p2',
+  `winner` int(11) DEFAULT NULL COMMENT 'ID of the winner',
+  PRIMARY KEY (`id`),
+  KEY `p1_score` (`p1_score`,`p2_score`)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1""",
+    """CREATE TABLE IF NOT EXISTS `users` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `name` varchar(255) NOT NULL COMMENT 'Real name of the user',
+  `gamertag` varchar(255) NOT NULL COMMENT 'RL gamertag of the user',
+  `discord` varchar(255) NOT NULL COMMENT 'Discord handle of the user (username#1234)',
+  `rank` int(11) NOT NULL DEFAULT '0' COMMENT 'Current rank of the user',
+  `wins` int(11) NOT NULL DEFAULT '0' COMMENT 'Total amount of wins',
+  `losses` int(11) NOT NULL DEFAULT '0' COMMENT 'Total amount of losses',
+  `challenged` tinyint(1) NOT NULL DEFAULT '0' COMMENT 'User is currently challenged',
+  `timeout` datetime NOT NULL COMMENT 'Current challenger timeout of the user',
+  `password` varchar(255) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `discord` (`discord`)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1""",
+]
+
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS `challenges` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `date` datetime NOT NULL,
+  `p1` varchar(255) NOT NULL,
+  `p2` varchar(255) NOT NULL,
+  `p1_wins` int DEFAULT NULL,
+  `p2_wins` int DEFAULT NULL,
+  `p1_score` int DEFAULT NULL,
+  `p2_score` int DEFAULT NULL,
+  `winner` int DEFAULT NULL
+)""",
+    "CREATE INDEX IF NOT EXISTS `p1_score` ON `challenges` (`p1_score`, `p2_score`)",
+    """CREATE TABLE IF NOT EXISTS `users` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `name` varchar(255) NOT NULL,
+  `gamertag` varchar(255) NOT NULL,
+  `discord` varchar(255) NOT NULL,
+  `rank` int NOT NULL DEFAULT 0,
+  `wins` int NOT NULL DEFAULT 0,
+  `losses` int NOT NULL DEFAULT 0,
+  `challenged` tinyint NOT NULL DEFAULT 0,
+  `timeout` datetime NOT NULL,
+  `password` varchar(255) DEFAULT NULL
+)""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS `discord` ON `users` (`discord`)",
+]
+
+
+def migrate(ctx):
+    # Existing installations created these tables from deployment/database_schema.sql, leave them alone
+    for statement in MYSQL_SCHEMA if ctx.dialect == "mysql" else SQLITE_SCHEMA:
+        ctx.execute(statement)
+
+
+def verify(ctx):
+    return ctx.index_exists("users", "discord")
@@ -0,0 +1,34 @@
+"""
+Add covering indexes for the challenge and user lookups
+"""
+
+CHALLENGES_INDEXES = (
+    # Average goals as challenger and the (p1=? OR p2=?) challenge lookups, the id is part of every secondary index
+    ("p1_winner_score", ("p1", "winner", "p1_score")),
+    ("p2_winner_score", ("p2", "winner", "p2_score")),
+    # Challenge.get_latest_challenge_from_player
+    ("p1_p2_winner", ("p1", "p2", "winner")),
+    # The expired challenges task only looks at the uncompleted challenges
+    ("winner_date", ("winner", "date", "p1", "p2")),
+)
+
+USERS_INDEXES = (
+    # The ranking, MAX(rank) and the rank shift after a challenge
+    ("rank_listing", ("rank", "discord", "gamertag")),
+    ("gamertag", ("gamertag",)),
+)
+
+
+def migrate(ctx):
+    for name, columns in CHALLENGES_INDEXES:
+        ctx.add_index("challenges", name, columns)
+    for name, columns in USERS_INDEXES:
+        ctx.add_index("users", name, columns)
+    # Not used by any query, only slows down the writes
+    ctx.drop_index("challenges", "p1_score")
+
+
+def verify(ctx):
+    return all(ctx.index_exists("challenges", name) for name, _ in CHALLENGES_INDEXES) and all(
+        ctx.index_exists("users", name) for name, _ in USERS_INDEXES
+    )
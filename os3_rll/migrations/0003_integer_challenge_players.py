@@ -0,0 +1,78 @@
+"""
+Store the players of a challenge as integer foreign keys to users.id
+"""
+from os3_rll.migrations.runner import MigrationException
+
+FOREIGN_KEYS = ("p1", "p2", "winner")
+
+SQLITE_CHALLENGES = """CREATE TABLE `challenges_new` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `date` datetime NOT NULL,
+  `p1` int NOT NULL REFERENCES `users` (`id`),
+  `p2` int NOT NULL REFERENCES `users` (`id`),
+  `p1_wins` int DEFAULT NULL,
+  `p2_wins` int DEFAULT NULL,
+  `p1_score` int DEFAULT NULL,
+  `p2_score` int DEFAULT NULL,
+  `winner` int DEFAULT NULL REFERENCES `users` (`id`)
+)"""
+
+
+def check_orphaned_challenges(ctx):
+    for column in FOREIGN_KEYS:
+        ctx.execute(
+            "SELECT COUNT(*) FROM `challenges` WHERE `{0}` IS NOT NULL AND `{0}` NOT IN (SELECT `id` FROM `users`)".format(column)
+        )
+        orphans = ctx.fetchone()[0]
+        if orphans:
+            raise MigrationException(
+                "{} challenges refer to a non existing player in column {}, fix or remove them before migrating".format(orphans, column)
+            )
+
+
+def migrate_mysql(ctx):
+    # The foreign keys reuse the (p1, ...), (p2, ...) and (winner, ...) indexes added by migration 0002
+    ctx.execute(
+        "ALTER TABLE `challenges` "
+        "MODIFY `p1` int(11) NOT NULL COMMENT 'ID of player 1 (challenger)', "
+        "MODIFY `p2` int(11) NOT NULL COMMENT 'ID of player 2 (challenged)', "
+        + ", ".join(
+            "ADD CONSTRAINT `challenges_{0}_fk` FOREIGN KEY (`{0}`) REFERENCES `users` (`id`)".format(column) for column in FOREIGN_KEYS
+        )
+    )
+
+
+def migrate_sqlite(ctx):
+    # SQLite can't change the type of a column, rebuild the table and its indexes instead
+    ctx.execute("SELECT `sql` FROM `sqlite_master` WHERE `type` = 'index' AND `tbl_name` = 'challenges' AND `sql` IS NOT NULL")
+    indexes = [row[0] for row in ctx.fetchall()]
+    ctx.execute(SQLITE_CHALLENGES)
+    ctx.execute(
+        "INSERT INTO `challenges_new` "
+        "SELECT `id`, `date`, CAST(`p1` AS INTEGER), CAST(`p2` AS INTEGER), `p1_wins`, `p2_wins`, `p1_score`, `p2_score`, `winner` "
+        "FROM `challenges`"
+    )
+    ctx.execute("DROP TABLE `challenges`")
+    ctx.execute("ALTER TABLE `challenges_new` RENAME TO `challenges`")
+    for index in indexes:
+        ctx.execute(index)
+
+
+def migrate(ctx):
+    check_orphaned_challenges(ctx)
+    if ctx.dialect == "mysql":
+        migrate_mysql(ctx)
+    else:
+        migrate_sqlite(ctx)
+
+
+def verify(ctx):
+    if ctx.dialect == "mysql":
+        ctx.execute(
+            "SELECT `data_type` FROM information_schema.columns "
+            "WHERE `table_schema` = DATABASE() AND `table_name` = 'challenges' AND `column_name` = 'p1'"
+        )
+    else:
+        ctx.execute("SELECT `type` FROM pragma_table_info('challenges') WHERE `name` = 'p1'")
+    row = ctx.fetchone()
+    return row is not None and row[0].lower().startswith("int")
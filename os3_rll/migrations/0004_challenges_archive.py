@@ -0,0 +1,47 @@
+"""
+Add the challenges_archive table for the completed challenges of the past
+"""
+
+MYSQL_ARCHIVE = """CREATE TABLE IF NOT EXISTS `challenges_archive` (
+  `id` int(11) NOT NULL COMMENT 'ID the challenge had in the challenges table',
+  `date` datetime(6) NOT NULL COMMENT 'Challenge creation date',
+  `p1` int(11) NOT NULL COMMENT 'ID of player 1 (challenger)',
+  `p2` int(11) NOT NULL COMMENT 'ID of player 2 (challenged)',
+  `p1_wins` int(11) DEFAULT NULL COMMENT 'How many games were won by p1',
+  `p2_wins` int(11) DEFAULT NULL COMMENT 'How many games were won by p2',
+  `p1_score` int(11) DEFAULT NULL COMMENT 'The total amount of goals by p1',
+  `p2_score` int(11) DEFAULT NULL COMMENT 'The total amount of goals by p2',
+  `winner` int(11) NOT NULL COMMENT 'ID of the winner',
+  PRIMARY KEY (`id`),
+  CONSTRAINT `challenges_archive_p1_fk` FOREIGN KEY (`p1`) REFERENCES `users` (`id`),
+  CONSTRAINT `challenges_archive_p2_fk` FOREIGN KEY (`p2`) REFERENCES `users` (`id`),
+  CONSTRAINT `challenges_archive_winner_fk` FOREIGN KEY (`winner`) REFERENCES `users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1"""
+
+SQLITE_ARCHIVE = """CREATE TABLE IF NOT EXISTS `challenges_archive` (
+  `id` INTEGER PRIMARY KEY,
+  `date` datetime NOT NULL,
+  `p1` int NOT NULL REFERENCES `users` (`id`),
+  `p2` int NOT NULL REFERENCES `users` (`id`),
+  `p1_wins` int DEFAULT NULL,
+  `p2_wins` int DEFAULT NULL,
+  `p1_score` int DEFAULT NULL,
+  `p2_score` int DEFAULT NULL,
+  `winner` int NOT NULL REFERENCES `users` (`id`)
+)"""
+
+ARCHIVE_INDEXES = (
+    # Average goals as challenger and as challenged player, every archived challenge has been completed
+    ("archive_p1_score", ("p1", "p1_score")),
+    ("archive_p2_score", ("p2", "p2_score")),
+)
+
+
+def migrate(ctx):
+    ctx.execute(MYSQL_ARCHIVE if ctx.dialect == "mysql" else SQLITE_ARCHIVE)
+    for name, columns in ARCHIVE_INDEXES:
+        ctx.add_index("challenges_archive", name, columns)
+
+
+def verify(ctx):
+    return all(ctx.index_exists("challenges_archive", name) for name, _ in ARCHIVE_INDEXES)
@@ -0,0 +1,34 @@
+"""
+Add a version column to users and challenges for optimistic concurrency control
+"""
+
+TABLES = ("users", "challenges")
+
+
+def column_exists(ctx, table, column):
+    if ctx.dialect == "mysql":
+        ctx.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE `table_schema` = DATABASE() AND `table_name` = %s AND `column_name` = %s",
+            (table, column),
+        )
+    else:
+        ctx.execute("SELECT COUNT(*) FROM pragma_table_info(%s) WHERE `name` = %s", (table, column))
+    return ctx.fetchone()[0] > 0
+
+
+def migrate(ctx):
+    for table in TABLES:
+        if column_exists(ctx, table, "version"):
+            continue
+        if ctx.dialect == "mysql":
+            ctx.execute(
+                "ALTER TABLE `{}` ADD COLUMN `version` int(11) NOT NULL DEFAULT '0' "
+                "COMMENT 'Incremented by every update of the row', ALGORITHM=INPLACE, LOCK=NONE".format(table)
+            )
+        else:
+            ctx.execute("ALTER TABLE `{}` ADD COLUMN `version` int NOT NULL DEFAULT 0".format(table))
+
+
+def verify(ctx):
+    return all(column_exists(ctx, table, "version") for table in TABLES)
@@ -0,0 +1,184 @@
+import re
+from datetime import datetime
+from importlib import import_module
+from logging import getLogger
+from os import listdir
+from os.path import dirname
+
+logger = getLogger(__name__)
+
+MIGRATIONS_DIR = dirname(__file__)
+MIGRATIONS_PACKAGE = __name__.rsplit(".", 1)[0]
+_migration_file = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+class MigrationException(RuntimeError):
+    pass
+
+
+class Migration:
+    """
+    A numbered migration file in os3_rll/migrations (e.g. 0002_add_challenge_indexes.py)
+    The module should define a migrate(ctx) function and can define a verify(ctx) function which returns True
+    when the schema changes of the migration are present.
+    """
+
+    def __init__(self, version, name):
+        self.version = version
+        self.name = name
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._module = import_module("{}.{:04d}_{}".format(MIGRATIONS_PACKAGE, self.version, self.name))
+        return self._module
+
+    @property
+    def description(self):
+        return (self.module.__doc__ or self.name).strip()
+
+    def __repr__(self):
+        return "{:04d}_{}".format(self.version, self.name)
+
+
+class MigrationContext:
+    """
+    Gives migrations access to a database connection in the MySQL dialect used throughout the models,
+    statements are translated to the dialect of the backend. Use ctx.dialect for statements which can't be translated.
+    """
+
+    def __init__(self, backend, connection):
+        self.backend = backend
+        self.dialect = backend.dialect
+        self.connection = connection
+        self.cursor = backend.cursor(connection)
+
+    def execute(self, query, parameters=None):
+        logger.debug("Migration statement: {}".format(query))
+        self.cursor.execute(self.backend.translate(query), parameters)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def commit(self):
+        self.connection.commit()
+
+    def index_exists(self, table, name):
+        self.execute(self.backend.index_exists_query(), (table, name))
+        return self.fetchone()[0] > 0
+
+    def add_index(self, table, name, columns, unique=False):
+        """
+        Add an index without blocking writes (where the database supports it), does nothing if the index already exists
+        """
+        if self.index_exists(table, name):
+            logger.info("Index {} on {} already exists, skipping".format(name, table))
+            return
+        logger.info("Adding index {} on {} ({})".format(name, table, ", ".join(columns)))
+        self.execute(self.backend.add_index(table, name, columns, unique=unique))
+
+    def drop_index(self, table, name):
+        """
+        Drop an index, does nothing if the index doesn't exist
+        """
+        if not self.index_exists(table, name):
+            return
+        logger.info("Dropping index {} on {}".format(name, table))
+        self.execute(self.backend.drop_index(table, name))
+
+
+def get_available_migrations():
+    """
+    returns list: All migrations in the migrations directory ordered by version
+    """
+    migrations = []
+    for file_name in listdir(MIGRATIONS_DIR):
+        match = _migration_file.match(file_name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2)))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationException("Found multiple migrations with the same version number: {}".format(migrations))
+    return migrations
+
+
+def get_applied_migrations(ctx):
+    """
+    returns dict: {int version: str name} of the migrations applied to the database
+    """
+    ctx.execute(
+        "CREATE TABLE IF NOT EXISTS `schema_version` ("
+        "`version` int(11) NOT NULL, `name` varchar(255) NOT NULL, `applied_at` datetime NOT NULL, PRIMARY KEY (`version`))"
+    )
+    ctx.execute("SELECT `version`, `name` FROM `schema_version` ORDER BY `version`")
+    return {int(version): name for version, name in ctx.fetchall()}
+
+
+def _get_context(backend=None):
+    # pylint: disable=import-outside-toplevel
+    from os3_rll.models.db import get_backend
+
+    backend = backend or get_backend()
+    return MigrationContext(backend, backend.connect())
+
+
+def apply_migrations(backend=None, target=None, connection=None):
+    """
+    Apply all pending migrations to the database
+
+    param os3_rll.models.backends.base.Backend backend: The backend to migrate, defaults to the configured backend
+    param int target: Only apply migrations up to and including this version
+    param connection: Use this connection instead of opening a new one
+    returns list: The migrations that were applied
+    """
+    ctx = MigrationContext(backend, connection) if connection is not None else _get_context(backend)
+    try:
+        applied = get_applied_migrations(ctx)
+        done = []
+        for migration in get_available_migrations():
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+            logger.info("Applying migration {}: {}".format(migration, migration.description))
+            migration.module.migrate(ctx)
+            ctx.execute(
+                "INSERT INTO `schema_version` SET `version`=%s, `name`=%s, `applied_at`=%s",
+                (migration.version, migration.name, datetime.now().replace(microsecond=0)),
+            )
+            ctx.commit()
+            done.append(migration)
+        if not done:
+            logger.info("Database schema is up to date")
+        return done
+    finally:
+        if connection is None:
+            ctx.connection.close()
+
+
+def verify_migrations(backend=None):
+    """
+    Check if the database schema matches the migrations
+
+    returns list: Descriptions of the problems found, an empty list means the schema is up to date
+    """
+    ctx = _get_context(backend)
+    try:
+        applied = get_applied_migrations(ctx)
+        available = get_available_migrations()
+        problems = []
+        for migration in available:
+            if migration.version not in applied:
+                problems.append("Migration {} has not been applied".format(migration))
+            elif hasattr(migration.module, "verify") and not migration.module.verify(ctx):
+                problems.append("Migration {} has been applied, but its changes are missing from the database".format(migration))
+        known = {m.version for m in available}
+        for version, name in applied.items():
+            if version not in known:
+                problems.append("Migration {:04d}_{} is applied to the database, but unknown to this version".format(version, name))
+        return problems
+    finally:
+        ctx.connection.close()
@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from logging import getLogger
+from threading import Lock
+
+from os3_rll.conf import settings
+from os3_rll.models.db import Database
+
+logger = getLogger(__name__)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_database_executor():
+    """
+    Returns the thread pool that runs the blocking database calls for the asyncio code, sized to the connection pool
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="os3rll-db")
+        return _executor
+
+
+def shutdown_database_executor():
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_in_database_executor(func, *args, **kwargs):
+    """
+    Run a blocking database function without blocking the event loop
+    The current context is copied, so context variables (like the active UnitOfWork) are visible to the function
+
+    param callable func: The function to run
+    returns: Whatever func returns
+    """
+    loop = asyncio.get_event_loop()
+    context = copy_context()
+    return await loop.run_in_executor(get_database_executor(), partial(context.run, func, *args, **kwargs))
+
+
+class AsyncDatabase:
+    """
+    Asyncio counterpart of os3_rll.models.db.Database
+    Use it in an async with statement, every call that talks to the database has to be awaited
+
+        async with AsyncDatabase() as db:
+            await db.execute_prepared_statement("SELECT ...", (1,))
+            row = await db.fetchone()
+    """
+
+    def __init__(self, read_only=None):
+        """
+        param bool read_only: Whether this instance only reads and may use a replica, see os3_rll.models.db.Database
+        """
+        self.read_only = read_only
+        self.database = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def connect(self):
+        if self.database is None:
+            self.database = await run_in_database_executor(Database, read_only=self.read_only)
+
+    async def execute(self, query):
+        await run_in_database_executor(self.database.execute, query)
+
+    async def execute_prepared_statement(self, query, parameters, cache=False):
+        """
+        Execute a prepared statement on the DB
+        :param str query: The SQL query in question (use %s for the placeholders)
+        :param tuple parameters: The variables to place on the %s placeholders
+        :param bool cache: Serve the result from the query cache, only use this for reads
+        """
+        await run_in_database_executor(self.database.execute_prepared_statement, query, parameters, cache=cache)
+
+    async def execute_statement(self, name, parameters=None):
+        """
+        Execute a statement from the statement registry, see os3_rll.models.db.Database.execute_statement
+        """
+        await run_in_database_executor(self.database.execute_statement, name, parameters)
+
+    @property
+    def rowcount(self):
+        return self.database.rowcount
+
+    async def commit(self):
+        await run_in_database_executor(self.database.commit)
+
+    async def fetchall(self):
+        return await run_in_database_executor(self.database.fetchall)
+
+    async def fetchone(self):
+        return await run_in_database_executor(self.database.fetchone)
+
+    async def close(self):
+        if self.database is not None:
+            database, self.database = self.database, None
+            await run_in_database_executor(database.close)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
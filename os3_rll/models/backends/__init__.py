@@ -0,0 +1,9 @@
+from os3_rll.conf import settings, perform_import
+
+
+def load_backend():
+    """
+    Returns a new instance of the storage backend configured in settings.DB_BACKEND
+    """
+    backend_class = perform_import(settings.DB_BACKEND, "DB_BACKEND")
+    return backend_class()
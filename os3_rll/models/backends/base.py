@@ -0,0 +1,94 @@
+class Backend:
+    """
+    A storage backend tells the Database model how to connect to a database and how to run the SQL used by the models on it.
+    The models and operations are written in the MySQL dialect (backticks, %s placeholders, UNIX_TIMESTAMP()),
+    backends for other databases translate these statements into their own dialect.
+    """
+
+    #: Short name of the backend
+    name = None
+    #: The SQL dialect spoken by the database of this backend, used by the migrations
+    dialect = None
+    #: The DB-API base exception class raised by the driver of this backend
+    Error = Exception
+    #: The DB-API exception class raised by the driver of this backend when a statement violates a constraint
+    IntegrityError = Exception
+    #: Whether connect() accepts the host of a read replica (settings.DB_REPLICA_HOSTS)
+    supports_replicas = False
+
+    def connect(self):
+        """
+        Open a new DB-API connection
+        """
+        raise NotImplementedError
+
+    def translate(self, query):
+        """
+        Translate a statement in the MySQL dialect to the dialect of this backend
+        """
+        return query
+
+    def execute_statement(self, connection, cursor, statement, parameters=None):
+        """
+        Execute a statement from the statement registry on cursor
+
+        param connection: The connection cursor belongs to
+        param os3_rll.models.statements.Statement statement: The statement to execute
+        param tuple parameters: The variables to place on the %s placeholders
+        """
+        cursor.execute(self.translate(statement.sql), parameters)
+
+    def get_retryable_error(self, error):
+        """
+        Check if error aborted the transaction because of a conflict with another transaction, so retrying it could succeed
+
+        param Exception error: An instance of self.Error
+        returns str: A short name of the conflict (for the retry statistics), None if the error is not retryable
+        """
+        return None
+
+    def is_unavailable_error(self, error):
+        """
+        Check if error means the database can't be reached or didn't answer in time, these errors trip the circuit breaker
+
+        param Exception error: An instance of self.Error
+        returns bool: True if the database is unavailable
+        """
+        return False
+
+    def cursor(self, connection):
+        """
+        Returns a buffered cursor for connection, rowcount should hold the amount of rows returned by a SELECT
+        """
+        return connection.cursor()
+
+    def streaming_cursor(self, connection):
+        """
+        Returns a cursor which fetches rows from the database as they are consumed
+        """
+        return connection.cursor()
+
+    def explain(self, query):
+        """
+        Returns the statement which shows the query plan of query (already translated)
+        """
+        return "EXPLAIN " + query
+
+    def index_exists_query(self):
+        """
+        Returns a query with two placeholders (table, index) which returns a single count, higher then 0 if the index exists
+        """
+        raise NotImplementedError
+
+    def add_index(self, table, name, columns, unique=False):
+        """
+        Returns the statement which adds an index to a table, without blocking writes to the table if the database supports it
+        """
+        columns = ", ".join("`{}`".format(c) for c in columns)
+        return "CREATE {}INDEX `{}` ON `{}` ({})".format("UNIQUE " if unique else "", name, table, columns)
+
+    def drop_index(self, table, name):
+        """
+        Returns the statement which drops an index from a table
+        """
+        return "DROP INDEX `{}`".format(name)
@@ -0,0 +1,27 @@
+from itertools import count
+
+from os3_rll.migrations.runner import apply_migrations
+from os3_rll.models.backends.sqlite import SQLiteBackend
+
+_databases = count()
+
+
+class MemoryBackend(SQLiteBackend):
+    """
+    Keeps the ladder in memory, for benchmarks and tests that need a real database instead of mocks.
+    Every instance of this backend gets its own empty (fully migrated) database which is shared by all connections it opens,
+    the database is thrown away together with the backend (for example by os3_rll.models.db.close_connection_pool()).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__(path="file:os3rl-memory-{}?mode=memory&cache=shared".format(next(_databases)), uri=True)
+        # An in-memory database only lives as long as a connection to it is open
+        self._keeper = self.connect()
+        apply_migrations(self, connection=self._keeper)
+
+    def __del__(self):
+        keeper = getattr(self, "_keeper", None)
+        if keeper is not None:
+            keeper.close()
@@ -0,0 +1,66 @@
+from pymysql import connect, err, MySQLError
+from pymysql.constants.CR import CR_CONNECTION_ERROR, CR_CONN_HOST_ERROR, CR_SERVER_GONE_ERROR, CR_SERVER_LOST
+from pymysql.constants.ER import CON_COUNT_ERROR, LOCK_DEADLOCK, LOCK_WAIT_TIMEOUT
+from pymysql.cursors import SSCursor
+
+from os3_rll.conf import settings
+from os3_rll.models.backends.base import Backend
+
+
+class MySQLBackend(Backend):
+    """
+    Stores the ladder in the MySQL (or MariaDB) database configured in the settings
+    """
+
+    name = "mysql"
+    dialect = "mysql"
+    Error = MySQLError
+    IntegrityError = err.IntegrityError
+    supports_replicas = True
+
+    def connect(self, host=None):
+        """
+        param str host: Connect to this replica instead of settings.DB_HOST
+        """
+        return connect(
+            host or settings.DB_HOST,
+            settings.DB_USER,
+            settings.DB_PASS,
+            settings.DB_DATABASE,
+            connect_timeout=settings.DB_CONNECT_TIMEOUT,
+            read_timeout=settings.DB_READ_TIMEOUT,
+            write_timeout=settings.DB_WRITE_TIMEOUT,
+        )
+
+    def get_retryable_error(self, error):
+        code = error.args[0] if error.args else None
+        if code == LOCK_DEADLOCK:
+            return "deadlock"
+        if code == LOCK_WAIT_TIMEOUT:
+            return "lock_wait_timeout"
+        return None
+
+    def is_unavailable_error(self, error):
+        # A timed out statement is reported as a lost connection
+        return bool(error.args) and error.args[0] in (
+            CR_CONNECTION_ERROR,
+            CR_CONN_HOST_ERROR,
+            CR_SERVER_GONE_ERROR,
+            CR_SERVER_LOST,
+            CON_COUNT_ERROR,
+        )
+
+    def streaming_cursor(self, connection):
+        return connection.cursor(SSCursor)
+
+    def index_exists_query(self):
+        return "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s"
+
+    def add_index(self, table, name, columns, unique=False):
+        # Build the index in place while allowing concurrent reads and writes
+        return "ALTER TABLE `{}` ADD {}INDEX `{}` ({}), ALGORITHM=INPLACE, LOCK=NONE".format(
+            table, "UNIQUE " if unique else "", name, ", ".join("`{}`".format(c) for c in columns)
+        )
+
+    def drop_index(self, table, name):
+        return "ALTER TABLE `{}` DROP INDEX `{}`, ALGORITHM=INPLACE, LOCK=NONE".format(table, name)
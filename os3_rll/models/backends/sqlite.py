@@ -0,0 +1,148 @@
+import re
+import sqlite3
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+from os3_rll.conf import settings
+from os3_rll.models.backends.base import Backend
+
+_placeholder = re.compile(r"%s")
+_unix_timestamp = re.compile(r"UNIX_TIMESTAMP\(([^()]+)\)", re.IGNORECASE)
+_insert_set = re.compile(r"^\s*INSERT\s+INTO\s+(\S+)\s+SET\s+(.+)$", re.IGNORECASE | re.DOTALL)
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("datetime", lambda value: datetime.fromisoformat(value.decode()))
+
+
+@lru_cache(maxsize=512)
+def translate_query(query):
+    """
+    Translate a statement in the MySQL dialect used by the models to SQLite
+    """
+    query = _placeholder.sub("?", query)
+    # UNIX_TIMESTAMP() interprets the datetime in the local timezone, just like datetime.fromtimestamp() does
+    query = _unix_timestamp.sub(r"CAST(strftime('%s', \1, 'utc') AS INTEGER)", query)
+    # SQLite doesn't know the INSERT INTO ... SET syntax
+    match = _insert_set.match(query)
+    if match:
+        table, assignments = match.groups()
+        columns, values = zip(*(assignment.split("=", 1) for assignment in assignments.split(",")))
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            table, ", ".join(c.strip() for c in columns), ", ".join(v.strip() for v in values)
+        )
+    return query.replace("`", '"')
+
+
+class BufferedCursor:
+    """
+    Wraps a sqlite3 cursor so rowcount holds the amount of rows returned by a SELECT, like MySQL cursors do
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._rows = deque()
+        self.rowcount = -1
+
+    def execute(self, query, parameters=None):
+        self._cursor.execute(query, parameters or ())
+        if self._cursor.description is None:
+            self._rows = deque()
+            self.rowcount = self._cursor.rowcount
+        else:
+            self._rows = deque(self._cursor.fetchall())
+            self.rowcount = len(self._rows)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def fetchone(self):
+        return self._rows.popleft() if self._rows else None
+
+    def fetchmany(self, size=1):
+        return tuple(self._rows.popleft() for _ in range(min(size, len(self._rows))))
+
+    def fetchall(self):
+        rows, self._rows = tuple(self._rows), deque()
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class StreamingCursor(BufferedCursor):
+    """
+    A sqlite3 cursor which steps through the result while it is consumed
+    """
+
+    def execute(self, query, parameters=None):
+        self._cursor.execute(query, parameters or ())
+        self.rowcount = self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+class SQLiteBackend(Backend):
+    """
+    Stores the ladder in an embedded SQLite database file (settings.DB_SQLITE_PATH), no database server required
+    Create or upgrade the tables with `os3-rocket-league-ladder migrate`
+    """
+
+    name = "sqlite"
+    dialect = "sqlite"
+    Error = sqlite3.Error
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path=None, uri=False):
+        """
+        param str path: The database file to use, defaults to settings.DB_SQLITE_PATH
+        param bool uri: Interpret path as a SQLite URI (file:...)
+        """
+        self.path = path or settings.DB_SQLITE_PATH
+        self.uri = uri
+
+    def connect(self):
+        connection = sqlite3.connect(
+            self.path, timeout=settings.DB_WRITE_TIMEOUT, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False, uri=self.uri
+        )
+        # SQLite only enforces the foreign keys of the challenges table when asked to, per connection
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def translate(self, query):
+        return translate_query(query)
+
+    def cursor(self, connection):
+        return BufferedCursor(connection.cursor())
+
+    def streaming_cursor(self, connection):
+        return StreamingCursor(connection.cursor())
+
+    def get_retryable_error(self, error):
+        # Another connection holds the write lock on the database (or a table of a shared in-memory database)
+        if isinstance(error, sqlite3.OperationalError) and "locked" in str(error):
+            return "locked"
+        return None
+
+    def is_unavailable_error(self, error):
+        return isinstance(error, sqlite3.OperationalError) and any(
+            reason in str(error) for reason in ("unable to open database", "disk I/O error")
+        )
+
+    def explain(self, query):
+        return "EXPLAIN QUERY PLAN " + query
+
+    def index_exists_query(self):
+        return "SELECT COUNT(*) FROM `sqlite_master` WHERE `type` = 'index' AND `tbl_name` = %s AND `name` = %s"
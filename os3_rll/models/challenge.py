@@ -1,33 +1,59 @@
+from contextlib import nullcontext
 from logging import getLogger
 from datetime import datetime
 
 from os3_rll.models.db import Database
+from os3_rll.models.identity_map import IdentityMapped, get_current_identity_map
+from os3_rll.models.statements import CHALLENGE_GET_INFO_MANY, get_batch_statement, get_update_statement
 
 logger = getLogger(__name__)
 
+# The columns of the challenges table a Challenge model writes, in the order challenge.get_info returns them
+COLUMNS = ("date", "p1", "p2", "p1_wins", "p2_wins", "p1_score", "p2_score", "winner")
+
 
 class ChallengeException(RuntimeError):
     pass
 
 
-class Challenge:
+class Challenge(metaclass=IdentityMapped):
     """
     The Challenge model allows a operator to get or create a challenge from the DB and interface with it
     This class will hold a local copy of the Player object
-    When self.save() is called the changes are written to the database
+    When self.save() is called the changes are written to the database, only the modified columns are updated
+    Every update increments the version of the row, so a save detects concurrent updates without reading the row again
+    A lazy challenge only knows its id until another attribute is used
+    While an identity map is active loading the same challenge twice returns the same instance, see os3_rll.models.identity_map
     """
 
-    def __init__(self, i=0, force=False, offline=False):
+    # Set by the identity map on the instances it shares, see os3_rll.models.identity_map
+    _mapped = False
+
+    def __init__(self, i=0, force=False, offline=False, db=None, challenge_info=None, lazy=False):
         """
         param int i: The id of the challenge to get, if left to 0 a new challenge will be created
         param bool force: Set the force parameter to True to enable certain (dangerous) operations,
             Like auto-saving on __exit__, overwriting changed DB values and resetting or deleting a challenge
         param bool offline: Do not make a connection to the Database (can be used for fixtures)
+        param os3_rll.models.db.Database db: Use this Database instead of opening one, it is not closed by this instance
+        param tuple challenge_info: The row returned by challenge.get_info for this challenge, so it doesn't have to be queried
+        param bool lazy: Defer connecting to the Database and loading the challenge until an attribute other than the id is used
         """
         # Set force to true to force a model save on __exit__ and disregard DB changes
         self.force = force
         self._id = i
-        self.db = None if offline else Database()
+        self.offline = offline
+        self._new = self._id == 0
+        if lazy and not self._new and not offline and challenge_info is None:
+            self._lazy_db = db
+            self._lazy = True
+            return
+        self._lazy = False
+        self._load(db, challenge_info)
+
+    def _load(self, db, challenge_info):
+        self._owns_db = db is None
+        self.db = db if db is not None else None if self.offline else Database()
         self._date = 0
         self._p1 = None
         self._p2 = None
@@ -36,8 +62,10 @@ class Challenge:
         self._p1_score = 0
         self._p2_score = 0
         self._winner = 0
-        self._new = self._id == 0
-        if not self._new and not offline:
+        self._version = 0
+        if challenge_info is None and not self._new and not self.offline:
+            challenge_info = self.get_challenge_info_from_db()
+        if challenge_info is not None:
             (
                 self._date,
                 self._p1,
@@ -47,16 +75,89 @@ class Challenge:
                 self._p1_score,
                 self._p2_score,
                 self._winner,
-            ) = self.get_challenge_info_from_db()
-        self.original = (self._date, self._p1, self._p2, self._p1_wins, self._p2_wins, self._p1_score, self._p2_score, self._winner)
+                self._version,
+            ) = challenge_info
+        self.original = (
+            self._date,
+            self._p1,
+            self._p2,
+            self._p1_wins,
+            self._p2_wins,
+            self._p1_score,
+            self._p2_score,
+            self._winner,
+            self._version,
+        )
         if self._date:
             self._date = datetime.fromtimestamp(self._date)
         else:
             self._date = datetime.now()
+        self._loaded = self._get_column_values()
+
+    def _load_lazy(self):
+        logger.debug("Loading lazy challenge with id {}".format(self._id))
+        db = self.__dict__.pop("_lazy_db")
+        object.__setattr__(self, "_lazy", False)
+        self._load(db, None)
+
+    def __getattr__(self, name):
+        # Only called for attributes which aren't set, on a lazy challenge that is everything but the id and the flags
+        if not self.__dict__.get("_lazy"):
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        self._load_lazy()
+        return getattr(self, name)
+
+    def __setattr__(self, name, value):
+        # Load a lazy challenge before it is modified, so the change isn't overwritten by the loaded values
+        if self.__dict__.get("_lazy"):
+            self._load_lazy()
+        super().__setattr__(name, value)
+
+    @property
+    def loaded(self):
+        """
+        False as long as a lazy challenge hasn't been loaded from the Database
+        """
+        return not self._lazy
 
     def __enter__(self):
         return self
 
+    @classmethod
+    def load_many(cls, ids, force=False, db=None):
+        """
+        Load many challenges with a single query
+        param list ids: The ids of the challenges to load
+        param bool force: Passed on to every challenge, see __init__
+        param os3_rll.models.db.Database db: Load the challenges with this Database and let them share it, so they can be saved.
+            When not passed the challenges are loaded on a connection of their own and returned offline, they can only be read.
+            Those already loaded in the active identity map are returned as they are
+        returns list: The challenges in the order of ids
+        raises ChallengeException: When one of the challenges doesn't exist
+        """
+        ids = [int(i) for i in ids]
+        # The challenges already loaded in the active identity map are reused instead of queried again
+        identity_map = get_current_identity_map() if db is None else None
+        loaded = {}
+        if identity_map is not None:
+            for i in ids:
+                instance = identity_map.get(cls, i, force)
+                if instance is not None:
+                    loaded[i] = instance
+        rows = {}
+        ids_to_load = [i for i in ids if i not in loaded]
+        if not ids_to_load:
+            return [loaded[i] for i in ids]
+        with Database() if db is None else nullcontext(db) as database:
+            statement, parameters = get_batch_statement("challenge.get_info_many", CHALLENGE_GET_INFO_MANY, ids_to_load)
+            database.execute_statement(statement.name, parameters)
+            for row in database.fetchall():
+                rows[row[0]] = row[1:]
+        missing = [i for i in ids_to_load if i not in rows]
+        if missing:
+            raise ChallengeException("Challenges with ids {} not found".format(", ".join(str(i) for i in missing)))
+        return [loaded[i] if i in loaded else cls(i, force=force, offline=db is None, db=db, challenge_info=rows[i]) for i in ids]
+
     @staticmethod
     def get_latest_challenge_from_player(p1, p2, should_be_completed=False):
         """
@@ -68,11 +169,8 @@ class Challenge:
         raises ChallengeException: if no challenge was found
         """
         with Database() as db:
-            db.execute_prepared_statement(
-                "SELECT `id` FROM `challenges` WHERE `p1`=%s AND `p2`=%s AND `winner` IS {} NULL ORDER BY `id` DESC LIMIT 1".format(
-                    "NOT" if should_be_completed else ""
-                ),
-                (p1, p2),
+            db.execute_statement(
+                "challenge.latest_completed_between" if should_be_completed else "challenge.latest_open_between", (p1, p2)
             )
             # Check for non existing challenge
             if db.rowcount != 1:
@@ -190,31 +288,72 @@ class Challenge:
         if self._new:
             self._save_new_challenge()
         else:
-            if self.check_if_challenge_info_has_changed():
-                if self.force:
-                    logger.warning("DB info has changed! Force enabled, overwriting DB info...")
-                else:
-                    raise ChallengeException("DB info has changed while trying to save, refusing save. Set force=True to overwrite")
-
-            self._save_existing_challenge_model()
+            columns = self.get_changed_columns()
+            if not columns:
+                logger.debug("Challenge with id {} has not been modified, nothing to save".format(self._id))
+                return
+            self._save_existing_challenge_model(columns)
         self.db.commit()
 
+    def get_changed_columns(self):
+        """
+        Returns the columns modified since the challenge was loaded or last saved
+        returns tuple: The names of the columns, in the order of COLUMNS
+        """
+        values = self._get_column_values()
+        return tuple(column for column in COLUMNS if values[column] != self._loaded[column])
+
+    def _resolve_conflict(self, columns):
+        """
+        Called when the challenge has been updated by someone else since it was loaded or last saved
+        Changes made by others to the columns this instance doesn't modify are kept
+        param tuple columns: The columns this instance is updating
+        returns int: The current version of the challenge to retry the update with
+        raises ChallengeException: When one of columns has been changed as well and force isn't set
+        """
+        challenge_info = self.get_challenge_info_from_db()
+        stored = self._get_column_values(challenge_info)
+        if any(stored[column] != self._loaded[column] for column in columns):
+            if not self.force:
+                raise ChallengeException("DB info has changed while trying to save, refusing save. Set force=True to overwrite")
+            logger.warning("DB info has changed! Force enabled, overwriting DB info...")
+        return challenge_info[-1]
+
+    def _get_column_values(self, challenge_info=None):
+        """
+        Returns the values of the columns as this model holds them
+        param tuple challenge_info: Convert this row returned by challenge.get_info instead of the current values
+        returns dict: {str column: value}
+        """
+        if challenge_info is not None:
+            values = dict(zip(COLUMNS, challenge_info))
+            values["date"] = datetime.fromtimestamp(values["date"]) if values["date"] else None
+            return values
+        values = {column: getattr(self, "_" + column) for column in COLUMNS}
+        # Check the actual winner property so if the user didn't set it we still appoint a winner
+        values["winner"] = self.winner or None
+        return values
+
     def _save_new_challenge(self):
         # Check if any of the required args are missing
         if any(arg is None for arg in (self._p1, self._p2)):
             raise ChallengeException("When creating a new challenge the p1, and p2 properties are required")
         logger.info("Inserting new challenge into DB")
-        self.db.execute_prepared_statement("INSERT INTO `challenges` SET `date`=%s, `p1`=%s, `p2`=%s", (self._date, self._p1, self._p2))
-
-    def _save_existing_challenge_model(self):
-        logger.info("Updating DB for challenge with id {}".format(self._id))
-        # Check the actual winner property so if the user didn't set it we still appoint a winner
-        self.db.execute_prepared_statement(
-            "UPDATE `challenges` SET "
-            "`date`=%s, `p1`=%s, `p2`=%s, `p1_wins`=%s, `p2_wins`=%s, `p1_score`=%s, `p2_score`=%s, `winner`=%s "
-            "WHERE `id`=%s",
-            (self._date, self._p1, self._p2, self._p1_wins, self._p2_wins, self._p1_score, self._p2_score, self.winner, self._id),
-        )
+        self.db.execute_statement("challenge.insert", (self._date, self._p1, self._p2))
+
+    def _save_existing_challenge_model(self, columns):
+        logger.info("Updating {} in DB for challenge with id {}".format(", ".join(columns), self._id))
+        values = self._get_column_values()
+        statement = get_update_statement("challenge", "challenges", columns)
+        parameters = tuple(values[column] for column in columns) + (self._id,)
+        self.db.execute_statement(statement.name, parameters + (self._version,))
+        if self.db.rowcount == 0:
+            self._version = self._resolve_conflict(columns)
+            self.db.execute_statement(statement.name, parameters + (self._version,))
+            if self.db.rowcount == 0:
+                raise ChallengeException("Challenge {} is being updated by someone else, retry instead".format(self._id))
+        self._version += 1
+        self._loaded = values
 
     def reset(self):
         """
@@ -227,10 +366,7 @@ class Challenge:
         if self._new:
             raise ChallengeException("New challenges cannot be reset")
         logger.info("Resetting the scores of challenge {}".format(self._id))
-        self.db.execute_prepared_statement(
-            "UPDATE `challenges` SET `p1_wins`=NULL, `p2_wins`=NULL, `p1_score`=NULL, " "`p2_score`=NULL, `winner`=NULL WHERE `id`=%s",
-            (self._id,),
-        )
+        self.db.execute_statement("challenge.reset", (self._id,))
         logger.info("Reloading myself")
         self.db.commit()
         self.__init__(i=self._id, force=self.force)
@@ -244,16 +380,12 @@ class Challenge:
         if self._new:
             raise ChallengeException("New challenges cannot be deleted")
         logger.info("Deleting challenge with id {}".format(self._id))
-        self.db.execute_prepared_statement("DELETE FROM `challenges` WHERE `id`=%s", (self._id,))
+        self.db.execute_statement("challenge.delete", (self._id,))
         self.db.commit()
 
     def get_challenge_info_from_db(self):
         logger.debug("Getting challenge info for challenge with id {} from DB".format(self._id))
-        self.db.execute_prepared_statement(
-            "SELECT UNIX_TIMESTAMP(`date`), `p1`, `p2`, `p1_wins`, `p2_wins`, `p1_score`, `p2_score`, `winner` FROM `challenges` "
-            "WHERE `id`=%s",
-            (self._id,),
-        )
+        self.db.execute_statement("challenge.get_info", (self._id,))
         self._check_row_count()
         return self.db.fetchone()
 
@@ -267,7 +399,12 @@ class Challenge:
             raise ChallengeException("Excepting {} rows to be returned by DB, got {} rows instead".format(rowcount, self.db.rowcount))
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._lazy:
+            # The challenge was never loaded, so it can't be modified and no connection was opened
+            return
         # Auto save on force, don't save if the challenge has been reset (no winner)
         if self.force and self.winner:
             self.save()
-        self.db.close()
+        # The connection of a shared instance is handed back when the identity map is reset
+        if self.db is not None and self._owns_db and not self._mapped:
+            self.db.close()
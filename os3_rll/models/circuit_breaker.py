@@ -0,0 +1,77 @@
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+
+logger = getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops sending work to the database after it failed failure_threshold times in a row.
+    While the breaker is open calls fail fast, after reset_timeout seconds a single probe is let through (half open).
+    When the probe succeeds the breaker closes again, when it fails the breaker stays open for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        param int failure_threshold: Consecutive failures after which the breaker opens, 0 disables the breaker
+        param int reset_timeout: Seconds to fail fast before probing the database again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = Lock()
+
+    def allow(self):
+        """
+        returns bool: Whether a call may be sent to the database now
+        """
+        if not self.failure_threshold:
+            return True
+        now = monotonic()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                logger.info("Probing the database after the circuit breaker was open for {} seconds".format(self.reset_timeout))
+                self.state = HALF_OPEN
+                self._probe_started_at = now
+                return True
+            # Let another probe through when the previous one never reported back
+            if self.state == HALF_OPEN and now - self._probe_started_at >= self.reset_timeout:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Database is reachable again, closing the circuit breaker")
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self):
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                logger.error(
+                    "Database failed {} times in a row, failing fast for the next {} seconds".format(self.failures, self.reset_timeout)
+                )
+                self.state = OPEN
+                self.trips += 1
+                self._opened_at = monotonic()
+                self._probe_started_at = None
+
+    def get_statistics(self):
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
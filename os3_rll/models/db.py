@@ -1,66 +1,516 @@
-from pymysql import connect, MySQLError
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import partial
+from pymysql import MySQLError
 from logging import getLogger
+from threading import Lock
+from time import perf_counter
 
 from os3_rll.conf import settings
+from os3_rll.models.backends import load_backend
+from os3_rll.models.circuit_breaker import CircuitBreaker
+from os3_rll.models.instrumentation import query_registry
+from os3_rll.models.slow_query_log import is_explainable, log_slow_query
+from os3_rll.models.pool import ConnectionPool, PoolException
+from os3_rll.models.query_cache import CachedResult, QueryCache, get_tables, is_write
+from os3_rll.models.replicas import ReplicaRouter, is_read_only
+from os3_rll.models.statements import get_statement
 
 logger = getLogger(__name__)
 
+_backend = None
+_pool = None
+_replica_pools = {}
+_replica_router = None
+_circuit_breaker = None
+_query_cache = None
+_pool_lock = Lock()
+_current_unit_of_work = ContextVar("unit_of_work", default=None)
+
 
 class DBException(MySQLError):
     pass
 
 
-class Database:
+class DatabaseUnavailable(DBException):
+    """
+    Raised when the database can't be reached, or immediately while the circuit breaker is open
+    """
+
+
+def _create_connection(host=None):
+    if host is None:
+        logger.debug("Initializing connection to DB")
+        return get_backend().connect()
+    logger.debug("Initializing connection to DB replica {}".format(host))
+    return get_backend().connect(host=host)
+
+
+def get_backend():
+    """
+    Returns the storage backend configured in settings.DB_BACKEND
+    """
+    global _backend  # pylint: disable=global-statement
+    with _pool_lock:
+        if _backend is None:
+            _backend = load_backend()
+        return _backend
+
+
+def _new_connection_pool(factory):
+    return ConnectionPool(
+        factory,
+        max_size=settings.DB_POOL_SIZE,
+        idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+        max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+        checkout_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+    )
+
+
+def get_connection_pool(host=None):
+    """
+    Returns the process wide connection pool, creating it from the settings on first use
+    param str host: Returns the pool of this replica host instead of the pool of the primary
+    """
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if host is not None:
+            if host not in _replica_pools:
+                _replica_pools[host] = _new_connection_pool(partial(_create_connection, host))
+            return _replica_pools[host]
+        if _pool is None:
+            _pool = _new_connection_pool(_create_connection)
+        return _pool
+
+
+def get_replica_router():
+    """
+    Returns the router which spreads the read-only work over settings.DB_REPLICA_HOSTS
+    """
+    global _replica_router  # pylint: disable=global-statement
+    backend = get_backend()
+    with _pool_lock:
+        if _replica_router is None:
+            hosts = settings.DB_REPLICA_HOSTS if backend.supports_replicas else []
+            if settings.DB_REPLICA_HOSTS and not hosts:
+                logger.warning("The {} backend doesn't support replicas, ignoring DB_REPLICA_HOSTS".format(backend.name))
+            _replica_router = ReplicaRouter(
+                hosts,
+                read_your_writes_window=settings.DB_REPLICA_READ_YOUR_WRITES_WINDOW,
+                retry_after=settings.DB_REPLICA_RETRY_AFTER,
+            )
+        return _replica_router
+
+
+def get_circuit_breaker():
+    """
+    Returns the circuit breaker guarding the primary database
+    """
+    global _circuit_breaker  # pylint: disable=global-statement
+    with _pool_lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker(
+                failure_threshold=settings.DB_CIRCUIT_BREAKER_THRESHOLD, reset_timeout=settings.DB_CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+        return _circuit_breaker
+
+
+def get_query_cache():
+    """
+    Returns the process wide cache of the results of cacheable statements, sized by settings.DB_QUERY_CACHE_SIZE
+    """
+    global _query_cache  # pylint: disable=global-statement
+    with _pool_lock:
+        if _query_cache is None:
+            _query_cache = QueryCache(max_size=settings.DB_QUERY_CACHE_SIZE)
+        return _query_cache
+
+
+@contextmanager
+def guard_primary(backend):
+    """
+    Fails fast while the circuit breaker is open and reports the outcome of the work in the with block to it
+    Errors meaning the database is unavailable (and timeouts) are raised as DatabaseUnavailable
+    """
+    breaker = get_circuit_breaker()
+    if not breaker.allow():
+        raise DatabaseUnavailable("The database is unavailable, not trying again for now")
+    try:
+        yield
+    except PoolException as e:
+        breaker.record_failure()
+        raise DatabaseUnavailable(str(e))
+    except backend.Error as e:
+        if not backend.is_unavailable_error(e):
+            # The database answered, so it is available
+            breaker.record_success()
+            raise
+        breaker.record_failure()
+        raise DatabaseUnavailable("The database is unavailable: {}".format(e)) from e
+    breaker.record_success()
+
+
+def close_connection_pool():
+    """
+    Closes all idle connections and drops the process wide connection pools, replica router, circuit breaker, query cache and backend
+    """
+    global _pool, _backend, _replica_router, _circuit_breaker, _query_cache  # pylint: disable=global-statement
+    with _pool_lock:
+        pools = [_pool] + list(_replica_pools.values())
+        _pool, _backend, _replica_router, _circuit_breaker, _query_cache = None, None, None, None, None
+        _replica_pools.clear()
+    for pool in pools:
+        if pool is not None:
+            pool.close()
+
+
+def warm_up_connection_pool(size):
+    """
+    Opens connections to the primary until its pool holds size connections
+    returns int: The amount of connections opened
+    """
+    with guard_primary(get_backend()):
+        return get_connection_pool().fill(size)
+
+
+def check_database():
+    """
+    Runs a lightweight query on the primary
+    raises DatabaseUnavailable: When the database can't be reached
+    """
+    with Database(read_only=False) as db:
+        db.execute("SELECT 1")
+        db.fetchone()
+
+
+def explain_query(query, parameters=None):
+    """
+    Runs EXPLAIN for a query on a side connection outside of the pool, so it can't interfere with the running work
+    returns tuple: The rows returned by EXPLAIN
+    """
+    backend = get_backend()
+    connection = backend.connect()
+    try:
+        cursor = backend.cursor(connection)
+        cursor.execute(backend.explain(backend.translate(query)), parameters)
+        return cursor.fetchall()
+    finally:
+        connection.close()
+
+
+def get_current_unit_of_work():
     """
-    This class will make a connection to the Database defined in the settings
-    You can use this class in a with statement to let it automatically connect and close the connection
+    Returns the UnitOfWork active in the current context, or None
+    """
+    return _current_unit_of_work.get()
+
+
+class UnitOfWork:
+    """
+    Binds all Database instances created inside a with block to a single connection and transaction.
+    The transaction is committed once when the block exits cleanly and rolled back when it raises.
+    Calling commit() on a bound Database is deferred to the unit of work, so models and operations helpers don't need to know about it.
+    Nesting a unit of work joins the outer one, only the outermost unit of work commits.
+    The query cache is bypassed inside a unit of work, the tables written to are invalidated when it ends.
     """
 
     def __init__(self):
-        self.db_host = settings.DB_HOST
-        self.db_user = settings.DB_USER
-        self.db_pass = settings.DB_PASS
-        self.db_database = settings.DB_DATABASE
+        self.connection = None
+        self.joined = False
+        self.rolled_back = False
+        self.written_tables = set()
+        self._pool = None
+        self._pooled = None
+        self._token = None
+
+    def __enter__(self):
+        outer = get_current_unit_of_work()
+        if outer is not None:
+            logger.debug("Joining the active unit of work")
+            self.joined = True
+            self.connection = outer.connection
+            return self
+        self._pool = get_connection_pool()
+        with guard_primary(get_backend()):
+            self._pooled = self._pool.acquire()
+        self.connection = self._pooled.connection
+        self._token = _current_unit_of_work.set(self)
+        logger.debug("Started unit of work")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.joined:
+            return
+        _current_unit_of_work.reset(self._token)
+        try:
+            if exc_type is None:
+                logger.debug("Committing unit of work to stable storage")
+                self.connection.commit()
+                get_replica_router().record_write()
+            else:
+                logger.warning("Rolling back unit of work because of {}".format(exc_type.__name__))
+                self.rolled_back = True
+                self.connection.rollback()
+        finally:
+            get_query_cache().invalidate(self.written_tables)
+            self._pool.release(self._pooled)
+            self._pooled = None
+
+
+class Database:
+    """
+    This class will check out a connection to the Database defined in the settings from the connection pool
+    You can use this class in a with statement to let it automatically connect and hand the connection back
+    When a UnitOfWork is active the connection of the unit of work is used instead
+    Read-only work is sent to one of the replicas in settings.DB_REPLICA_HOSTS, unless the current user has just written
+    Results of cacheable statements are served from the query cache, see os3_rll.models.query_cache
+    """
+
+    def __init__(self, read_only=None):
+        """
+        param bool read_only: Whether this instance only reads and may use a replica, defaults to True inside a read_only() block
+        """
+        self.backend = get_backend()
+        self.read_only = is_read_only() if read_only is None else read_only
+        self.host = None
+        self._pool = get_connection_pool()
+        self._pooled = None
+        self.unit_of_work = get_current_unit_of_work()
         self.db = self.connect()
-        self.cursor = self.db.cursor()
+        self.cursor = self.backend.cursor(self.db)
+        # The rows of the last statement when it was served from the query cache
+        self._result = None
+        # Tables written to by this instance which haven't been committed yet
+        self._written_tables = set()
 
     def __enter__(self):
         return self
 
     def connect(self):
-        logger.debug("Initializing connection to DB")
-        return connect(self.db_host, self.db_user, self.db_pass, self.db_database)
+        if self.unit_of_work is not None:
+            return self.unit_of_work.connection
+        if self.read_only and self._connect_replica():
+            return self._pooled.connection
+        with guard_primary(self.backend):
+            self._pooled = self._pool.acquire()
+        return self._pooled.connection
+
+    def _connect_replica(self):
+        """
+        Check out a connection to a replica
+        returns bool: False when the read should go to the primary instead
+        """
+        router = get_replica_router()
+        host = router.choose()
+        if host is None:
+            return False
+        pool = get_connection_pool(host)
+        try:
+            self._pooled = pool.acquire()
+        except (PoolException, self.backend.Error) as e:
+            logger.warning("Unable to connect to DB replica {}: {}".format(host, e))
+            router.mark_down(host)
+            return False
+        self._pool = pool
+        self.host = host
+        return True
+
+    def _guard(self):
+        if self.host is not None:
+            # Unavailable replicas are handled by the replica router, they shouldn't stop the work on the primary
+            return nullcontext()
+        return guard_primary(self.backend)
 
     def execute(self, query):
-        self.cursor.execute(query)
+        self._result = None
+        self._track_write(query)
+        start = perf_counter()
+        with self._guard():
+            self.cursor.execute(self.backend.translate(query))
+        self._record(query, None, perf_counter() - start, self.cursor.rowcount)
 
-    def execute_prepared_statement(self, query, parameters):
+    def execute_prepared_statement(self, query, parameters, cache=False):
         """
         Execute a prepared statement on the DB
         :param str query: The SQL query in question (use %s for the placeholders)
         :param tuple parameters: The variables to place on the %s placeholders
+        :param bool cache: Serve the result from the query cache, only use this for reads
+        """
+        self._result = None
+        self._track_write(query)
+        if cache and self._use_query_cache():
+            self._execute_cached(query, parameters, get_tables(query), partial(self._execute_prepared_statement, query, parameters))
+        else:
+            self._execute_prepared_statement(query, parameters)
+
+    def _execute_prepared_statement(self, query, parameters):
+        start = perf_counter()
+        with self._guard():
+            self.cursor.execute(self.backend.translate(query), parameters)
+        self._record(query, parameters, perf_counter() - start, self.cursor.rowcount)
+
+    def execute_statement(self, name, parameters=None):
+        """
+        Execute a statement from the statement registry (os3_rll.models.statements)
+        The results of cacheable statements are served from the query cache
+        :param str name: The name the statement is registered under
+        :param tuple parameters: The variables to place on the %s placeholders
+        """
+        statement = get_statement(name)
+        self._result = None
+        self._track_write(statement.sql)
+        if statement.cacheable and self._use_query_cache():
+            self._execute_cached(statement.sql, parameters, statement.tables, partial(self._execute_statement, statement, parameters))
+        else:
+            self._execute_statement(statement, parameters)
+
+    def _execute_statement(self, statement, parameters):
+        start = perf_counter()
+        with self._guard():
+            self.backend.execute_statement(self.db, self.cursor, statement, parameters)
+        self._record(statement.sql, parameters, perf_counter() - start, self.cursor.rowcount)
+
+    def _use_query_cache(self):
+        # Inside a unit of work, or after an uncommitted write, the reads may see data other connections can't see yet
+        # A replica may lag behind the primary, its rows must neither be cached nor be served from the cache
+        return self.unit_of_work is None and self.host is None and not self._written_tables and get_query_cache().enabled
+
+    def _execute_cached(self, query, parameters, tables, execute):
+        """
+        Serve the rows of a read from the query cache, executing it and caching the rows on a miss
+        """
+        cache = get_query_cache()
+        parameters = tuple(parameters) if parameters is not None else None
+        rows = cache.get(query, parameters)
+        if rows is None:
+            # Take the versions before executing, so a write racing with the query invalidates the result
+            versions = cache.get_versions(tables)
+            execute()
+            rows = tuple(self.cursor.fetchall())
+            cache.set(query, parameters, versions, rows)
+        self._result = CachedResult(rows)
+
+    def _track_write(self, query):
+        """
+        Invalidate the cached results of the tables a write touches, they are invalidated again once the write is committed
+        """
+        if not is_write(query):
+            return
+        tables = get_tables(query)
+        get_query_cache().invalidate(tables)
+        if self.unit_of_work is not None:
+            self.unit_of_work.written_tables.update(tables)
+        else:
+            self._written_tables.update(tables)
+
+    def iter_statement(self, name, parameters=None, batch_size=100):
+        """
+        Stream the rows of a statement from the statement registry, see iter_rows
+        """
+        return self.iter_rows(get_statement(name).sql, parameters, batch_size=batch_size)
+
+    def iter_rows(self, query, parameters=None, batch_size=100):
+        """
+        Stream the rows of a query using an unbuffered cursor, so large results are processed in constant memory
+        The connection is busy until the generator is exhausted or closed, don't execute other queries on this instance meanwhile
+        :param str query: The SQL query in question (use %s for the placeholders)
+        :param tuple parameters: The variables to place on the %s placeholders
+        :param int batch_size: The amount of rows to fetch from the server at once
+        """
+        cursor = self.backend.streaming_cursor(self.db)
+        # Only the time spent on the database counts, not the time the consumer spends between the rows
+        duration = 0.0
+        streamed = 0
+        try:
+            start = perf_counter()
+            with self._guard():
+                cursor.execute(self.backend.translate(query), parameters)
+            duration += perf_counter() - start
+            while True:
+                start = perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                duration += perf_counter() - start
+                if not rows:
+                    break
+                streamed += len(rows)
+                yield from rows
+        finally:
+            cursor.close()
+            self._record(query, parameters, duration, streamed)
+
+    def _record(self, query, parameters, duration, rows):
+        query_registry.record(query, duration, rows)
+        threshold = settings.DB_SLOW_QUERY_THRESHOLD
+        if threshold is None or duration < threshold:
+            return
+        explain = None
+        if settings.DB_SLOW_QUERY_EXPLAIN and is_explainable(query):
+            try:
+                explain = explain_query(query, parameters)
+            except self.backend.Error as e:
+                logger.warning("Unable to EXPLAIN slow query: {}".format(e))
+        log_slow_query(query, parameters, duration, explain=explain)
+
+    @property
+    def closed(self):
         """
-        self.cursor.execute(query, parameters)
+        True once the connection has been handed back to the pool, a Database bound to a unit of work is never closed
+        """
+        return self._pooled is None and self.unit_of_work is None
 
     @property
     def rowcount(self):
+        if self._result is not None:
+            return self._result.rowcount
         return self.cursor.rowcount
 
     def commit(self):
+        if self.unit_of_work is not None:
+            logger.debug("Deferring commit to the active unit of work")
+            return
         self.db.commit()
+        if self.host is None:
+            get_replica_router().record_write()
+        self._invalidate_written_tables()
+
+    def _invalidate_written_tables(self):
+        if self._written_tables:
+            get_query_cache().invalidate(self._written_tables)
+            self._written_tables = set()
 
     def fetchall(self):
+        if self._result is not None:
+            return self._result.fetchall()
         return self.cursor.fetchall()
 
     def fetchone(self):
+        if self._result is not None:
+            return self._result.fetchone()
         return self.cursor.fetchone()
 
     def close(self):
         """
-        Call this function when you are done with this instance
+        Call this function when you are done with this instance, the connection is returned to the pool
+        Calling close more then once is harmless
         """
-        logger.debug("Closing connection to DB")
-        self.db.close()
+        if self._pooled is None:
+            if self.unit_of_work is not None:
+                self.cursor.close()
+            return
+        pooled, self._pooled = self._pooled, None
+        # Uncommitted writes are rolled back by the pool
+        self._invalidate_written_tables()
+        logger.debug("Returning connection to the pool")
+        try:
+            self.cursor.close()
+        except self.backend.Error:
+            pass
+        self._pool.release(pooled)
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
+
+    def __del__(self):
+        # Models don't always close their Database, make sure the connection finds its way back to the pool
+        if getattr(self, "_pooled", None) is not None:
+            self.close()
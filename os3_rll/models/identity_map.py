@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from threading import Lock
+
+from os3_rll.models.db import Database, get_current_unit_of_work
+from os3_rll.models.replicas import is_read_only
+
+logger = getLogger(__name__)
+
+_current_identity_map = ContextVar("identity_map", default=None)
+
+
+def get_current_identity_map():
+    """
+    Returns the IdentityMap active in the current context, or None
+    """
+    return _current_identity_map.get()
+
+
+def set_identity_map():
+    """
+    Start an identity map for the current context, the models loaded from here on are shared until it is reset
+    returns: A token which can be passed to reset_identity_map
+    """
+    return _current_identity_map.set(IdentityMap())
+
+
+def reset_identity_map(token):
+    """
+    Stop the identity map started by set_identity_map
+    returns IdentityMap: The identity map that was active, close() it to hand the connections of its instances back
+    """
+    identity_map = _current_identity_map.get()
+    _current_identity_map.reset(token)
+    return identity_map
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Share the models loaded inside the with block, loading the same row twice returns the same instance
+    """
+    token = set_identity_map()
+    try:
+        yield get_current_identity_map()
+    finally:
+        reset_identity_map(token).close()
+
+
+def _is_rolled_back(instance):
+    if instance.__dict__.get("_lazy") or instance.db is None:
+        return False
+    return instance.db.unit_of_work is not None and instance.db.unit_of_work.rolled_back
+
+
+def _attach(instance):
+    """
+    Give an instance handed out again a Database that is usable in the current context
+    Its connection may have been closed, belong to a unit of work which has ended or be a replica while we now need the primary
+    """
+    if instance.__dict__.get("_lazy") or instance.db is None or not instance._owns_db:  # pylint: disable=protected-access
+        return
+    db = instance.db
+    if db.closed or db.unit_of_work is not get_current_unit_of_work() or (db.read_only and not is_read_only()):
+        db.close()
+        instance.db = Database()
+
+
+class IdentityMap:
+    """
+    The Player and Challenge instances loaded while handling a single command (or background task)
+    The instances are kept until the identity map is reset, so their changes are seen by every later lookup in the same scope.
+    Changes made to their rows by plain statements (like player.shift_ranks_down) are not reflected in the loaded instances.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._instances = {}
+        self.hits = 0
+
+    def get(self, cls, i, force=False):
+        """
+        Returns the loaded instance of cls with id i, or None
+        param bool force: The force parameter of the instance, instances loaded with and without force are not shared
+        """
+        key = (cls, int(i), force)
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                return None
+            if _is_rolled_back(instance):
+                # What the instance holds may not have been stored after all, forget it so it is loaded again
+                logger.debug("Dropping the {} with id {} loaded in a unit of work that was rolled back".format(cls.__name__, i))
+                del self._instances[key]
+                return None
+            self.hits += 1
+        logger.debug("Reusing the loaded {} with id {}".format(cls.__name__, i))
+        _attach(instance)
+        return instance
+
+    def add(self, instance):
+        """
+        Add a loaded instance, when another thread added the same row in the meantime that instance is returned instead
+        """
+        key = (type(instance), int(instance.id), instance.force)
+        with self._lock:
+            instance = self._instances.setdefault(key, instance)
+        object.__setattr__(instance, "_mapped", True)
+        return instance
+
+    def __len__(self):
+        return len(self._instances)
+
+    def close(self):
+        """
+        Hand the connections of all instances back to the pool
+        """
+        with self._lock:
+            instances, self._instances = list(self._instances.values()), {}
+        for instance in instances:
+            if not instance.__dict__.get("_lazy") and instance.db is not None and instance._owns_db:  # pylint: disable=protected-access
+                instance.db.close()
+
+
+class IdentityMapped(type):
+    """
+    Metaclass of the models, while an identity map is active Model(id) returns the instance loaded before instead of a new one
+    Only instances loaded by id on a connection of their own are shared, new, offline and prefilled instances never are
+    """
+
+    def __call__(cls, i=0, force=False, offline=False, db=None, *args, **kwargs):
+        identity_map = get_current_identity_map()
+        # Prefilled instances (player_info or challenge_info) are not shared, lazy ones are
+        prefilled = args or any(value is not None for key, value in kwargs.items() if key != "lazy")
+        if identity_map is None or not i or offline or db is not None or prefilled:
+            return super().__call__(i, force, offline, db, *args, **kwargs)
+        instance = identity_map.get(cls, i, force)
+        if instance is None:
+            instance = identity_map.add(super().__call__(i, force, offline, db, **kwargs))
+        return instance
@@ -0,0 +1,153 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from logging import getLogger
+from threading import Lock
+
+logger = getLogger(__name__)
+
+_current_command = ContextVar("command", default=None)
+
+_string_literal = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_number_literal = re.compile(r"(?<![\w`])\d+(?:\.\d+)?(?![\w`])")
+_placeholder = re.compile(r"%s")
+_value_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_whitespace = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query):
+    """
+    Normalize a SQL statement so statements that only differ in their values are grouped together
+    Literals and placeholders are replaced by ?, lists of values by (...) and whitespace is collapsed
+
+    param str query: The SQL statement
+    returns str: The fingerprint of the statement
+    """
+    query = _string_literal.sub("?", query)
+    query = _number_literal.sub("?", query)
+    query = _placeholder.sub("?", query)
+    query = _value_list.sub("(...)", query)
+    return _whitespace.sub(" ", query).strip()
+
+
+def get_current_command():
+    """
+    Returns the name of the command (or background task) the current code is running for, or None
+    """
+    return _current_command.get()
+
+
+def set_current_command(command):
+    """
+    Attribute all statements executed from the current context to command
+    returns: A token which can be passed to reset_current_command
+    """
+    return _current_command.set(command)
+
+
+def reset_current_command(token):
+    _current_command.reset(token)
+
+
+@contextmanager
+def command_scope(command):
+    """
+    Attribute all statements executed inside the with block to command
+    """
+    token = set_current_command(command)
+    try:
+        yield
+    finally:
+        reset_current_command(token)
+
+
+class StatementStatistics:
+    """
+    The accumulated statistics of all statements sharing a fingerprint
+    """
+
+    def __init__(self, statement):
+        self.fingerprint = statement
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.commands = Counter()
+
+    @property
+    def average_time(self):
+        return self.total_time / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_time": self.total_time,
+            "average_time": self.average_time,
+            "max_time": self.max_time,
+            "rows": self.rows,
+            "commands": dict(self.commands),
+        }
+
+
+class QueryRegistry:
+    """
+    In-process registry of the statements executed on the database, grouped by fingerprint
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._statements = {}
+
+    def record(self, query, duration, rows, command=None):
+        """
+        Record the execution of a statement
+        param str query: The executed SQL statement
+        param float duration: How long the statement took in seconds
+        param int rows: The amount of rows returned or affected by the statement
+        param str command: The command the statement was executed for, defaults to the command of the current context
+        """
+        statement = fingerprint(query)
+        if command is None:
+            command = get_current_command()
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStatistics(statement)
+            stats.count += 1
+            stats.total_time += duration
+            stats.max_time = max(stats.max_time, duration)
+            # DB-API cursors report -1 or None when the row count is unknown
+            if isinstance(rows, int) and rows > 0:
+                stats.rows += rows
+            stats.commands[command] += 1
+
+    def top(self, n=10, order_by="total_time"):
+        """
+        Returns the statistics of the top n statements
+        param int n: The amount of statements to return
+        param str order_by: The statistic to order by, one of total_time, average_time, max_time, count or rows
+        returns list: of dicts with the statistics of each statement
+        """
+        with self._lock:
+            statements = [stats.as_dict() for stats in self._statements.values()]
+        if statements and order_by not in statements[0]:
+            raise KeyError("Unknown statistic to order by: {}".format(order_by))
+        return sorted(statements, key=lambda stats: stats[order_by], reverse=True)[:n]
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+query_registry = QueryRegistry()
+
+
+def get_top_statements(n=10, order_by="total_time"):
+    """
+    Returns the statistics of the top n statements executed by this process, see QueryRegistry.top
+    """
+    return query_registry.top(n=n, order_by=order_by)
@@ -1,37 +1,63 @@
+from contextlib import nullcontext
 from datetime import datetime
 from logging import getLogger
 from hashlib import sha256
 
 from os3_rll.models.db import Database
+from os3_rll.models.identity_map import IdentityMapped, get_current_identity_map
+from os3_rll.models.statements import PLAYER_GET_INFO_MANY, get_batch_statement, get_update_statement
 from os3_rll.operations.utils import get_max_rank
 
 logger = getLogger(__name__)
 
+# The columns of the users table a Player model writes, in the order player.get_info returns them
+COLUMNS = ("name", "rank", "gamertag", "discord", "wins", "losses", "challenged", "timeout")
+
 
 class PlayerException(RuntimeError):
     pass
 
 
-class Player:
+class Player(metaclass=IdentityMapped):
     """
     A model of a player in the Database. This class holds all the relevant information in the Database and allows the
     operator to change them.
 
     This class will hold a local copy of the Player object.
-    When self.save() is called the changes are written to the database
+    When self.save() is called the changes are written to the database, only the modified columns are updated
+    Every update increments the version of the row, so a save detects concurrent updates without reading the row again
     If this class is called in a with block it will save the object automatically if force is set to True
+    A lazy player only knows its id until another attribute is used, code that only passes ids around can use it for free
+    While an identity map is active loading the same player twice returns the same instance, see os3_rll.models.identity_map
     """
 
-    def __init__(self, i=0, force=False, offline=False):
+    # Set by the identity map on the instances it shares, see os3_rll.models.identity_map
+    _mapped = False
+
+    def __init__(self, i=0, force=False, offline=False, db=None, player_info=None, lazy=False):
         """
         param int id: The id of the player to assign this instance to. 0 means a new player.
         param bool force: Set the force parameter to True to enable certain (dangerous) operations,
             Like auto-saving on __exit__, overwriting changed DB values or deleting a player
         param bool offline: Do not make a connection to the Database (can be used for fixtures)
+        param os3_rll.models.db.Database db: Use this Database instead of opening one, it is not closed by this instance
+        param tuple player_info: The row returned by player.get_info for this player, so it doesn't have to be queried
+        param bool lazy: Defer connecting to the Database and loading the player until an attribute other than the id is used
         """
-        self.offline = offline
-        self.db = None if offline else Database()
         self._id = i
+        self.force = force  # Force save when closing
+        self.offline = offline
+        self._new = self._id == 0
+        if lazy and not self._new and not offline and player_info is None:
+            self._lazy_db = db
+            self._lazy = True
+            return
+        self._lazy = False
+        self._load(db, player_info)
+
+    def _load(self, db, player_info):
+        self._owns_db = db is None
+        self.db = db if db is not None else None if self.offline else Database()
         self._name = None
         self._rank = 0
         self._gamertag = None
@@ -41,14 +67,75 @@ class Player:
         self._challenged = 0
         self._timeout = 0
         self._password = None
-        self.force = force  # Force save when closing
-        self._new = self._id == 0
+        self._version = 0
         self.original = ()
-        self.reload_player_info()
+        self._loaded = {}
+        self.reload_player_info(player_info)
+
+    def _load_lazy(self):
+        logger.debug("Loading lazy player with id {}".format(self._id))
+        db = self.__dict__.pop("_lazy_db")
+        object.__setattr__(self, "_lazy", False)
+        self._load(db, None)
+
+    def __getattr__(self, name):
+        # Only called for attributes which aren't set, on a lazy player that is everything but the id and the flags
+        if not self.__dict__.get("_lazy"):
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        self._load_lazy()
+        return getattr(self, name)
+
+    def __setattr__(self, name, value):
+        # Load a lazy player before it is modified, so the change isn't overwritten by the loaded values
+        if self.__dict__.get("_lazy"):
+            self._load_lazy()
+        super().__setattr__(name, value)
+
+    @property
+    def loaded(self):
+        """
+        False as long as a lazy player hasn't been loaded from the Database
+        """
+        return not self._lazy
 
     def __enter__(self):
         return self
 
+    @classmethod
+    def load_many(cls, ids, force=False, db=None):
+        """
+        Load many players with a single query
+        param list ids: The ids of the players to load
+        param bool force: Passed on to every player, see __init__
+        param os3_rll.models.db.Database db: Load the players with this Database and let them share it, so they can be saved.
+            When not passed the players are loaded on a connection of their own and returned offline, they can only be read.
+            Those already loaded in the active identity map are returned as they are
+        returns list: The players in the order of ids
+        raises PlayerException: When one of the players doesn't exist
+        """
+        ids = [int(i) for i in ids]
+        # The players already loaded in the active identity map are reused instead of queried again
+        identity_map = get_current_identity_map() if db is None else None
+        loaded = {}
+        if identity_map is not None:
+            for i in ids:
+                instance = identity_map.get(cls, i, force)
+                if instance is not None:
+                    loaded[i] = instance
+        rows = {}
+        ids_to_load = [i for i in ids if i not in loaded]
+        if not ids_to_load:
+            return [loaded[i] for i in ids]
+        with Database() if db is None else nullcontext(db) as database:
+            statement, parameters = get_batch_statement("player.get_info_many", PLAYER_GET_INFO_MANY, ids_to_load)
+            database.execute_statement(statement.name, parameters)
+            for row in database.fetchall():
+                rows[row[0]] = row[1:]
+        missing = [i for i in ids_to_load if i not in rows]
+        if missing:
+            raise PlayerException("Players with ids {} not found".format(", ".join(str(i) for i in missing)))
+        return [loaded[i] if i in loaded else cls(i, force=force, offline=db is None, db=db, player_info=rows[i]) for i in ids]
+
     @staticmethod
     def get_player_id_by_username(username, discord_name=False):
         """
@@ -56,18 +143,20 @@ class Player:
         param str username: The username to search for
         param bool discord_name: Search for discord_name instead of gamertag
         """
-        row_name = "discord" if discord_name else "gamertag"
         with Database() as db:
-            db.execute_prepared_statement("SELECT `id` FROM `users` WHERE {}=%s".format(row_name), (username,))
+            db.execute_statement("player.id_by_discord" if discord_name else "player.id_by_gamertag", (username,))
             if db.rowcount != 1:
                 raise PlayerException("Player not found, or to many players found")
             return db.fetchone()[0]
 
-    def reload_player_info(self):
+    def reload_player_info(self, player_info=None):
         """
         Fills the local variables with info from the DB if needed and sets a timeout object
+        param tuple player_info: Use this row returned by player.get_info instead of querying the DB
         """
-        if not self.offline and not self._new:
+        if player_info is None and not self.offline and not self._new:
+            player_info = self.get_player_info_from_db()
+        if player_info is not None:
             (
                 self._name,
                 self._rank,
@@ -77,12 +166,22 @@ class Player:
                 self._losses,
                 self._challenged,
                 self._timeout,
-            ) = self.get_player_info_from_db()
-        self.original = (self._name, self._rank, self._gamertag, self._discord, self._wins, self._losses, self._challenged, self._timeout)
-        if self._timeout:
-            self.timeout = datetime.fromtimestamp(self._timeout)
-        else:
-            self.timeout = datetime.now()
+                self._version,
+            ) = player_info
+        self.original = (
+            self._name,
+            self._rank,
+            self._gamertag,
+            self._discord,
+            self._wins,
+            self._losses,
+            self._challenged,
+            self._timeout,
+            self._version,
+        )
+        self._loaded_at = datetime.now()
+        self.timeout = self._timeout_from_db(self._timeout)
+        self._loaded = self._get_column_values()
         if self.offline:
             logger.debug("Offline mode, skipping database calls")
 
@@ -188,50 +287,99 @@ class Player:
         if self._new:
             self._save_new_player()
         else:
-            if self.check_if_player_info_has_changed():
-                if self.force:
-                    logger.warning("Database info has changed between the creation of this instance and now, " "forcing save")
-                else:
-                    raise PlayerException(
-                        "Database info has changed between the creation of this instance and now, " "retry of force instead"
-                    )
-            self._save_existing_player_model()
+            columns = self.get_changed_columns()
+            if not columns and not self._password:
+                logger.debug("Player with id {} has not been modified, nothing to save".format(self._id))
+                return
+            self._save_existing_player_model(columns)
         logger.debug("Committing player model change to stable storage")
         self.db.commit()
 
+    def get_changed_columns(self):
+        """
+        Returns the columns modified since the player was loaded or last saved
+        returns tuple: The names of the columns, in the order of COLUMNS
+        """
+        values = self._get_column_values()
+        return tuple(column for column in COLUMNS if values[column] != self._loaded[column])
+
+    def _resolve_conflict(self, columns):
+        """
+        Called when the player has been updated by someone else since it was loaded or last saved
+        Changes made by others to the columns this instance doesn't modify are kept
+        param tuple columns: The columns this instance is updating
+        returns int: The current version of the player to retry the update with
+        raises PlayerException: When one of columns has been changed as well and force isn't set
+        """
+        player_info = self.get_player_info_from_db()
+        stored = self._get_column_values(player_info)
+        if any(stored[column] != self._loaded[column] for column in columns if column in self._loaded):
+            if not self.force:
+                raise PlayerException("Database info has changed between the creation of this instance and now, " "retry of force instead")
+            logger.warning("Database info has changed between the creation of this instance and now, " "forcing save")
+        return player_info[-1]
+
+    def _timeout_from_db(self, timestamp):
+        """
+        Converts the timeout column to a datetime, a player without a timeout (a zero date) gets the time it was loaded at
+        param int timestamp: The timeout as returned by player.get_info
+        returns datetime.datetime: The timeout
+        """
+        return datetime.fromtimestamp(timestamp) if timestamp else self._loaded_at
+
+    def _get_column_values(self, player_info=None):
+        """
+        Returns the values of the columns as this model holds them
+        param tuple player_info: Convert this row returned by player.get_info instead of the current values
+        returns dict: {str column: value}
+        """
+        if player_info is not None:
+            values = dict(zip(COLUMNS, player_info))
+            values["timeout"] = self._timeout_from_db(values["timeout"]).replace(microsecond=0)
+            return values
+        values = {column: getattr(self, "_" + column) for column in COLUMNS}
+        # The database stores the timeout with a precision of seconds
+        if isinstance(self._timeout, datetime):
+            values["timeout"] = self._timeout.replace(microsecond=0)
+        return values
+
     def delete(self):
         """
         Delete the player associated this instance
+        Players who played challenges (including archived ones) can't be deleted, the challenges still refer to them
+        raises PlayerException: When the player has challenges
         """
         if not self.force:
             raise PlayerException("Deleting a player requires the force parameter to be set")
         if self._new:
             raise PlayerException("A new player instance cannot be deleted")
         logger.info("Deleting player with id {}".format(self._id))
-        self.db.execute_prepared_statement("DELETE FROM `users` WHERE `id`=%s", (self._id,))
+        try:
+            self.db.execute_statement("player.delete", (self._id,))
+        except self.db.backend.IntegrityError as e:
+            raise PlayerException("Player with id {} has challenges and can't be deleted".format(self._id)) from e
         self.db.commit()
 
-    def _save_existing_player_model(self):
-        logger.info("Updating DB for player with id {}".format(self._id))
-        self.db.execute_prepared_statement(
-            "UPDATE `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `wins`=%s, `losses`=%s, "
-            "`challenged`=%s, `timeout`=%s WHERE `id`=%s",
-            (
-                self._name,
-                self._gamertag,
-                self._discord,
-                self._rank,
-                self._wins,
-                self._losses,
-                self._challenged,
-                self._timeout.strftime("%Y-%m-%d %H:%M:%S"),
-                self._id,
-            ),
-        )
+    def _save_existing_player_model(self, columns):
+        values = self._get_column_values()
+        values["timeout"] = self._timeout.strftime("%Y-%m-%d %H:%M:%S")
         # Check if password is updated
         if self._password:
             logger.info("Updating player password")
-            self.db.execute_prepared_statement("UPDATE `users` SET `password`=%s WHERE `id`=%s", (self._password, self._id))
+            columns += ("password",)
+            values["password"] = self._password
+        logger.info("Updating {} in DB for player with id {}".format(", ".join(columns), self._id))
+        statement = get_update_statement("player", "users", columns)
+        parameters = tuple(values[column] for column in columns) + (self._id,)
+        self.db.execute_statement(statement.name, parameters + (self._version,))
+        if self.db.rowcount == 0:
+            self._version = self._resolve_conflict(columns)
+            self.db.execute_statement(statement.name, parameters + (self._version,))
+            if self.db.rowcount == 0:
+                raise PlayerException("Player with id {} is being updated by someone else, retry instead".format(self._id))
+        self._version += 1
+        self._password = None
+        self._loaded = self._get_column_values()
 
     def _save_new_player(self):
         # Check if any of the required vars is None
@@ -240,8 +388,8 @@ class Player:
                 "Unable to save player object without required properties, please provide name, gamertag, discord and password"
             )
         logger.info("Inserting new player into DB")
-        self.db.execute_prepared_statement(
-            "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `password`=%s, `timeout`=%s",
+        self.db.execute_statement(
+            "player.insert",
             (self._name, self._gamertag, self._discord, self.rank, self._password, self._timeout),
         )
 
@@ -259,15 +407,16 @@ class Player:
 
     def get_player_info_from_db(self):
         logger.debug("Getting player info for player with id {} from db".format(self._id))
-        self.db.execute_prepared_statement(
-            "SELECT `name`, `rank`, `gamertag`, `discord`, `wins`, `losses`, `challenged`, UNIX_TIMESTAMP(`timeout`) "
-            "FROM `users` WHERE `id`=%s",
-            (self._id,),
-        )
+        self.db.execute_statement("player.get_info", (self._id,))
         self.check_row_count()
         return self.db.fetchone()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._lazy:
+            # The player was never loaded, so it can't be modified and no connection was opened
+            return
         if self.force:
             self.save()
-        self.db.close()
+        # The connection of a shared instance is handed back when the identity map is reset
+        if self.db is not None and self._owns_db and not self._mapped:
+            self.db.close()
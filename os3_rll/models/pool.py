@@ -0,0 +1,172 @@
+from collections import deque
+from logging import getLogger
+from threading import Condition
+from time import monotonic
+
+logger = getLogger(__name__)
+
+
+class PoolException(RuntimeError):
+    pass
+
+
+class PooledConnection:
+    """
+    A connection checked out of the ConnectionPool, keeps track of the age of the connection
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of database connections.
+    Connections are created on demand until max_size is reached, after which acquire() waits for a connection to be released.
+    Connections that have been idle for longer then idle_timeout, or that are older then max_lifetime are closed instead of reused.
+    """
+
+    def __init__(self, factory, max_size=10, idle_timeout=300, max_lifetime=3600, checkout_timeout=10):
+        """
+        param callable factory: Function which returns a new DB-API connection
+        param int max_size: The maximum number of connections this pool will open
+        param int idle_timeout: Seconds a connection may sit unused in the pool before it is closed
+        param int max_lifetime: Seconds after which a connection is closed regardless of use
+        param int checkout_timeout: Seconds to wait for a free connection before giving up
+        """
+        if max_size < 1:
+            raise PoolException("The pool size should be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._lock = Condition()
+
+    @property
+    def size(self):
+        """
+        The amount of connections currently opened by this pool (idle and checked out)
+        """
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def _is_expired(self, pooled, now):
+        if self.max_lifetime and now - pooled.created_at > self.max_lifetime:
+            return True
+        return bool(self.idle_timeout and now - pooled.last_used > self.idle_timeout)
+
+    def acquire(self):
+        """
+        Check a connection out of the pool, opening a new one if there is room for it
+        returns PooledConnection: The connection to use, hand it back with release() when done
+        raises PoolException: When no connection became available within checkout_timeout
+        """
+        deadline = monotonic() + self.checkout_timeout
+        expired = []
+        try:
+            with self._lock:
+                while True:
+                    now = monotonic()
+                    while self._idle:
+                        pooled = self._idle.pop()
+                        if self._is_expired(pooled, now):
+                            self._size -= 1
+                            expired.append(pooled)
+                            continue
+                        return pooled
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolException("Timed out waiting for a free database connection, all {} are in use".format(self.max_size))
+                    self._lock.wait(remaining)
+        finally:
+            for pooled in expired:
+                self._close(pooled)
+
+        logger.debug("Opening new pooled connection to DB ({}/{})".format(self._size, self.max_size))
+        try:
+            return PooledConnection(self.factory())
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def fill(self, count):
+        """
+        Open new connections until the pool holds count connections, so the first calls don't have to wait for them
+        param int count: The amount of connections to open, capped at max_size
+        returns int: The amount of connections opened
+        """
+        opened = 0
+        while True:
+            with self._lock:
+                if self._closed or self._size >= min(count, self.max_size):
+                    return opened
+                self._size += 1
+            try:
+                pooled = PooledConnection(self.factory())
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self._idle.append(pooled)
+                self._lock.notify()
+            opened += 1
+
+    def release(self, pooled, discard=False):
+        """
+        Hand a connection back to the pool, any uncommitted work on it is rolled back
+        param PooledConnection pooled: The connection to return
+        param bool discard: Close the connection instead of returning it to the pool
+        """
+        if not discard:
+            try:
+                pooled.connection.rollback()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Unable to reset pooled connection, discarding it: {}".format(e))
+                discard = True
+        now = monotonic()
+        pooled.last_used = now
+        with self._lock:
+            if discard or self._closed or self._is_expired(pooled, now):
+                self._size -= 1
+            else:
+                self._idle.append(pooled)
+                pooled = None
+            self._lock.notify()
+        if pooled is not None:
+            self._close(pooled)
+
+    def close(self):
+        """
+        Close all idle connections and stop pooling, connections that are still checked out are closed on release
+        """
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for pooled in idle:
+            self._close(pooled)
+
+    @staticmethod
+    def _close(pooled):
+        logger.debug("Closing pooled connection to DB")
+        try:
+            pooled.connection.close()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("Ignoring error while closing connection: {}".format(e))
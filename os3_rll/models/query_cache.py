@@ -0,0 +1,138 @@
+import re
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+logger = getLogger(__name__)
+
+_table_reference = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+`?(\w+)`?", re.IGNORECASE)
+_write = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|ALTER|DROP|CREATE|TRUNCATE)\b", re.IGNORECASE)
+
+
+def get_tables(query):
+    """
+    Returns the tables a SQL statement reads from or writes to
+
+    param str query: The SQL statement (MySQL dialect)
+    returns frozenset: The names of the tables
+    """
+    return frozenset(table.lower() for table in _table_reference.findall(query))
+
+
+def is_write(query):
+    return bool(_write.match(query))
+
+
+class CachedResult:
+    """
+    The rows of a cached query, read like a (buffered) cursor
+    """
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._position = 0
+        self.rowcount = len(rows)
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchall(self):
+        rows, self._position = self._rows[self._position :], len(self._rows)
+        return rows
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results, keyed by the query and its parameters
+    Every table has a version counter which is bumped by writes to it, a cached result is only served when none of the
+    tables it was read from has been written to since
+    """
+
+    def __init__(self, max_size=256):
+        """
+        param int max_size: The maximum amount of results to keep, 0 disables the cache
+        """
+        self.max_size = max_size
+        self._lock = Lock()
+        self._results = OrderedDict()
+        self._versions = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get_versions(self, tables):
+        """
+        Returns the current versions of tables, take them before running a query and pass them to set()
+        """
+        with self._lock:
+            return tuple(sorted((table, self._versions.get(table, 0)) for table in tables))
+
+    def get(self, query, parameters):
+        """
+        returns tuple: The cached rows of the query, or None when they aren't cached or a table has been written to since
+        """
+        key = (query, parameters)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                versions, rows = entry
+                if all(self._versions.get(table, 0) == version for table, version in versions):
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    return rows
+                del self._results[key]
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def set(self, query, parameters, versions, rows):
+        """
+        Cache the rows of a query
+        param tuple versions: The versions of the tables the query read from before it ran, see get_versions
+        """
+        if not self.enabled:
+            return
+        key = (query, parameters)
+        with self._lock:
+            self._results[key] = (versions, tuple(rows))
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        """
+        Bump the versions of tables, so all cached results read from them are no longer served
+        """
+        if not tables:
+            return
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+        logger.debug("Invalidated cached results of {}".format(", ".join(sorted(tables))))
+
+    def get_statistics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._results),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
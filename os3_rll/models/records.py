@@ -0,0 +1,110 @@
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import datetime
+from logging import getLogger
+
+from os3_rll.models.challenge import ChallengeException
+from os3_rll.models.db import Database, DBException
+from os3_rll.models.player import PlayerException
+from os3_rll.models.statements import CHALLENGE_GET_INFO_MANY, PLAYER_GET_INFO_MANY, get_batch_statement, statements
+
+logger = getLogger(__name__)
+
+
+def _from_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp) if timestamp else None
+
+
+def _load_many(cls, name, sql, ids, db, exception):
+    """
+    Load the records with ids with a single query, see PlayerRecord.load_many
+    """
+    ids = [int(i) for i in ids]
+    if not ids:
+        return []
+    with Database() if db is None else nullcontext(db) as database:
+        statement, parameters = get_batch_statement(name, sql, ids)
+        database.execute_statement(statement.name, parameters)
+        records = {record.id: record for record in map(cls.from_row, database.fetchall())}
+    missing = [i for i in ids if i not in records]
+    if missing:
+        raise exception("{}s with ids {} not found".format(cls.noun, ", ".join(str(i) for i in missing)))
+    return [records[i] for i in ids]
+
+
+class PlayerRecord(namedtuple("PlayerRecord", ("id", "name", "rank", "gamertag", "discord", "wins", "losses", "challenged", "timeout"))):
+    """
+    A read-only snapshot of a player, built straight from a row of the users table
+    Use it instead of the Player model in code that only reads, it holds no connection and can't be saved
+    """
+
+    __slots__ = ()
+    noun = "Player"
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        param tuple row: A row with the columns of os3_rll.models.statements.PLAYER_ROW
+        returns PlayerRecord: The player in the row
+        """
+        i, name, rank, gamertag, discord, wins, losses, challenged, timeout, _ = row
+        return cls(i, name, rank, gamertag, discord, wins, losses, challenged == 1, _from_timestamp(timeout))
+
+    @classmethod
+    def load_many(cls, ids, db=None):
+        """
+        Load many players with a single query
+        param list ids: The ids of the players to load
+        param os3_rll.models.db.Database db: Load the players with this Database instead of a connection of their own
+        returns list: The players in the order of ids
+        raises PlayerException: When one of the players doesn't exist
+        """
+        return _load_many(cls, "player.get_info_many", PLAYER_GET_INFO_MANY, ids, db, PlayerException)
+
+    @classmethod
+    def load_all(cls, order_by="rank", db=None):
+        """
+        Load all players with a single query
+        param str order_by: Which column to order by, one of os3_rll.operations.player.ORDERABLE_COLUMNS
+        param os3_rll.models.db.Database db: Load the players with this Database instead of a connection of their own
+        returns list: The players
+        raises DBException: When order_by is not an orderable column
+        """
+        name = "player.rows_ordered_by_{}".format(order_by)
+        if name not in statements:
+            raise DBException("Unable to order players by {}".format(order_by))
+        with Database() if db is None else nullcontext(db) as database:
+            database.execute_statement(name)
+            return [cls.from_row(row) for row in database.fetchall()]
+
+
+class ChallengeRecord(
+    namedtuple("ChallengeRecord", ("id", "date", "p1", "p2", "p1_wins", "p2_wins", "p1_score", "p2_score", "winner"))
+):
+    """
+    A read-only snapshot of a challenge, built straight from a row of the challenges table
+    Use it instead of the Challenge model in code that only reads, it holds no connection and can't be saved
+    """
+
+    __slots__ = ()
+    noun = "Challenge"
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        param tuple row: A row with the columns of os3_rll.models.statements.CHALLENGE_ROW
+        returns ChallengeRecord: The challenge in the row
+        """
+        i, date, p1, p2, p1_wins, p2_wins, p1_score, p2_score, winner, _ = row
+        return cls(i, _from_timestamp(date), p1, p2, p1_wins, p2_wins, p1_score, p2_score, winner)
+
+    @classmethod
+    def load_many(cls, ids, db=None):
+        """
+        Load many challenges with a single query
+        param list ids: The ids of the challenges to load
+        param os3_rll.models.db.Database db: Load the challenges with this Database instead of a connection of their own
+        returns list: The challenges in the order of ids
+        raises ChallengeException: When one of the challenges doesn't exist
+        """
+        return _load_many(cls, "challenge.get_info_many", CHALLENGE_GET_INFO_MANY, ids, db, ChallengeException)
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+
+from os3_rll.models.instrumentation import get_current_command
+
+logger = getLogger(__name__)
+
+_current_user = ContextVar("user", default=None)
+_read_only = ContextVar("read_only", default=False)
+
+
+def get_current_user():
+    """
+    Returns the (discord) user the current code is running for, or None
+    """
+    return _current_user.get()
+
+
+def set_current_user(user):
+    """
+    Mark the current context as acting on behalf of user, used to give a user read-your-writes consistency
+    returns: A token which can be passed to reset_current_user
+    """
+    return _current_user.set(user)
+
+
+def reset_current_user(token):
+    _current_user.reset(token)
+
+
+def get_current_actor():
+    """
+    Returns who the writes of the current context are attributed to, the user or otherwise the command (or background task)
+    """
+    return get_current_user() or get_current_command()
+
+
+def is_read_only():
+    """
+    Returns True when the current code is running in a read_only() block
+    """
+    return _read_only.get()
+
+
+@contextmanager
+def read_only():
+    """
+    Every Database created inside the with block (without an explicit intent) only reads and may use a replica
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Chooses the replica that serves the next read-only Database, round robin over the hosts that are up.
+    Reads of an actor who recently committed a write are sent to the primary, so they never see data older then their own write.
+    """
+
+    def __init__(self, hosts, read_your_writes_window=5, retry_after=30):
+        """
+        param list hosts: The replica hosts
+        param int read_your_writes_window: Seconds after a write during which the reads of the same actor go to the primary
+        param int retry_after: Seconds to skip a replica after connecting to it failed
+        """
+        self.hosts = list(hosts)
+        self.read_your_writes_window = read_your_writes_window
+        self.retry_after = retry_after
+        self._next = count()
+        self._down_until = {}
+        self._writes = {}
+        self._lock = Lock()
+
+    def record_write(self, actor=None):
+        """
+        Remember that actor (defaults to the actor of the current context) has just committed a write
+        """
+        if not self.hosts:
+            return
+        if actor is None:
+            actor = get_current_actor()
+        now = monotonic()
+        with self._lock:
+            self._writes[actor] = now
+            # Forget the actors whose window has passed, so this doesn't grow with every user that ever wrote
+            for expired in [a for a, at in self._writes.items() if now - at > self.read_your_writes_window]:
+                del self._writes[expired]
+
+    def wrote_recently(self, actor=None):
+        if actor is None:
+            actor = get_current_actor()
+        with self._lock:
+            written_at = self._writes.get(actor)
+        return written_at is not None and monotonic() - written_at <= self.read_your_writes_window
+
+    def choose(self, actor=None):
+        """
+        returns str: The replica host to read from, or None when the read should go to the primary
+        """
+        if not self.hosts or self.wrote_recently(actor):
+            return None
+        now = monotonic()
+        with self._lock:
+            for _ in range(len(self.hosts)):
+                host = self.hosts[next(self._next) % len(self.hosts)]
+                if self._down_until.get(host, 0) <= now:
+                    return host
+        logger.warning("All database replicas are down, reading from the primary")
+        return None
+
+    def mark_down(self, host):
+        """
+        Stop sending reads to host for retry_after seconds
+        """
+        logger.warning("Database replica {} is unavailable, reading from other hosts for {} seconds".format(host, self.retry_after))
+        with self._lock:
+            self._down_until[host] = monotonic() + self.retry_after
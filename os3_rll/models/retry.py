@@ -0,0 +1,104 @@
+from collections import Counter
+from functools import wraps
+from logging import getLogger
+from random import uniform
+from threading import Lock
+from time import sleep
+
+from os3_rll.conf import settings
+from os3_rll.models.db import get_backend, get_current_unit_of_work
+
+logger = getLogger(__name__)
+
+
+class RetryStatistics:
+    """
+    Counts how often the transactions of each action had to be retried because of lock conflicts
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._actions = {}
+
+    def _get(self, action):
+        stats = self._actions.get(action)
+        if stats is None:
+            stats = self._actions[action] = {"action": action, "calls": 0, "retries": 0, "exhausted": 0, "errors": Counter()}
+        return stats
+
+    def record_call(self, action):
+        with self._lock:
+            self._get(action)["calls"] += 1
+
+    def record_retry(self, action, error):
+        with self._lock:
+            stats = self._get(action)
+            stats["retries"] += 1
+            stats["errors"][error] += 1
+
+    def record_exhausted(self, action, error):
+        with self._lock:
+            stats = self._get(action)
+            stats["exhausted"] += 1
+            stats["errors"][error] += 1
+
+    def as_list(self):
+        with self._lock:
+            return [dict(stats, errors=dict(stats["errors"])) for stats in self._actions.values()]
+
+    def reset(self):
+        with self._lock:
+            self._actions.clear()
+
+
+retry_statistics = RetryStatistics()
+
+
+def get_retry_statistics():
+    """
+    returns list: of dicts with the calls, retries, exhausted retries and conflict errors per action
+    """
+    return retry_statistics.as_list()
+
+
+def get_backoff_delay(attempt):
+    """
+    Returns the seconds to wait before retry number attempt, exponential with full jitter so competing transactions spread out
+    """
+    return uniform(0, min(settings.DB_RETRY_MAX_DELAY, settings.DB_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+def retry_on_conflict(func):
+    """
+    Decorator which runs func again when its transaction was aborted by a deadlock or lock wait timeout
+    func should open its own UnitOfWork, the aborted unit of work is rolled back before the retry.
+    When func is called inside an active UnitOfWork it is not retried, the outermost transaction has to be retried as a whole.
+    At most settings.DB_RETRY_ATTEMPTS attempts are made, after which the error is raised.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if get_current_unit_of_work() is not None:
+            return func(*args, **kwargs)
+        backend = get_backend()
+        action = func.__name__
+        retry_statistics.record_call(action)
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except backend.Error as e:
+                error = backend.get_retryable_error(e)
+                if error is None:
+                    raise
+                if attempt >= settings.DB_RETRY_ATTEMPTS:
+                    logger.error("Giving up on {} after {} attempts: {}".format(action, attempt, e))
+                    retry_statistics.record_exhausted(action, error)
+                    raise
+                delay = get_backoff_delay(attempt)
+                logger.warning("Transaction of {} aborted by {}, retrying in {:.3f}s (attempt {})".format(action, error, delay, attempt))
+                retry_statistics.record_retry(action, error)
+                sleep(delay)
+                attempt += 1
+
+    return wrapper
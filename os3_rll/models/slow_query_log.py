@@ -0,0 +1,48 @@
+import re
+from logging import getLogger
+
+from os3_rll.models.instrumentation import fingerprint, get_current_command
+
+logger = getLogger(__name__)
+
+_redacted_column = re.compile(r"`?password`?\s*=\s*$", re.IGNORECASE)
+_explainable = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE)\b", re.IGNORECASE)
+
+REDACTED = "<redacted>"
+
+
+def redact_parameters(query, parameters):
+    """
+    Replace the parameters bound to a password column with a placeholder so they never end up in the logs
+
+    param str query: The SQL query (using %s for the placeholders)
+    param tuple parameters: The parameters bound to the query
+    returns tuple: The parameters safe for logging
+    """
+    if not parameters:
+        return parameters
+    segments = query.split("%s")
+    return tuple(REDACTED if i < len(segments) and _redacted_column.search(segments[i]) else p for i, p in enumerate(parameters))
+
+
+def is_explainable(query):
+    return bool(_explainable.match(query))
+
+
+def log_slow_query(query, parameters, duration, explain=None):
+    """
+    Log a statement which exceeded the slow query threshold
+
+    param str query: The SQL query
+    param tuple parameters: The parameters bound to the query
+    param float duration: How long the query took in seconds
+    param list explain: The rows returned by EXPLAIN for this query, if available
+    """
+    logger.warning(
+        "Slow query ({:.3f}s) executed for {}: {} parameters={}".format(
+            duration, get_current_command() or "unknown action", fingerprint(query), redact_parameters(query, parameters)
+        )
+    )
+    if explain:
+        for row in explain:
+            logger.warning("Slow query plan: {}".format(row))
@@ -0,0 +1,227 @@
+from logging import getLogger
+
+from os3_rll.models.query_cache import get_tables
+
+logger = getLogger(__name__)
+
+
+class StatementException(RuntimeError):
+    pass
+
+
+class Statement:
+    """
+    A named, parameterized SQL statement in the MySQL dialect (use %s for the placeholders)
+    Results of cacheable statements are served from the query cache until one of the tables they read is written to
+    """
+
+    def __init__(self, name, sql, cacheable=False):
+        self.name = name
+        self.sql = sql
+        self.cacheable = cacheable
+        self.tables = get_tables(sql)
+
+    def __repr__(self):
+        return "<Statement {}>".format(self.name)
+
+
+class StatementRegistry:
+    """
+    Holds every statement the models, operations and actions execute, so they are only referenced by name
+    The statements are not prepared on the database server, PyMySQL only speaks the text protocol.
+    Backend.execute_statement is where a backend whose driver can prepare statements would reuse them.
+    """
+
+    def __init__(self):
+        self._statements = {}
+
+    def register(self, name, sql, cacheable=False):
+        """
+        Add a statement to the registry
+        param str name: The name to reference the statement by
+        param str sql: The statement in the MySQL dialect
+        param bool cacheable: Whether the results of this (read) statement may be served from the query cache
+        returns Statement: The registered statement
+        raises StatementException: When a different statement has already been registered under name
+        """
+        existing = self._statements.get(name)
+        if existing is not None and existing.sql != sql:
+            raise StatementException("A different statement has already been registered as {}".format(name))
+        statement = self._statements[name] = Statement(name, sql, cacheable=cacheable)
+        return statement
+
+    def get(self, name):
+        """
+        returns Statement: The statement registered under name
+        raises StatementException: When no statement has been registered under name
+        """
+        try:
+            return self._statements[name]
+        except KeyError:
+            raise StatementException("Unknown statement {}".format(name))
+
+    def __contains__(self, name):
+        return name in self._statements
+
+    def __iter__(self):
+        return iter(self._statements.values())
+
+    def __len__(self):
+        return len(self._statements)
+
+
+statements = StatementRegistry()
+
+
+def get_statement(name):
+    return statements.get(name)
+
+
+def get_update_statement(prefix, table, columns):
+    """
+    Returns the statement updating only columns of the row with a given id and version, it is registered on first use
+    The version of the row is incremented, no row is updated when the row has been updated by someone else since it was read
+    The parameters of the statement are the new values of columns followed by the id and the version
+
+    param str prefix: The prefix of the statement name, for example player
+    param str table: The table to update
+    param tuple columns: The columns to update
+    returns Statement: The statement registered as <prefix>.update[<columns>]
+    """
+    name = "{}.update[{}]".format(prefix, ",".join(columns))
+    if name not in statements:
+        statements.register(
+            name,
+            "UPDATE `{}` SET {}, `version`=`version` + 1 WHERE `id`=%s AND `version`=%s".format(
+                table, ", ".join("`{}`=%s".format(column) for column in columns)
+            ),
+        )
+    return statements.get(name)
+
+
+def get_batch_statement(name, sql, ids):
+    """
+    Returns a statement selecting the rows of a batch of ids, it is registered on first use
+    The amount of placeholders is rounded up to a power of two and the ids are padded with the last id, so only a handful of
+    variants of the statement are registered
+
+    param str name: The name of the statement, <name>[<placeholders>] is registered
+    param str sql: The statement, {ids} is replaced by the placeholders of the ids, for example WHERE `id` IN ({ids})
+    param list ids: The ids to select
+    returns tuple: (Statement statement, tuple parameters)
+    """
+    ids = tuple(ids)
+    if not ids:
+        raise StatementException("A batch statement needs at least one id")
+    size = 1 << (len(ids) - 1).bit_length()
+    name = "{}[{}]".format(name, size)
+    if name not in statements:
+        statements.register(name, sql.format(ids=", ".join(["%s"] * size)))
+    return statements.get(name), ids + ids[-1:] * (size - len(ids))
+
+
+# Players
+statements.register(
+    "player.get_info",
+    "SELECT `name`, `rank`, `gamertag`, `discord`, `wins`, `losses`, `challenged`, UNIX_TIMESTAMP(`timeout`), `version` "
+    "FROM `users` WHERE `id`=%s",
+)
+# The same columns as player.get_info preceded by the id, as read by Player.load_many and os3_rll.models.records.PlayerRecord
+PLAYER_ROW = "`id`, `name`, `rank`, `gamertag`, `discord`, `wins`, `losses`, `challenged`, UNIX_TIMESTAMP(`timeout`), `version`"
+# Load with get_batch_statement
+PLAYER_GET_INFO_MANY = "SELECT " + PLAYER_ROW + " FROM `users` WHERE `id` IN ({ids})"
+statements.register("player.id_by_gamertag", "SELECT `id` FROM `users` WHERE `gamertag`=%s", cacheable=True)
+statements.register("player.id_by_discord", "SELECT `id` FROM `users` WHERE `discord`=%s", cacheable=True)
+statements.register(
+    "player.insert",
+    "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `password`=%s, `timeout`=%s",
+)
+statements.register("player.delete", "DELETE FROM `users` WHERE `id`=%s")
+statements.register(
+    "player.ranking", "SELECT `discord`, `rank`, `gamertag` FROM `users` WHERE `rank` > 0 ORDER BY `rank`", cacheable=True
+)
+statements.register("player.max_rank", "SELECT MAX(`rank`) FROM `users`")
+# Moves the players ranked between the new and old rank of a winning challenger one rank down
+statements.register(
+    "player.shift_ranks_down", "UPDATE `users` SET `rank` = `rank` + 1, `version` = `version` + 1 WHERE `rank` > %s AND `rank` < %s"
+)
+for column in ("id", "rank", "gamertag", "wins", "losses"):
+    statements.register(
+        "player.ids_ordered_by_{}".format(column), "SELECT `id` FROM `users` ORDER BY `{}`".format(column), cacheable=True
+    )
+    statements.register(
+        "player.rows_ordered_by_{}".format(column), "SELECT {} FROM `users` ORDER BY `{}`".format(PLAYER_ROW, column), cacheable=True
+    )
+# The averages include the archived challenges
+statements.register(
+    "player.average_challenger_score",
+    "SELECT AVG(`score`) FROM ("
+    "SELECT `p1_score` AS `score` FROM `challenges` WHERE `p1`=%s AND `winner` IS NOT NULL "
+    "UNION ALL SELECT `p1_score` FROM `challenges_archive` WHERE `p1`=%s) AS `scores`",
+    cacheable=True,
+)
+statements.register(
+    "player.average_challenged_score",
+    "SELECT AVG(`score`) FROM ("
+    "SELECT `p2_score` AS `score` FROM `challenges` WHERE `p2`=%s AND `winner` IS NOT NULL "
+    "UNION ALL SELECT `p2_score` FROM `challenges_archive` WHERE `p2`=%s) AS `scores`",
+    cacheable=True,
+)
+# The averages of all players at once, one row per player and role (p1 is the challenger, p2 the challenged) they played
+statements.register(
+    "player.average_scores",
+    "SELECT `role`, `player`, AVG(`score`) FROM ("
+    "SELECT 'p1' AS `role`, `p1` AS `player`, `p1_score` AS `score` FROM `challenges` WHERE `winner` IS NOT NULL "
+    "UNION ALL SELECT 'p1', `p1`, `p1_score` FROM `challenges_archive` "
+    "UNION ALL SELECT 'p2', `p2`, `p2_score` FROM `challenges` WHERE `winner` IS NOT NULL "
+    "UNION ALL SELECT 'p2', `p2`, `p2_score` FROM `challenges_archive`) AS `scores` GROUP BY `role`, `player`",
+    cacheable=True,
+)
+
+# Challenges
+statements.register(
+    "challenge.get_info",
+    "SELECT UNIX_TIMESTAMP(`date`), `p1`, `p2`, `p1_wins`, `p2_wins`, `p1_score`, `p2_score`, `winner`, `version` "
+    "FROM `challenges` WHERE `id`=%s",
+)
+# The same columns as challenge.get_info preceded by the id, as read by Challenge.load_many and os3_rll.models.records.ChallengeRecord
+CHALLENGE_ROW = "`id`, UNIX_TIMESTAMP(`date`), `p1`, `p2`, `p1_wins`, `p2_wins`, `p1_score`, `p2_score`, `winner`, `version`"
+# Load with get_batch_statement
+CHALLENGE_GET_INFO_MANY = "SELECT " + CHALLENGE_ROW + " FROM `challenges` WHERE `id` IN ({ids})"
+statements.register("challenge.insert", "INSERT INTO `challenges` SET `date`=%s, `p1`=%s, `p2`=%s")
+statements.register(
+    "challenge.reset",
+    "UPDATE `challenges` SET `p1_wins`=NULL, `p2_wins`=NULL, `p1_score`=NULL, `p2_score`=NULL, `winner`=NULL, "
+    "`version` = `version` + 1 WHERE `id`=%s",
+)
+statements.register("challenge.delete", "DELETE FROM `challenges` WHERE `id`=%s")
+statements.register("challenge.uncompleted", "SELECT `id`, `date`, `p1`, `p2` FROM `challenges` WHERE `winner` IS NULL")
+for state, condition in (("open", "IS NULL"), ("completed", "IS NOT NULL")):
+    statements.register(
+        "challenge.latest_{}_between".format(state),
+        "SELECT `id` FROM `challenges` WHERE `p1`=%s AND `p2`=%s AND `winner` {} ORDER BY `id` DESC LIMIT 1".format(condition),
+    )
+    statements.register(
+        "challenge.players_of_latest_{}".format(state),
+        "SELECT `p1`, `p2` FROM `challenges` WHERE (`p1`=%s OR `p2`=%s) AND `winner` {} ORDER BY `id` DESC LIMIT 1".format(condition),
+    )
+    statements.register(
+        "challenge.first_{}_of_player".format(state),
+        "SELECT `id` FROM `challenges` WHERE (`p1`=%s OR `p2`=%s) AND `winner` {} ORDER BY `id` LIMIT 1".format(condition),
+    )
+    statements.register(
+        "challenge.latest_{}_of_player".format(state),
+        "SELECT `id` FROM `challenges` WHERE (`p1`=%s OR `p2`=%s) AND `winner` {} ORDER BY `id` DESC LIMIT 1".format(condition),
+    )
+
+# Archival of the completed challenges created before a date, in batches of ids
+CHALLENGE_COLUMNS = "`id`, `date`, `p1`, `p2`, `p1_wins`, `p2_wins`, `p1_score`, `p2_score`, `winner`"
+statements.register(
+    "challenge.archivable_ids", "SELECT `id` FROM `challenges` WHERE `winner` IS NOT NULL AND `date` < %s ORDER BY `id` LIMIT %s"
+)
+statements.register(
+    "challenge.archive",
+    "INSERT INTO `challenges_archive` ({0}) SELECT {0} FROM `challenges` "
+    "WHERE `winner` IS NOT NULL AND `date` < %s AND `id` <= %s".format(CHALLENGE_COLUMNS),
+)
+statements.register("challenge.delete_archived", "DELETE FROM `challenges` WHERE `winner` IS NOT NULL AND `date` < %s AND `id` <= %s")
@@ -4,6 +4,7 @@ from datetime import datetime
 from os3_rll.models.challenge import Challenge, ChallengeException
 from os3_rll.models.player import Player, PlayerException
 from os3_rll.models.db import Database
+from os3_rll.models.records import ChallengeRecord, PlayerRecord
 
 logger = getLogger(__name__)
 
@@ -71,7 +72,7 @@ def process_completed_challenge_args(args):
     return p1_wins, p2_wins, p1_score, p2_score
 
 
-def get_player_objects_from_challenge_info(player, should_be_completed=False, search_by_discord_name=True):
+def get_player_objects_from_challenge_info(player, should_be_completed=False, search_by_discord_name=True, lazy=False):
     """
     Search for a challenge in the DB corresponding to the player
 
@@ -79,21 +80,22 @@ def get_player_objects_from_challenge_info(player, should_be_completed=False, se
     param bool should_be_completed: If the challenge should already be completed or not
     param bool search_by_discord_name: Searches for player by full discord_name instead of gamertag
     param str message_author: The discord_user that send the message (eg. Pandabeer#2202)
+    param bool lazy: Return lazy players which are only loaded when more than their id is used
     returns tuple os3_rll.models.player.Player: (p1, p2)
     """
     if isinstance(player, str):
         player = Player.get_player_id_by_username(player, discord_name=search_by_discord_name)
     with Database() as db:
-        db.execute_prepared_statement(
-            "SELECT `p1`, `p2` FROM `challenges` WHERE (`p1`=%s OR `p2`=%s) AND `winner` IS {} NULL ORDER BY `id` DESC".format(
-                "NOT" if should_be_completed else ""
-            ),
-            (player, player),
+        db.execute_statement(
+            "challenge.players_of_latest_completed" if should_be_completed else "challenge.players_of_latest_open", (player, player)
         )
         if db.rowcount == 0:
             raise ChallengeException("No challenges found")
-        p1, p2 = db.fetchone()
-    return Player(p1), Player(p2)
+        ids = db.fetchone()
+    if lazy:
+        return Player(ids[0], lazy=True), Player(ids[1], lazy=True)
+    p1, p2 = Player.load_many(ids)
+    return p1, p2
 
 
 def get_latest_challenge_from_player_id(player, should_be_completed=False):
@@ -110,12 +112,57 @@ def get_latest_challenge_from_player_id(player, should_be_completed=False):
         if not p.challenged and not should_be_completed:
             raise PlayerException("Player {} is currently not in an active challenge".format(p.gamertag))
         # Try to find a challenge
-        p.db.execute(
-            "SELECT `id` FROM `challenges` WHERE (`p1`={0} OR `p2`={0}) AND `winner` is {1} NULL ORDER BY `id` LIMIT 1".format(
-                p.id, "NOT" if should_be_completed else ""
-            )
+        p.db.execute_statement(
+            "challenge.first_completed_of_player" if should_be_completed else "challenge.first_open_of_player", (p.id, p.id)
         )
         p.check_row_count()
         challenge = p.db.fetchone()[0]
     # Return the Challenge model
     return Challenge(challenge)
+
+
+def get_latest_challenge_record_from_player_id(player, should_be_completed=False):
+    """
+    Read-only variant of get_latest_challenge_from_player_id, the challenge is returned as a snapshot which holds no connection
+
+    param int player: The player ID to search the challenges for
+    param bool should_be_completed: If the challenge should already be completed or not
+    returns os3_rll.models.records.ChallengeRecord: if a challenge is found
+    raises ChallengeException/PlayerException: on not found / on error
+    """
+    logger.info("Trying to get latest challenge from player with id {}".format(player))
+    with Database() as db:
+        p = PlayerRecord.load_many([player], db=db)[0]
+        if not p.challenged and not should_be_completed:
+            raise PlayerException("Player {} is currently not in an active challenge".format(p.gamertag))
+        db.execute_statement(
+            "challenge.latest_completed_of_player" if should_be_completed else "challenge.latest_open_of_player", (p.id, p.id)
+        )
+        if db.rowcount != 1:
+            raise PlayerException("Excepting 1 rows to be returned by DB, got {} rows instead".format(db.rowcount))
+        return ChallengeRecord.load_many([db.fetchone()[0]], db=db)[0]
+
+
+def move_completed_challenges_to_archive(before, batch_size=500):
+    """
+    Moves a batch of the completed challenges created before a date from the challenges table to challenges_archive
+    Run it inside a UnitOfWork, so a batch is either moved completely or not at all
+
+    param datetime.datetime before: Archive the challenges created before this date
+    param int batch_size: The maximum amount of challenges to move
+    returns int: The amount of challenges moved, 0 when there is nothing left to archive
+    """
+    with Database() as db:
+        db.execute_statement("challenge.archivable_ids", (before, batch_size))
+        ids = [row[0] for row in db.fetchall()]
+        if not ids:
+            return 0
+        db.execute_statement("challenge.archive", (before, ids[-1]))
+        archived = db.rowcount
+        db.execute_statement("challenge.delete_archived", (before, ids[-1]))
+        if db.rowcount != archived:
+            raise ChallengeException("Archived {} challenges but removed {} from the challenges table".format(archived, db.rowcount))
+        db.commit()
+    logger.debug("Moved {} challenges up to id {} to the archive".format(archived, ids[-1]))
+    return archived
+
@@ -4,17 +4,23 @@ from os3_rll.models.db import Database, DBException
 
 logger = getLogger(__name__)
 
+# Columns the players can be ordered by, each has its own player.ids_ordered_by_<column> statement
+ORDERABLE_COLUMNS = ("id", "rank", "gamertag", "wins", "losses")
+
 
 def get_all_player_ids_ordered(order_by="rank"):
     """
     Get a list of all player ids ordered by column
 
-    param str order_by: Which column to order by
+    param str order_by: Which column to order by, one of ORDERABLE_COLUMNS
     return list: The player ids
+    raises DBException: When order_by is not an orderable column
     """
+    if order_by not in ORDERABLE_COLUMNS:
+        raise DBException("Unable to order players by {}".format(order_by))
     ids = []
     with Database() as db:
-        db.execute_prepared_statement("SELECT `id` FROM `users` ORDER BY %s", (order_by,))
+        db.execute_statement("player.ids_ordered_by_{}".format(order_by))
         if db.rowcount == 0:
             raise DBException("No users returned")
         rows = db.fetchall()
@@ -33,7 +39,7 @@ def get_average_goals_per_challenge(player):
     logger.debug("Calculating average goals per challenge for player with id {}".format(player))
     with Database() as db:
         # Average goals as p1
-        db.execute_prepared_statement("SELECT AVG(`p1_score`) FROM `challenges` WHERE `p1`=%s AND `winner` IS NOT NULL", (player,))
+        db.execute_statement("player.average_challenger_score", (player, player))
         if db.rowcount != 1:
             logger.warning("Player with id {} has never challenged someone, setting average challenger score to 0")
             avg_challenger_score = 0
@@ -43,7 +49,7 @@ def get_average_goals_per_challenge(player):
             if avg_challenger_score is None:
                 avg_challenger_score = 0
         # Average goals as p2
-        db.execute_prepared_statement("SELECT AVG(`p2_score`) FROM `challenges` WHERE `p2`=%s AND `winner` IS NOT NULL", (player,))
+        db.execute_statement("player.average_challenged_score", (player, player))
         if db.rowcount != 1:
             logger.warning("Player with id {} has never been challenged, setting average challenged score to 0")
             avg_challenged_score = 0
@@ -54,3 +60,23 @@ def get_average_goals_per_challenge(player):
                 avg_challenged_score = 0
     # Return the average of the two numbers
     return float(avg_challenger_score) + float(avg_challenged_score) / 2
+
+
+def get_average_goals_per_challenge_of_all_players():
+    """
+    Gets the average goals per challenge of all players with a single grouped query, instead of two queries per player
+
+    return dict: {int player id: float goals}, players who never played a challenge are left out
+    """
+    logger.debug("Calculating average goals per challenge for all players")
+    averages = {"p1": {}, "p2": {}}
+    with Database() as db:
+        db.execute_statement("player.average_scores")
+        for role, player, score in db.fetchall():
+            # If the player has never scored the average will be None
+            averages[role][player] = score or 0
+    # Combined just like get_average_goals_per_challenge does
+    return {
+        player: float(averages["p1"].get(player, 0)) + float(averages["p2"].get(player, 0)) / 2
+        for player in set(averages["p1"]) | set(averages["p2"])
+    }
@@ -18,5 +18,6 @@ def get_max_rank():
     Gets the lowest player rank (or highest on decimal scale)
     """
     with Database() as db:
-        db.execute("SELECT MAX(`rank`) FROM `users`")
-        return int(db.fetchone()[0])
+        db.execute_statement("player.max_rank")
+        # MAX() returns NULL when there are no players yet
+        return int(db.fetchone()[0] or 0)
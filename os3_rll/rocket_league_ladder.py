@@ -1,25 +1,62 @@
 import sys
 from argparse import ArgumentParser
-from logging import INFO, DEBUG
+from logging import INFO, DEBUG, getLogger
 
+from os3_rll.actions.challenge_tasks.archive_completed_challenges import archive_completed_challenges
 from os3_rll.discord.client import discord_client
 from os3_rll.log.log import setup_console_logging
+from os3_rll.migrations.runner import apply_migrations, get_available_migrations, verify_migrations
 from os3_rll.utils.version import show_version
 
+logger = getLogger(__name__)
+
 
 def parse_args(args=None):
     parser = ArgumentParser(description="Rocket League Ladder program based on a Discord bot")
     parser.add_argument("-v", "--verbose", action="store_true", help="Display debug messages")
     parser.add_argument("-V", "--version", action="store_true", help="Show version and exit")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    migrate = subparsers.add_parser("migrate", help="Create or upgrade the database schema")
+    migrate_action = migrate.add_mutually_exclusive_group()
+    migrate_action.add_argument("--verify", action="store_true", help="Check the database schema against the migrations, don't change it")
+    migrate_action.add_argument("--list", action="store_true", help="List the available migrations and exit")
+    migrate.add_argument("--target", type=int, help="Only apply the migrations up to and including this version")
+    archive = subparsers.add_parser("archive", help="Move the old completed challenges to the challenges_archive table")
+    archive.add_argument("--days", type=int, help="Archive the challenges older than this many days, defaults to the settings")
     return parser.parse_args(args)
 
 
+def migrate(args):
+    """
+    Run the migrate subcommand
+    returns int: The exit code
+    """
+    if args.list:
+        for migration in get_available_migrations():
+            print("{}: {}".format(migration, migration.description))
+        return 0
+    if args.verify:
+        problems = verify_migrations()
+        for problem in problems:
+            logger.error(problem)
+        if not problems:
+            logger.info("Database schema is up to date")
+        return 1 if problems else 0
+    apply_migrations(target=args.target)
+    return 0
+
+
 def main(args=None):
     args = parse_args(args)
     if args.version:
         show_version()
         sys.exit(0)
     setup_console_logging(verbosity=DEBUG if args.verbose else INFO)
+    if args.command == "migrate":
+        sys.exit(migrate(args))
+    if args.command == "archive":
+        archive_completed_challenges(days=args.days)
+        sys.exit(0)
     discord_client()
 
 
@@ -41,12 +41,53 @@ WEBSITE = "http://sheffield.studlab.os3.nl/OS3-Rocket-League-Ladder/"
 DISCORD_EMBED_THUMBNAIL = (
     "https://rocketleague.media.zestyio.com/Rocket-League-Logo-Full_On-Dark-Vertical.f1cb27a519bdb5b6ed34049a5b86e317.png"
 )
-DISCORD_BOT_BACKGROUND_TASKS = ["post", "check_expired_challenges"]
+DISCORD_BOT_BACKGROUND_TASKS = ["post", "check_expired_challenges", "archive_challenges"]
 EXPIRED_CHALLENGES_WAIT_TIMER = 1800  # 30 minutes
+# Completed challenges older than this are moved to the challenges_archive table, the statistics still include them
+CHALLENGE_ARCHIVE_AFTER_DAYS = 90
+CHALLENGE_ARCHIVE_BATCH_SIZE = 500  # Challenges moved per transaction
+CHALLENGE_ARCHIVE_WAIT_TIMER = 86400  # 1 day
+DISCORD_ACTION_WORKERS = 4  # Threads running the blocking ladder actions for the Discord cogs
 DEVELOPERS = ["SyntheticOxygen", "Mr. Vin", "Mr. Vin", "Mr. Vin", "Mr. Vin", "Pandabeer"]
 
 # Database settings
+# Storage backend, use os3_rll.models.backends.sqlite.SQLiteBackend to run without a MySQL server
+DB_BACKEND = "os3_rll.models.backends.mysql.MySQLBackend"
+DB_SQLITE_PATH = join(PROJECT_DIR, "os3rl.sqlite3")
 DB_HOST = "127.0.0.1"
 DB_USER = getenv("DB_USER")
 DB_PASS = getenv("DB_PASS")
 DB_DATABASE = getenv("DB_DATABASE", "os3rl")
+# Comma separated hosts of read replicas of DB_HOST, the read-only ladder queries are spread over them (MySQL only)
+DB_REPLICA_HOSTS = [host.strip() for host in getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+DB_REPLICA_READ_YOUR_WRITES_WINDOW = 5  # Seconds after a write during which the reads of the same user go to the primary
+DB_REPLICA_RETRY_AFTER = 30  # Seconds to stop using a replica after connecting to it failed
+
+# Database timeouts, a statement taking longer then DB_READ_TIMEOUT seconds is aborted and its connection discarded
+DB_CONNECT_TIMEOUT = 5
+DB_READ_TIMEOUT = 15
+DB_WRITE_TIMEOUT = 15
+# Fail fast for DB_CIRCUIT_BREAKER_RESET_TIMEOUT seconds after the database failed this many times in a row, 0 disables it
+DB_CIRCUIT_BREAKER_THRESHOLD = 5
+DB_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
+# Database connection pool settings
+DB_POOL_SIZE = 10  # Maximum amount of connections the bot will open
+DB_POOL_MIN_SIZE = 2  # Connections opened when the bot starts, so the first commands don't have to wait for them
+DB_POOL_IDLE_TIMEOUT = 300  # Close connections which haven't been used for 5 minutes
+DB_POOL_MAX_LIFETIME = 3600  # Recycle connections after an hour
+DB_POOL_CHECKOUT_TIMEOUT = 10  # Seconds to wait for a free connection
+DB_EXECUTOR_WORKERS = DB_POOL_SIZE  # Threads running database calls for the asyncio code
+
+# Retry the ladder writes aborted by a deadlock or lock wait timeout, with exponential backoff and jitter
+DB_RETRY_ATTEMPTS = 5  # Attempts including the first one
+DB_RETRY_BASE_DELAY = 0.05  # Seconds, the upper bound of the backoff doubles with every retry
+DB_RETRY_MAX_DELAY = 1.0  # Seconds, cap on the upper bound of the backoff
+
+# Amount of results of cacheable statements (like the ranking) to keep in memory, 0 disables the query cache
+# Only writes made by this process invalidate the cache, so only enable it when nothing else writes to the database
+DB_QUERY_CACHE_SIZE = 0
+
+# Slow query log settings
+DB_SLOW_QUERY_THRESHOLD = 0.5  # Log statements taking longer then this many seconds, None disables the slow query log
+DB_SLOW_QUERY_EXPLAIN = True  # Log the EXPLAIN output of slow statements, this uses a separate connection
@@ -1,7 +1,10 @@
+import asyncio
 from unittest import TestCase, mock
 from pathlib import Path
 
+from os3_rll.actions.player import add_player
 from os3_rll.conf import settings
+from os3_rll.models.db import close_connection_pool
 
 
 class OS3RLLTestCase(TestCase):
@@ -35,3 +38,30 @@ class OS3RLLTestCase(TestCase):
         patcher.return_value.__exit__ = lambda a, b, c, d: None
         patcher.return_value.__enter__ = patcher
         return patcher
+
+    def set_up_memory_database(self):
+        """
+        Point the Database model to a fresh in-memory database for the duration of the test
+        """
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.conf.settings.DB_BACKEND", "os3_rll.models.backends.memory.MemoryBackend")
+
+    @staticmethod
+    def add_memory_players(n):
+        """
+        Add n players (Player 0, gamer0, player0#0000 and so on) to the database set up by set_up_memory_database
+        returns list: The ids of the players
+        """
+        return [add_player("Player {}".format(i), "gamer{}".format(i), "player{}#000{}".format(i, i))[0].id for i in range(n)]
+
+    @staticmethod
+    def run_coroutine(coroutine):
+        """
+        Runs a coroutine on a fresh event loop and returns its result
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
@@ -0,0 +1,57 @@
+from random import Random
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge, complete_challenge, reset_challenge, get_challenge
+from os3_rll.actions.player import add_player, get_player_ranking
+from os3_rll.models.player import Player
+
+
+class TestChallengeFlow(OS3RLLTestCase):
+    """
+    Runs the challenge actions against the in-memory backend instead of mocks
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(4)
+
+    def ranks(self):
+        return {discord: rank for discord, (rank, _) in get_player_ranking().items()}
+
+    def test_add_player_gives_new_players_the_next_rank(self):
+        self.assertEqual(self.ranks(), {"player0#0000": 1, "player1#0001": 2, "player2#0002": 3, "player3#0003": 4})
+
+    def test_challenger_winning_takes_the_rank_of_the_defender(self):
+        create_challenge(self.players[3], self.players[1])
+        self.assertEqual(get_challenge(self.players[3])["p2"]["id"], self.players[1])
+        self.assertEqual(complete_challenge(self.players[3], self.players[1], "3-1 2-0"), self.players[3])
+        self.assertEqual(self.ranks(), {"player0#0000": 1, "player3#0003": 2, "player1#0001": 3, "player2#0002": 4})
+        with Player(self.players[3]) as p:
+            self.assertEqual((p.wins, p.losses, p.challenged), (1, 0, False))
+
+    def test_defender_winning_keeps_ranks_and_gives_challenger_a_timeout(self):
+        create_challenge(self.players[2], self.players[1])
+        self.assertEqual(complete_challenge(self.players[2], self.players[1], "0-1"), self.players[1])
+        self.assertEqual(self.ranks(), {"player0#0000": 1, "player1#0001": 2, "player2#0002": 3, "player3#0003": 4})
+        with Player(self.players[2]) as p:
+            self.assertTrue(p.timeout > p.timeout.now())
+
+    def test_reset_challenge_restores_ranks(self):
+        create_challenge(self.players[1], self.players[0])
+        complete_challenge(self.players[1], self.players[0], "1-0")
+        reset_challenge(self.players[1], self.players[0])
+        with Player(self.players[0]) as p1, Player(self.players[1]) as p2:
+            self.assertEqual((p1.rank, p2.rank), (1, 2))
+            self.assertTrue(p1.challenged and p2.challenged)
+
+    def test_ranks_stay_a_permutation_over_many_challenges(self):
+        rng = Random(42)
+        for _ in range(25):
+            ranking = sorted(self.ranks().items(), key=lambda item: item[1])
+            defender = rng.randrange(len(ranking) - 1)
+            challenger = rng.randrange(defender + 1, len(ranking))
+            p1 = Player.get_player_id_by_username(ranking[challenger][0], discord_name=True)
+            p2 = Player.get_player_id_by_username(ranking[defender][0], discord_name=True)
+            create_challenge(p1, p2)
+            complete_challenge(p1, p2, "1-0", may_be_expired=True)
+            self.assertEqual(sorted(self.ranks().values()), [1, 2, 3, 4])
@@ -7,6 +7,7 @@ from os3_rll.tests import OS3RLLTestCase
 
 class TestCompleteChallenge(OS3RLLTestCase):
     def setUp(self) -> None:
+        self.unit_of_work = self.set_up_patch("os3_rll.actions.challenge.UnitOfWork", themock=MagicMock())
         self.p1 = 1
         self.p2 = 2
         self.player = self.set_up_patch("os3_rll.actions.challenge.Player", themock=MagicMock())
@@ -71,7 +72,7 @@ class TestCompleteChallenge(OS3RLLTestCase):
 
     def test_complete_challenge_calls_player_sql_query(self):
         complete_challenge(self.p1, self.p2, "blaap")
-        self.player().__enter__().db.execute.assert_called_once()
+        self.player().__enter__().db.execute_statement.assert_called_once()
 
     def test_complete_challenge_calls_save_on_challenge_model(self):
         complete_challenge(self.p1, self.p2, "blaap")
@@ -89,3 +90,8 @@ class TestCompleteChallenge(OS3RLLTestCase):
         self.challenge.return_value.__enter__.return_value.winner = self.p2
         self.player.return_value.__enter__.return_value.id = self.p2
         self.assertEqual(complete_challenge(self.p1, self.p2, "blaap"), self.p2)
+
+    def test_complete_challenge_runs_in_a_unit_of_work(self):
+        complete_challenge(self.p1, self.p2, "blaap")
+        self.unit_of_work.assert_called_once_with()
+        self.unit_of_work.return_value.__exit__.assert_called_once_with(None, None, None)
@@ -6,6 +6,7 @@ from os3_rll.tests import OS3RLLTestCase
 
 class TestCreateChallenge(OS3RLLTestCase):
     def setUp(self) -> None:
+        self.unit_of_work = self.set_up_patch("os3_rll.actions.challenge.UnitOfWork", themock=MagicMock())
         self.player = self.set_up_patch("os3_rll.actions.challenge.Player")
         self.challenge = self.set_up_patch("os3_rll.actions.challenge.Challenge", themock=MagicMock())
         self.sanity_check = self.set_up_patch("os3_rll.actions.challenge.do_challenge_sanity_check")
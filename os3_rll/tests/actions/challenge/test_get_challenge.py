@@ -1,8 +1,8 @@
 from datetime import timedelta, datetime
 
 from os3_rll.tests import OS3RLLTestCase
-from os3_rll.tests.fixture import player_model_fixture, challenge_model_fixture
-from os3_rll.actions.challenge import get_challenge
+from os3_rll.tests.fixture import player_record_fixture, challenge_record_fixture
+from os3_rll.actions.challenge import complete_challenge, create_challenge, get_challenge
 from os3_rll.models.challenge import ChallengeException
 
 
@@ -10,13 +10,14 @@ class TestGetChallenge(OS3RLLTestCase):
     def setUp(self) -> None:
         self.player = self.set_up_patch("os3_rll.actions.challenge.Player")
         self.player.return_value.get_player_id_by_username.return_value = 10
-        self.challenge = self.set_up_patch("os3_rll.actions.challenge.get_latest_challenge_from_player_id")
-        self.challenge.return_value = challenge_model_fixture()
-        self.player_objs = self.set_up_patch("os3_rll.actions.challenge.get_player_objects_from_challenge_info")
-        self.player_objs.return_value = (
-            player_model_fixture(),
-            player_model_fixture(name="Bert", _id=2, gamertag="bertje", discord="bert123", rank=2),
-        )
+        self.challenge = self.set_up_patch("os3_rll.actions.challenge.get_latest_challenge_record_from_player_id")
+        self.challenge.return_value = challenge_record_fixture()
+        self.player_record = self.set_up_patch("os3_rll.actions.challenge.PlayerRecord")
+        self.player_objs = self.player_record.load_many
+        self.player_objs.return_value = [
+            player_record_fixture(),
+            player_record_fixture(name="Bert", id=2, gamertag="bertje", discord="bert123", rank=2),
+        ]
 
     def test_get_challenges_calls_player_model_when_string_is_passed(self):
         get_challenge("blaap")
@@ -30,21 +31,17 @@ class TestGetChallenge(OS3RLLTestCase):
         get_challenge(1)
         self.assertFalse(self.player.get_player_id_by_username.called)
 
-    def test_get_challenge_calls_get_latest_challenge_from_player_id(self):
+    def test_get_challenge_calls_get_latest_challenge_record_from_player_id(self):
         get_challenge(1)
         self.challenge.assert_called_once_with(1, should_be_completed=False)
 
-    def test_get_challenge_calls_get_latest_challenge_from_player_id_with_should_be_completed(self):
+    def test_get_challenge_calls_get_latest_challenge_record_from_player_id_with_should_be_completed(self):
         get_challenge(1, should_be_completed=True)
         self.challenge.assert_called_once_with(1, should_be_completed=True)
 
-    def test_get_challenge_calls_get_player_objects_from_challenge_info(self):
+    def test_get_challenge_loads_the_players_of_the_challenge(self):
         get_challenge(1)
-        self.player_objs.assert_called_once_with(1, should_be_completed=False)
-
-    def test_get_challenge_calls_get_player_objects_from_challenge_info_with_should_be_completed(self):
-        get_challenge(1, should_be_completed=True)
-        self.player_objs.assert_called_once_with(1, should_be_completed=True)
+        self.player_objs.assert_called_once_with((self.challenge.return_value.p1, self.challenge.return_value.p2))
 
     def test_get_challenge_catches_any_exception_on_player_model(self):
         self.player.get_player_id_by_username.side_effect = RuntimeError
@@ -56,7 +53,7 @@ class TestGetChallenge(OS3RLLTestCase):
         with self.assertRaises(ChallengeException):
             get_challenge(1)
 
-    def test_get_challenge_catches_any_exception_on_get_player_objects_from_challenge_info(self):
+    def test_get_challenge_catches_any_exception_on_loading_the_players(self):
         self.player_objs.side_effect = IOError
         with self.assertRaises(ChallengeException):
             get_challenge(1)
@@ -89,3 +86,21 @@ class TestGetChallenge(OS3RLLTestCase):
         self.assertEqual(c["p2"]["rank"], self.player_objs.return_value[1].rank)
         self.assertEqual(c["p2"]["name"], self.player_objs.return_value[1].gamertag)
         self.assertEqual(c["p2"]["discord"], self.player_objs.return_value[1].discord)
+
+
+class TestGetChallengeWithMemoryDatabase(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+        create_challenge(self.players[2], self.players[1])
+        complete_challenge(self.players[2], self.players[1], "1-0")
+        create_challenge(self.players[2], self.players[0])
+
+    def test_get_challenge_returns_the_open_challenge_of_a_player_with_a_completed_challenge(self):
+        c = get_challenge(self.players[2])
+        self.assertEqual((c["p1"]["name"], c["p2"]["name"]), ("gamer2", "gamer0"))
+
+    def test_get_challenge_with_should_be_completed_returns_the_latest_completed_challenge(self):
+        complete_challenge(self.players[2], self.players[0], "1-0", may_be_expired=True)
+        c = get_challenge(self.players[2], should_be_completed=True)
+        self.assertEqual((c["p1"]["name"], c["p2"]["name"]), ("gamer2", "gamer0"))
@@ -7,6 +7,7 @@ from os3_rll.tests import OS3RLLTestCase
 
 class TestResetChallenge(OS3RLLTestCase):
     def setUp(self) -> None:
+        self.unit_of_work = self.set_up_patch("os3_rll.actions.challenge.UnitOfWork", themock=MagicMock())
         self.p1 = 1
         self.p2 = 2
         self.player = self.set_up_patch("os3_rll.actions.challenge.Player", themock=MagicMock())
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge, complete_challenge
+from os3_rll.actions.challenge_tasks.archive_completed_challenges import archive_completed_challenges
+from os3_rll.models.challenge import ChallengeException
+from os3_rll.models.db import Database
+from os3_rll.operations.player import get_average_goals_per_challenge
+
+
+class TestArchiveCompletedChallenges(OS3RLLTestCase):
+    """
+    Runs the archival against the in-memory backend
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.set_up_patch("os3_rll.conf.settings.CHALLENGE_ARCHIVE_BATCH_SIZE", 2)
+        self.players = self.add_memory_players(3)
+        for challenger, defender, score in ((2, 1, "3-0"), (1, 2, "2-1"), (2, 1, "0-1")):
+            create_challenge(self.players[challenger], self.players[defender])
+            complete_challenge(self.players[challenger], self.players[defender], score)
+        with Database() as db:
+            db.execute_prepared_statement("UPDATE `challenges` SET `date`=%s", (datetime.now() - timedelta(days=100),))
+            db.commit()
+
+    def count(self, table):
+        with Database() as db:
+            db.execute("SELECT COUNT(*) FROM `{}`".format(table))
+            return db.fetchone()[0]
+
+    def test_archive_completed_challenges_moves_old_completed_challenges(self):
+        self.assertEqual(archive_completed_challenges(), 3)
+        self.assertEqual(self.count("challenges"), 0)
+        self.assertEqual(self.count("challenges_archive"), 3)
+
+    def test_archive_completed_challenges_keeps_open_and_recent_challenges(self):
+        create_challenge(self.players[1], self.players[0])
+        with Database() as db:
+            db.execute_prepared_statement("UPDATE `challenges` SET `date`=%s WHERE `id`=%s", (datetime.now(), 3))
+            db.commit()
+        self.assertEqual(archive_completed_challenges(days=30), 2)
+        self.assertEqual(self.count("challenges"), 2)
+
+    def test_archive_completed_challenges_keeps_average_goals(self):
+        averages = [get_average_goals_per_challenge(player) for player in self.players]
+        archive_completed_challenges()
+        self.assertEqual([get_average_goals_per_challenge(player) for player in self.players], averages)
+
+    def test_archive_completed_challenges_refuses_to_archive_challenges_which_can_still_be_reset(self):
+        with self.assertRaises(ChallengeException):
+            archive_completed_challenges(days=6)
@@ -7,7 +7,7 @@ from os3_rll.actions.challenge_tasks.check_uncompleted_challenges import check_u
 class TestCheckUncompletedChallenges(OS3RLLTestCase):
     def setUp(self) -> None:
         self.db = self.set_up_context_manager_patch("os3_rll.actions.challenge_tasks.check_uncompleted_challenges.Database")
-        self.db.return_value.__enter__.return_value.fetchall.return_value = ((0, 1, 2, 3),)
+        self.db.return_value.__enter__.return_value.iter_statement.return_value = ((0, 1, 2, 3),)
         self.complete = self.set_up_patch("os3_rll.actions.challenge_tasks.check_uncompleted_challenges.complete_challenge")
         self.announce = self.set_up_patch("os3_rll.actions.challenge_tasks.check_uncompleted_challenges.announce_expired_challenge")
         self.announce.return_value = "test_message"
@@ -18,8 +18,7 @@ class TestCheckUncompletedChallenges(OS3RLLTestCase):
     def test_check_uncompleted_challenges_makes_correct_db_calls(self):
         calls = [
             call(),
-            call().execute("SELECT `id`, `date`, `p1`, `p2` FROM `challenges` WHERE `winner` is NULL"),
-            call().fetchall(),
+            call().iter_statement("challenge.uncompleted"),
         ]
         check_uncompleted()
         self.db.assert_has_calls(calls)
@@ -54,7 +53,7 @@ class TestCheckUncompletedChallenges(OS3RLLTestCase):
         self.assertFalse(self.get_challenge.called)
 
     def test_check_uncompleted_challenges_loops_over_the_db_return_values(self):
-        self.db.return_value.__enter__.return_value.fetchall.return_value = ((0, 1, 2, 3), (4, 5, 6, 7))
+        self.db.return_value.__enter__.return_value.iter_statement.return_value = ((0, 1, 2, 3), (4, 5, 6, 7))
         calls = [call(2, 3, "1-0", may_be_expired=True), call(6, 7, "1-0", may_be_expired=True)]
         check_uncompleted()
         self.complete.assert_has_calls(calls)
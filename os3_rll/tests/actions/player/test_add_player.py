@@ -1,4 +1,4 @@
-from unittest.mock import call
+from unittest.mock import call, MagicMock
 
 from os3_rll.tests import OS3RLLTestCase
 from os3_rll.tests.fixture import player_model_fixture
@@ -7,6 +7,7 @@ from os3_rll.actions.player import add_player
 
 class TestAddPlayer(OS3RLLTestCase):
     def setUp(self) -> None:
+        self.unit_of_work = self.set_up_patch("os3_rll.actions.player.UnitOfWork", themock=MagicMock())
         self.player = self.set_up_patch("os3_rll.actions.player.Player")
         self.player.return_value = player_model_fixture()
         self.gen_passwd = self.set_up_patch("os3_rll.actions.player.generate_password")
@@ -26,3 +27,15 @@ class TestAddPlayer(OS3RLLTestCase):
         self.assertEqual(self.player.return_value.name, "henk")
         self.assertEqual(self.player.return_value.gamertag, "henk123")
         self.assertEqual(self.player.return_value.discord, "henk456")
+
+
+class TestAddPlayerReturnsUsablePlayer(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+
+    def test_add_player_returns_player_which_is_not_bound_to_the_unit_of_work(self):
+        p, _ = add_player("henk", "henk123", "henk456")
+        self.assertIsNone(p.db.unit_of_work)
+        p.wins = 2
+        p.save()
+        p.db.close()
@@ -18,7 +18,7 @@ class TestGetPlayerRanking(OS3RLLTestCase):
         get_player_ranking()
         calls = [
             call(),
-            call().execute("SELECT `discord`, `rank`, `gamertag` FROM `users` WHERE `rank` > 0 ORDER BY `rank`"),
+            call().execute_statement("player.ranking"),
             call().fetchall(),
         ]
         self.db.assert_has_calls(calls)
@@ -0,0 +1,47 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.player import get_player_ranking_async
+from os3_rll.models.db import DBException
+
+
+class AsyncDatabaseStub:
+    """
+    Stands in for AsyncDatabase, unittest.mock only supports async context managers and coroutines from Python 3.8 on
+    """
+
+    def __init__(self, rowcount, rows):
+        self.rowcount = rowcount
+        self.rows = rows
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def execute_statement(self, name, parameters=None):
+        self.statements.append((name, parameters))
+
+    async def fetchall(self):
+        return self.rows
+
+
+class TestGetPlayerRankingAsync(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.db = AsyncDatabaseStub(3, (("bert", 1, "bertje123"), ("jaap", 2, "jaapie")))
+        self.set_up_patch("os3_rll.actions.player.AsyncDatabase", themock=self.db)
+
+    def test_get_player_ranking_async_executes_ranking_query(self):
+        self.run_coroutine(get_player_ranking_async())
+        self.assertEqual(self.db.statements, [("player.ranking", None)])
+
+    def test_get_player_ranking_async_returns_dict_of_player_rankings(self):
+        self.assertEqual(self.run_coroutine(get_player_ranking_async()), {"bert": (1, "bertje123"), "jaap": (2, "jaapie")})
+
+    def test_get_player_ranking_async_throws_db_exception_when_no_rows_are_returned(self):
+        self.db.rowcount = 0
+        with self.assertRaises(DBException):
+            self.run_coroutine(get_player_ranking_async())
@@ -1,44 +1,46 @@
-from unittest.mock import call
-
 from os3_rll.tests import OS3RLLTestCase
 from os3_rll.actions.player import get_player_stats
-from os3_rll.tests.fixture import player_model_fixture
+from os3_rll.models.db import DBException
+from os3_rll.tests.fixture import player_record_fixture
 
 
 class TestGetPlayerStats(OS3RLLTestCase):
     def setUp(self) -> None:
-        self.player = self.set_up_context_manager_patch("os3_rll.actions.player.Player")
-        self.player.return_value = player_model_fixture()
-        self.get_all_player_ids = self.set_up_patch("os3_rll.actions.player.get_all_player_ids_ordered")
-        self.get_all_player_ids.return_value = [1]
-        self.get_avg_goals = self.set_up_patch("os3_rll.actions.player.get_average_goals_per_challenge")
-        self.get_avg_goals.return_value = 20
-
-    def test_get_player_stats_calls_get_all_player_ids_ordered(self):
-        get_player_stats()
-        self.get_all_player_ids.assert_called_once_with()
+        self.player_record = self.set_up_patch("os3_rll.actions.player.PlayerRecord")
+        self.player_record.load_all.return_value = [player_record_fixture()]
+        self.get_avg_goals = self.set_up_patch("os3_rll.actions.player.get_average_goals_per_challenge_of_all_players")
+        self.get_avg_goals.return_value = {self.player_record.load_all.return_value[0].id: 20}
 
-    def test_get_player_stats_calls_player_model(self):
+    def test_get_player_stats_loads_all_players_at_once(self):
         get_player_stats()
-        self.player.assert_called_once_with(self.get_all_player_ids.return_value[0])
+        self.player_record.load_all.assert_called_once_with(order_by="rank")
 
-    def test_get_player_stats_calls_get_average_goals_per_challenge(self):
+    def test_get_player_stats_raises_db_exception_if_there_are_no_players(self):
+        self.player_record.load_all.return_value = []
+        with self.assertRaises(DBException):
+            get_player_stats()
+
+    def test_get_player_stats_gets_the_average_goals_of_all_players_at_once(self):
         get_player_stats()
-        self.get_avg_goals.assert_called_once_with(self.get_all_player_ids.return_value[0])
+        self.get_avg_goals.assert_called_once_with()
 
     def test_get_player_stats_returns_a_dict(self):
         self.assertIsInstance(get_player_stats(), dict)
 
     def test_get_player_stats_returns_player_stats_in_correct_format(self):
         s = get_player_stats()
-        i = self.player.return_value.id
-        self.assertEqual(s[i]["name"], self.player.return_value.gamertag)
-        self.assertEqual(s[i]["discord"], self.player.return_value.discord)
-        self.assertEqual(s[i]["rank"], self.player.return_value.rank)
-        self.assertEqual(s[i]["wins"], self.player.return_value.wins)
-        self.assertEqual(s[i]["losses"], self.player.return_value.losses)
-        self.assertEqual(s[i]["is_challenged"], self.player.return_value.challenged)
+        p = self.player_record.load_all.return_value[0]
+        self.assertEqual(s[p.id]["name"], p.gamertag)
+        self.assertEqual(s[p.id]["discord"], p.discord)
+        self.assertEqual(s[p.id]["rank"], p.rank)
+        self.assertEqual(s[p.id]["wins"], p.wins)
+        self.assertEqual(s[p.id]["losses"], p.losses)
+        self.assertEqual(s[p.id]["is_challenged"], p.challenged)
 
     def test_get_player_stats_returns_average_goals_per_challenge(self):
         s = get_player_stats()
-        self.assertEqual(s[self.player.return_value.id]["avg_goals_per_challenge"], self.get_avg_goals.return_value)
+        self.assertEqual(s[self.player_record.load_all.return_value[0].id]["avg_goals_per_challenge"], 20)
+
+    def test_get_player_stats_returns_no_average_goals_for_players_without_challenges(self):
+        self.get_avg_goals.return_value = {}
+        self.assertEqual(get_player_stats()[self.player_record.load_all.return_value[0].id]["avg_goals_per_challenge"], 0.0)
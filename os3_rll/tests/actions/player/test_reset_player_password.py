@@ -1,4 +1,4 @@
-from unittest.mock import call
+from unittest.mock import call, MagicMock
 
 from os3_rll.tests import OS3RLLTestCase
 from os3_rll.tests.fixture import player_model_fixture
@@ -7,6 +7,7 @@ from os3_rll.actions.player import reset_player_password
 
 class TestAddPlayer(OS3RLLTestCase):
     def setUp(self) -> None:
+        self.unit_of_work = self.set_up_patch("os3_rll.actions.player.UnitOfWork", themock=MagicMock())
         self.player = self.set_up_patch("os3_rll.actions.player.Player")
         self.player.return_value = player_model_fixture()
         self.gen_passwd = self.set_up_patch("os3_rll.actions.player.generate_password")
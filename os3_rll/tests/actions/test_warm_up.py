@@ -0,0 +1,42 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.player import add_player
+from os3_rll.actions.warm_up import get_warm_up_statistics, warm_up
+from os3_rll.models.db import get_connection_pool, get_query_cache
+from os3_rll.models.player import Player
+
+
+class TestWarmUp(OS3RLLTestCase):
+    """
+    Runs the warm up against the in-memory backend
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.set_up_patch("os3_rll.conf.settings.DB_POOL_MIN_SIZE", 3)
+
+    def test_warm_up_opens_the_minimum_amount_of_connections(self):
+        stats = warm_up()
+        self.assertEqual(get_connection_pool().size, 3)
+        self.assertEqual(get_connection_pool().idle, 3)
+        self.assertGreater(stats["connections"], 0)
+
+    def test_warm_up_does_not_cache_when_query_cache_is_disabled(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_QUERY_CACHE_SIZE", 0)
+        add_player("Player 1", "gamer1", "player1#0001")
+        self.assertEqual(warm_up()["cached"], 0)
+
+    def test_warm_up_caches_ranking_and_player_ids(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_QUERY_CACHE_SIZE", 10)
+        self.add_memory_players(2)
+        self.assertEqual(warm_up()["cached"], 3)
+        Player.get_player_id_by_username("player1#0001", discord_name=True)
+        self.assertEqual(get_query_cache().get_statistics()["hits"], 1)
+
+    def test_warm_up_works_without_players(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_QUERY_CACHE_SIZE", 10)
+        # Only the empty ranking is cached
+        self.assertEqual(warm_up()["cached"], 1)
+
+    def test_get_warm_up_statistics_returns_last_warm_up(self):
+        stats = warm_up()
+        self.assertIs(get_warm_up_statistics(), stats)
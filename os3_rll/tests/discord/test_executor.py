@@ -0,0 +1,49 @@
+from threading import Event
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.discord.executor import ActionExecutor, offload, run_action
+
+
+class TestActionExecutor(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.executor = ActionExecutor(1)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_action_executor_counts_active_workers_and_queue_depth(self):
+        started, release = Event(), Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        first = self.executor.submit(block)
+        started.wait(5)
+        second = self.executor.submit(block)
+        self.assertEqual(self.executor.get_statistics(), {"max_workers": 1, "active_workers": 1, "queue_depth": 1})
+        release.set()
+        first.result(5)
+        second.result(5)
+        self.assertEqual(self.executor.active_workers, 0)
+        self.assertEqual(self.executor.queue_depth, 0)
+
+    def test_action_executor_returns_result_of_function(self):
+        self.assertEqual(self.executor.submit(pow, 2, 3).result(5), 8)
+
+
+class TestRunAction(OS3RLLTestCase):
+    def test_run_action_returns_result_of_blocking_function(self):
+        self.assertEqual(self.run_coroutine(run_action(pow, 2, 3)), 8)
+
+    def test_run_action_raises_exception_of_blocking_function(self):
+        def fail():
+            raise KeyError("blaap")
+
+        with self.assertRaises(KeyError):
+            self.run_coroutine(run_action(fail))
+
+    def test_offload_turns_function_into_coroutine(self):
+        @offload
+        def add(a, b=0):
+            return a + b
+
+        self.assertEqual(self.run_coroutine(add(1, b=2)), 3)
@@ -3,6 +3,7 @@ from unittest.mock import Mock
 
 from os3_rll.models.player import Player
 from os3_rll.models.challenge import Challenge
+from os3_rll.models.records import ChallengeRecord, PlayerRecord
 
 
 def player_model_fixture(db_mock=Mock(), **kwargs):
@@ -55,3 +56,21 @@ def challenge_model_fixture(db_mock=Mock(), **kwargs):
             raise KeyError("Unknown challenge model attribute: {}".format(key))
         setattr(c, key, value)
     return c
+
+
+def player_record_fixture(**kwargs):
+    """
+    Get a player record fixture, all values passed replace the values of the fixture
+    """
+    return PlayerRecord(
+        id=1, name="Henk", rank=1, gamertag="testGamertag", discord="testDiscord", wins=1, losses=1, challenged=False, timeout=None
+    )._replace(**kwargs)
+
+
+def challenge_record_fixture(**kwargs):
+    """
+    Get a challenge record fixture, all values passed replace the values of the fixture
+    """
+    return ChallengeRecord(
+        id=1, date=datetime.now(), p1=1, p2=2, p1_wins=1, p2_wins=2, p1_score=10, p2_score=20, winner=2
+    )._replace(**kwargs)
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.migrations.runner import MigrationContext, MigrationException, apply_migrations, get_available_migrations, verify_migrations
+from os3_rll.models.backends.sqlite import SQLiteBackend
+from os3_rll.models.db import Database
+
+
+class TestMigrationRunner(OS3RLLTestCase):
+    def setUp(self) -> None:
+        # A private in-memory database without any migrations applied
+        self.backend = SQLiteBackend(path=":memory:")
+        self.connection = self.backend.connect()
+        self.addCleanup(self.connection.close)
+        self.ctx = MigrationContext(self.backend, self.connection)
+
+    def get_applied_versions(self):
+        self.ctx.execute("SELECT `version` FROM `schema_version` ORDER BY `version`")
+        return [row[0] for row in self.ctx.fetchall()]
+
+    def test_get_available_migrations_is_ordered_by_version(self):
+        versions = [m.version for m in get_available_migrations()]
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(versions[0], 1)
+
+    def test_apply_migrations_records_the_applied_migrations(self):
+        applied = apply_migrations(self.backend, connection=self.connection)
+        self.assertEqual([m.version for m in applied], [m.version for m in get_available_migrations()])
+        self.assertEqual(self.get_applied_versions(), [m.version for m in applied])
+
+    def test_apply_migrations_creates_the_tables(self):
+        apply_migrations(self.backend, connection=self.connection)
+        self.ctx.execute("SELECT COUNT(*) FROM `users`")
+        self.assertEqual(self.ctx.fetchone()[0], 0)
+
+    def test_apply_migrations_is_idempotent(self):
+        apply_migrations(self.backend, connection=self.connection)
+        self.assertEqual(apply_migrations(self.backend, connection=self.connection), [])
+
+    def test_apply_migrations_stops_at_target(self):
+        apply_migrations(self.backend, target=1, connection=self.connection)
+        self.assertEqual(self.get_applied_versions(), [1])
+
+    def test_apply_migrations_converts_challenge_players_to_integers(self):
+        apply_migrations(self.backend, target=2, connection=self.connection)
+        self.ctx.execute(
+            "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `timeout`=%s", ("Henk", "henkie", "henk#1234", datetime.now())
+        )
+        self.ctx.execute(
+            "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `timeout`=%s", ("Piet", "pietje", "piet#1234", datetime.now())
+        )
+        self.ctx.execute("INSERT INTO `challenges` SET `date`=%s, `p1`=%s, `p2`=%s", (datetime.now(), "2", "1"))
+        apply_migrations(self.backend, target=3, connection=self.connection)
+        self.ctx.execute("SELECT `p1`, `p2` FROM `challenges`")
+        self.assertEqual(self.ctx.fetchall(), ((2, 1),))
+        self.assertTrue(self.ctx.index_exists("challenges", "p1_winner_score"))
+
+    def test_apply_migrations_refuses_to_convert_orphaned_challenges(self):
+        apply_migrations(self.backend, target=2, connection=self.connection)
+        self.ctx.execute("INSERT INTO `challenges` SET `date`=%s, `p1`=%s, `p2`=%s", (datetime.now(), "2", "1"))
+        with self.assertRaises(MigrationException):
+            apply_migrations(self.backend, target=3, connection=self.connection)
+
+    def test_add_index_skips_existing_index(self):
+        apply_migrations(self.backend, target=1, connection=self.connection)
+        self.ctx.add_index("users", "test_gamertag", ["gamertag"])
+        self.ctx.add_index("users", "test_gamertag", ["gamertag"])
+        self.assertTrue(self.ctx.index_exists("users", "test_gamertag"))
+
+    def test_drop_index_removes_index(self):
+        apply_migrations(self.backend, target=1, connection=self.connection)
+        self.ctx.add_index("users", "test_gamertag", ["gamertag"])
+        self.ctx.drop_index("users", "test_gamertag")
+        self.assertFalse(self.ctx.index_exists("users", "test_gamertag"))
+
+
+class TestVerifyMigrations(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+
+    def test_verify_migrations_returns_no_problems_on_migrated_database(self):
+        self.assertEqual(verify_migrations(), [])
+
+    def test_verify_migrations_reports_unknown_migrations(self):
+        with Database() as db:
+            db.execute_prepared_statement(
+                "INSERT INTO `schema_version` SET `version`=%s, `name`=%s, `applied_at`=%s", (9999, "future", datetime.now())
+            )
+            db.commit()
+        problems = verify_migrations()
+        self.assertEqual(len(problems), 1)
+        self.assertIn("9999_future", problems[0])
+
+    def test_verify_migrations_reports_missing_migrations(self):
+        with Database() as db:
+            db.execute("DELETE FROM `schema_version`")
+            db.commit()
+        self.assertEqual(
+            verify_migrations(), ["Migration {} has not been applied".format(migration) for migration in get_available_migrations()]
+        )
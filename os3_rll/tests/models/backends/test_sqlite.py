@@ -0,0 +1,129 @@
+import sqlite3
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from os.path import join
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.migrations.runner import apply_migrations
+from os3_rll.models.backends.sqlite import translate_query
+from os3_rll.models.db import Database, UnitOfWork, close_connection_pool, get_query_cache
+from os3_rll.models.player import Player
+from os3_rll.models.challenge import Challenge
+
+
+class TestTranslateQuery(OS3RLLTestCase):
+    def test_translate_query_replaces_backticks_and_placeholders(self):
+        self.assertEqual(translate_query("SELECT `id` FROM `users` WHERE `gamertag`=%s"), 'SELECT "id" FROM "users" WHERE "gamertag"=?')
+
+    def test_translate_query_rewrites_unix_timestamp(self):
+        self.assertEqual(
+            translate_query("SELECT UNIX_TIMESTAMP(`date`) FROM `challenges`"),
+            """SELECT CAST(strftime('%s', "date", 'utc') AS INTEGER) FROM "challenges\"""",
+        )
+
+    def test_translate_query_rewrites_insert_set(self):
+        self.assertEqual(
+            translate_query("INSERT INTO `challenges` SET `date`=%s, `p1`=%s, `p2`=%s"),
+            'INSERT INTO "challenges" ("date", "p1", "p2") VALUES (?, ?, ?)',
+        )
+
+
+class TestSQLiteBackend(OS3RLLTestCase):
+    def setUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.conf.settings.DB_BACKEND", "os3_rll.models.backends.sqlite.SQLiteBackend")
+        self.set_up_patch("os3_rll.conf.settings.DB_SQLITE_PATH", join(directory.name, "os3rl.sqlite3"))
+        apply_migrations()
+        self.timeout = datetime(2020, 4, 20, 21, 32, 55)
+        with Database() as db:
+            db.execute_prepared_statement(
+                "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `password`=%s, `timeout`=%s",
+                ("Henk", "henkie", "henk#1234", 1, "hash", self.timeout),
+            )
+            db.execute_prepared_statement(
+                "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `password`=%s, `timeout`=%s",
+                ("Piet", "pietje", "piet#1234", 2, "hash", self.timeout),
+            )
+            db.commit()
+
+    def test_sqlite_backend_reports_rowcount_of_select(self):
+        with Database() as db:
+            db.execute_prepared_statement("SELECT `id` FROM `users` WHERE `gamertag`=%s", ("henkie",))
+            self.assertEqual(db.rowcount, 1)
+            self.assertEqual(db.fetchone(), (1,))
+
+    def test_sqlite_backend_loads_player_model_with_timestamps(self):
+        with Player(1) as p:
+            self.assertEqual(p.gamertag, "henkie")
+            self.assertEqual(p.rank, 1)
+            self.assertEqual(p.timeout, self.timeout)
+
+    def test_sqlite_backend_saves_challenge_model(self):
+        date = datetime(2020, 4, 21, 12, 0, 0, 123456)
+        with Challenge() as c:
+            c.p1 = 2
+            c.p2 = 1
+            c.date = date
+            c.save()
+        with Challenge(Challenge.get_latest_challenge_from_player(2, 1)) as c:
+            self.assertEqual(c.date, date.replace(microsecond=0))
+            self.assertEqual((c.p1, c.p2), (2, 1))
+
+    def test_sqlite_backend_enforces_challenge_foreign_keys(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            with Challenge() as c:
+                c.p1 = 3
+                c.p2 = 1
+                c.save()
+
+    def test_sqlite_backend_streams_rows(self):
+        with Database() as db:
+            self.assertEqual(list(db.iter_rows("SELECT `gamertag` FROM `users` WHERE `rank` > %s", (1,))), [("pietje",)])
+
+
+class TestSQLiteQueryCache(OS3RLLTestCase):
+    def setUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.conf.settings.DB_BACKEND", "os3_rll.models.backends.sqlite.SQLiteBackend")
+        self.set_up_patch("os3_rll.conf.settings.DB_SQLITE_PATH", join(directory.name, "os3rl.sqlite3"))
+        self.set_up_patch("os3_rll.conf.settings.DB_QUERY_CACHE_SIZE", 10)
+        apply_migrations()
+        with Database() as db:
+            db.execute_prepared_statement(
+                "INSERT INTO `users` SET `name`=%s, `gamertag`=%s, `discord`=%s, `rank`=%s, `password`=%s, `timeout`=%s",
+                ("Henk", "henkie", "Henk#1234", 1, "secret", datetime(2020, 4, 20, 21, 32, 55)),
+            )
+            db.commit()
+
+    def get_ranking(self):
+        with Database() as db:
+            db.execute_statement("player.ranking")
+            return db.rowcount, db.fetchall()
+
+    def test_sqlite_query_cache_serves_repeated_reads(self):
+        self.assertEqual(self.get_ranking(), (1, (("Henk#1234", 1, "henkie"),)))
+        self.assertEqual(self.get_ranking(), (1, (("Henk#1234", 1, "henkie"),)))
+        stats = get_query_cache().get_statistics()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_sqlite_query_cache_is_invalidated_by_committed_write(self):
+        self.get_ranking()
+        with Database() as db:
+            db.execute_prepared_statement("UPDATE `users` SET `rank`=%s WHERE `id`=%s", (2, 1))
+            db.commit()
+        self.assertEqual(self.get_ranking(), (1, (("Henk#1234", 2, "henkie"),)))
+
+    def test_sqlite_query_cache_is_bypassed_in_unit_of_work(self):
+        self.get_ranking()
+        with UnitOfWork():
+            with Database() as db:
+                db.execute_prepared_statement("UPDATE `users` SET `rank`=%s WHERE `id`=%s", (2, 1))
+            self.assertEqual(self.get_ranking(), (1, (("Henk#1234", 2, "henkie"),)))
+        self.assertEqual(self.get_ranking(), (1, (("Henk#1234", 2, "henkie"),)))
+        self.assertEqual(get_query_cache().get_statistics()["hits"], 0)
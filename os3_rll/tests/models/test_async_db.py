@@ -0,0 +1,55 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.async_db import AsyncDatabase, run_in_database_executor
+from os3_rll.models.db import close_connection_pool, get_connection_pool, get_current_unit_of_work, UnitOfWork
+
+
+class TestAsyncDatabase(OS3RLLTestCase):
+    def setUp(self) -> None:
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        # A stand-in connection, the cursor records what is executed on it
+        self.connect = self.set_up_patch("os3_rll.models.backends.mysql.connect")
+        self.cursor = self.connect.return_value.cursor.return_value
+        self.cursor.fetchall.return_value = ((1,), (2,))
+        self.cursor.fetchone.return_value = (1,)
+
+    def test_async_database_executes_queries_on_pooled_connection(self):
+        async def query():
+            async with AsyncDatabase() as db:
+                await db.execute_prepared_statement("SELECT `id` FROM `users` WHERE `id`=%s", (1,))
+                return await db.fetchone()
+
+        self.assertEqual(self.run_coroutine(query()), (1,))
+        self.cursor.execute.assert_called_once_with("SELECT `id` FROM `users` WHERE `id`=%s", (1,))
+
+    def test_async_database_fetchall_returns_rows(self):
+        async def query():
+            async with AsyncDatabase() as db:
+                await db.execute("SELECT `id` FROM `users`")
+                return await db.fetchall()
+
+        self.assertEqual(self.run_coroutine(query()), ((1,), (2,)))
+
+    def test_async_database_commit_commits_connection(self):
+        async def query():
+            async with AsyncDatabase() as db:
+                await db.commit()
+
+        self.run_coroutine(query())
+        self.connect.return_value.commit.assert_called_once_with()
+
+    def test_async_database_returns_connection_to_pool_on_exit(self):
+        async def query():
+            async with AsyncDatabase():
+                pass
+
+        self.run_coroutine(query())
+        self.assertEqual(get_connection_pool().idle, 1)
+
+    def test_run_in_database_executor_copies_context(self):
+        async def run():
+            with UnitOfWork() as uow:
+                return uow, await run_in_database_executor(get_current_unit_of_work)
+
+        uow, seen = self.run_coroutine(run())
+        self.assertIs(uow, seen)
@@ -0,0 +1,90 @@
+from unittest.mock import Mock
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge
+from os3_rll.models.challenge import Challenge, ChallengeException
+from os3_rll.models.db import Database
+
+
+class TestChallengeSave(OS3RLLTestCase):
+    """
+    Saves Challenge models against the in-memory backend
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(2)
+        create_challenge(self.players[1], self.players[0])
+        self.challenge = Challenge.get_latest_challenge_from_player(self.players[1], self.players[0])
+        self.statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            self.statements.append(query)
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+
+    def updates(self):
+        return [query for query in self.statements if query.startswith("UPDATE")]
+
+    def test_challenge_save_only_updates_the_results(self):
+        with Challenge(self.challenge) as c:
+            c.p1_wins, c.p2_wins, c.p1_score, c.p2_score = 2, 1, 5, 3
+            c.save()
+        self.assertEqual(
+            self.updates(),
+            [
+                "UPDATE `challenges` SET `p1_wins`=%s, `p2_wins`=%s, `p1_score`=%s, `p2_score`=%s, `winner`=%s, `version`=`version` + 1 "
+                "WHERE `id`=%s AND `version`=%s"
+            ],
+        )
+        with Challenge(self.challenge) as c:
+            self.assertEqual((c.p1_wins, c.p2_wins, c.winner), (2, 1, self.players[1]))
+
+    def test_challenge_save_skips_write_when_nothing_changed(self):
+        with Challenge(self.challenge) as c:
+            c.save()
+        self.assertEqual(self.updates(), [])
+
+    def test_challenge_save_raises_on_concurrent_change_to_same_column(self):
+        first, second = Challenge(self.challenge), Challenge(self.challenge)
+        first.p1_wins, first.p2_wins = 2, 1
+        first.save()
+        second.p1_wins, second.p2_wins = 0, 1
+        with self.assertRaises(ChallengeException):
+            second.save()
+
+
+class TestChallengeLoadMany(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(4)
+        create_challenge(self.players[1], self.players[0])
+        create_challenge(self.players[3], self.players[2])
+
+    def test_challenge_load_many_returns_challenges_in_order_of_ids(self):
+        challenges = Challenge.load_many([2, 1])
+        self.assertEqual([(c.p1, c.p2) for c in challenges], [(self.players[3], self.players[2]), (self.players[1], self.players[0])])
+
+    def test_challenge_load_many_raises_challenge_exception_for_unknown_id(self):
+        with self.assertRaises(ChallengeException):
+            Challenge.load_many([1, 3])
+
+
+class TestChallengeLazy(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(2)
+        create_challenge(self.players[1], self.players[0])
+        self.database = self.set_up_patch("os3_rll.models.challenge.Database", Mock(side_effect=Database))
+
+    def test_lazy_challenge_does_not_connect_when_only_the_id_is_used(self):
+        with Challenge(1, force=True, lazy=True) as c:
+            self.assertEqual(c.id, 1)
+        self.assertFalse(c.loaded)
+        self.assertFalse(self.database.called)
+
+    def test_lazy_challenge_is_loaded_when_another_attribute_is_used(self):
+        with Challenge(1, lazy=True) as c:
+            self.assertEqual((c.p1, c.p2), (self.players[1], self.players[0]))
+            self.assertTrue(c.loaded)
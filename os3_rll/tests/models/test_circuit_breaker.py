@@ -0,0 +1,68 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+
+class TestCircuitBreaker(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.monotonic = self.set_up_patch("os3_rll.models.circuit_breaker.monotonic", return_value=100.0)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    def trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_circuit_breaker_allows_calls_when_closed(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_circuit_breaker_opens_after_consecutive_failures(self):
+        self.trip()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.trips, 1)
+
+    def test_circuit_breaker_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_circuit_breaker_lets_a_single_probe_through_after_reset_timeout(self):
+        self.trip()
+        self.monotonic.return_value = 130.0
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_circuit_breaker_closes_when_probe_succeeds(self):
+        self.trip()
+        self.monotonic.return_value = 130.0
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_circuit_breaker_opens_again_when_probe_fails(self):
+        self.trip()
+        self.monotonic.return_value = 130.0
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.trips, 2)
+
+    def test_circuit_breaker_lets_another_probe_through_when_probe_never_reports_back(self):
+        self.trip()
+        self.monotonic.return_value = 130.0
+        self.breaker.allow()
+        self.monotonic.return_value = 160.0
+        self.assertTrue(self.breaker.allow())
+
+    def test_circuit_breaker_is_disabled_with_threshold_0(self):
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        self.assertTrue(breaker.allow())
@@ -1,12 +1,222 @@
+from unittest.mock import ANY, MagicMock
+
+from pymysql import MySQLError, OperationalError, ProgrammingError
+from pymysql.cursors import SSCursor
+
 from os3_rll.tests import OS3RLLTestCase
-from os3_rll.models.db import Database
+from os3_rll.models.db import (
+    Database,
+    DatabaseUnavailable,
+    DBException,
+    UnitOfWork,
+    close_connection_pool,
+    get_circuit_breaker,
+    get_connection_pool,
+    get_query_cache,
+)
+from os3_rll.models.instrumentation import fingerprint, query_registry
+from os3_rll.models.statements import StatementException, get_statement
+from os3_rll.models.replicas import read_only, reset_current_user, set_current_user
 from os3_rll.conf import settings
 
 
 class TestDBModel(OS3RLLTestCase):
     def setUp(self) -> None:
-        self.connect = self.set_up_patch("os3_rll.models.db.connect")
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.connect = self.set_up_patch("os3_rll.models.backends.mysql.connect")
 
     def test_db_connect_calls_connect_method(self):
         Database()
-        self.connect.assert_called_once_with(settings.DB_HOST, settings.DB_USER, settings.DB_PASS, settings.DB_DATABASE)
+        self.connect.assert_called_once_with(
+            settings.DB_HOST,
+            settings.DB_USER,
+            settings.DB_PASS,
+            settings.DB_DATABASE,
+            connect_timeout=settings.DB_CONNECT_TIMEOUT,
+            read_timeout=settings.DB_READ_TIMEOUT,
+            write_timeout=settings.DB_WRITE_TIMEOUT,
+        )
+
+    def test_db_reuses_pooled_connection_after_close(self):
+        with Database():
+            pass
+        with Database() as db:
+            self.assertEqual(db.db, self.connect.return_value)
+        self.connect.assert_called_once()
+
+    def test_db_rolls_back_uncommitted_work_when_returning_connection(self):
+        with Database():
+            pass
+        self.connect.return_value.rollback.assert_called_once_with()
+
+    def test_db_close_can_be_called_twice(self):
+        db = Database()
+        db.close()
+        db.close()
+        self.assertEqual(get_connection_pool().idle, 1)
+
+    def test_db_raises_db_exception_when_pool_is_exhausted(self):
+        pool = get_connection_pool()
+        pool.max_size = 1
+        pool.checkout_timeout = 0
+        with Database():
+            with self.assertRaises(DBException):
+                Database()
+
+    def test_db_iter_rows_streams_rows_in_batches_from_unbuffered_cursor(self):
+        cursor = self.connect.return_value.cursor.return_value
+        cursor.fetchmany.side_effect = [((1,), (2,)), ((3,),), ()]
+        with Database() as db:
+            rows = list(db.iter_rows("SELECT `id` FROM `challenges` WHERE `p1`=%s", (1,), batch_size=2))
+        self.assertEqual(rows, [(1,), (2,), (3,)])
+        self.connect.return_value.cursor.assert_called_with(SSCursor)
+        cursor.execute.assert_called_with("SELECT `id` FROM `challenges` WHERE `p1`=%s", (1,))
+        cursor.fetchmany.assert_called_with(2)
+
+    def test_db_iter_rows_only_records_the_time_spent_on_the_database(self):
+        cursor = self.connect.return_value.cursor.return_value
+        cursor.fetchmany.side_effect = [((1,),), ((2,),), ()]
+        # execute takes 1 second, every fetch 0.5 seconds and the consumer 10 seconds per row
+        self.set_up_patch("os3_rll.models.db.perf_counter", MagicMock(side_effect=[0, 1, 1, 1.5, 11.5, 12, 22, 22.5]))
+        record = self.set_up_patch("os3_rll.models.db.Database._record")
+        with Database() as db:
+            for _ in db.iter_rows("SELECT `id` FROM `challenges`"):
+                pass
+        record.assert_called_once_with("SELECT `id` FROM `challenges`", None, 2.5, 2)
+
+    def test_db_records_executed_statements_in_query_registry(self):
+        query_registry.reset()
+        self.connect.return_value.cursor.return_value.rowcount = 3
+        with Database() as db:
+            db.execute_prepared_statement("SELECT `id` FROM `users` WHERE `id`=%s", (1,))
+        stats = query_registry.top()
+        self.assertEqual(stats[0]["fingerprint"], "SELECT `id` FROM `users` WHERE `id`=?")
+        self.assertEqual(stats[0]["rows"], 3)
+
+    def test_db_execute_statement_records_registered_statement_in_query_registry(self):
+        query_registry.reset()
+        with Database() as db:
+            db.execute_statement("player.get_info", (1,))
+        self.assertEqual(query_registry.top()[0]["fingerprint"], fingerprint(get_statement("player.get_info").sql))
+
+    def test_db_execute_statement_raises_statement_exception_on_unknown_statement(self):
+        with Database() as db:
+            with self.assertRaises(StatementException):
+                db.execute_statement("player.does_not_exist")
+
+    def test_db_logs_and_explains_statements_exceeding_slow_query_threshold(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_SLOW_QUERY_THRESHOLD", 0)
+        log_slow_query = self.set_up_patch("os3_rll.models.db.log_slow_query")
+        explain = self.connect.return_value.cursor.return_value.fetchall.return_value = ((1, "SIMPLE", "users"),)
+        with Database() as db:
+            db.execute_prepared_statement("SELECT `id` FROM `users` WHERE `id`=%s", (1,))
+        self.connect.return_value.cursor.return_value.execute.assert_called_with("EXPLAIN SELECT `id` FROM `users` WHERE `id`=%s", (1,))
+        log_slow_query.assert_called_once_with("SELECT `id` FROM `users` WHERE `id`=%s", (1,), ANY, explain=explain)
+
+    def test_db_does_not_log_statements_below_slow_query_threshold(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_SLOW_QUERY_THRESHOLD", 10)
+        log_slow_query = self.set_up_patch("os3_rll.models.db.log_slow_query")
+        with Database() as db:
+            db.execute("SELECT 1")
+        log_slow_query.assert_not_called()
+
+
+class TestDBModelReplicas(OS3RLLTestCase):
+    def setUp(self) -> None:
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.conf.settings.DB_REPLICA_HOSTS", ["replica1", "replica2"])
+        self.connect = self.set_up_patch("os3_rll.models.backends.mysql.connect")
+
+    def connected_host(self):
+        return self.connect.call_args[0][0]
+
+    def test_db_uses_the_primary_by_default(self):
+        with Database() as db:
+            self.assertIsNone(db.host)
+        self.assertEqual(self.connected_host(), settings.DB_HOST)
+
+    def test_db_sends_read_only_work_to_the_replicas_round_robin(self):
+        hosts = []
+        for _ in range(3):
+            with Database(read_only=True) as db:
+                hosts.append(db.host)
+        self.assertEqual(hosts, ["replica1", "replica2", "replica1"])
+
+    def test_db_read_only_block_sets_the_read_intent(self):
+        with read_only(), Database() as db:
+            self.assertTrue(db.read_only)
+            self.assertEqual(db.host, "replica1")
+
+    def test_db_falls_back_to_the_primary_when_replica_is_unavailable(self):
+        self.connect.side_effect = [MySQLError("replica1 is down"), MagicMock()]
+        with Database(read_only=True) as db:
+            self.assertIsNone(db.host)
+        self.assertEqual(self.connected_host(), settings.DB_HOST)
+
+    def test_db_reads_from_the_primary_after_a_write_by_the_same_user(self):
+        token = set_current_user("henk#1234")
+        self.addCleanup(reset_current_user, token)
+        with Database() as db:
+            db.commit()
+        with Database(read_only=True) as db:
+            self.assertIsNone(db.host)
+
+    def test_db_does_not_use_the_query_cache_on_a_replica(self):
+        self.set_up_patch("os3_rll.conf.settings.DB_QUERY_CACHE_SIZE", 10)
+        cursor = self.connect.return_value.cursor.return_value
+        cursor.fetchall.return_value = (("Henk#1234", 1, "henkie"),)
+        with Database() as db:
+            db.execute_statement("player.ranking")
+            db.fetchall()
+        for _ in range(2):
+            with Database(read_only=True) as db:
+                db.execute_statement("player.ranking")
+                db.fetchall()
+        stats = get_query_cache().get_statistics()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (0, 1, 1))
+        self.assertEqual(cursor.execute.call_count, 3)
+
+    def test_db_unit_of_work_takes_precedence_over_read_intent(self):
+        with UnitOfWork() as uow, Database(read_only=True) as db:
+            self.assertIs(db.db, uow.connection)
+            self.assertIsNone(db.host)
+
+
+class TestDBModelCircuitBreaker(OS3RLLTestCase):
+    def setUp(self) -> None:
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.conf.settings.DB_CIRCUIT_BREAKER_THRESHOLD", 2)
+        self.connect = self.set_up_patch("os3_rll.models.backends.mysql.connect")
+        self.cursor = self.connect.return_value.cursor.return_value
+
+    def test_db_raises_database_unavailable_when_statement_times_out(self):
+        self.cursor.execute.side_effect = OperationalError(2013, "Lost connection to MySQL server during query (timed out)")
+        with Database() as db:
+            with self.assertRaises(DatabaseUnavailable):
+                db.execute_statement("player.max_rank")
+
+    def test_db_raises_database_unavailable_when_unable_to_connect(self):
+        self.connect.side_effect = OperationalError(2003, "Can't connect to MySQL server")
+        with self.assertRaises(DatabaseUnavailable):
+            Database()
+
+    def test_db_fails_fast_while_circuit_breaker_is_open(self):
+        self.connect.side_effect = OperationalError(2003, "Can't connect to MySQL server")
+        for _ in range(2):
+            with self.assertRaises(DatabaseUnavailable):
+                Database()
+        self.connect.reset_mock()
+        with self.assertRaises(DatabaseUnavailable):
+            Database()
+        self.connect.assert_not_called()
+
+    def test_db_does_not_count_query_errors_as_unavailability(self):
+        self.cursor.execute.side_effect = ProgrammingError(1064, "You have an error in your SQL syntax")
+        with Database() as db:
+            for _ in range(3):
+                with self.assertRaises(ProgrammingError):
+                    db.execute("SELEC 1")
+        self.assertEqual(get_circuit_breaker().state, "closed")
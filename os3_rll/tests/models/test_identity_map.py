@@ -0,0 +1,104 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge
+from os3_rll.models.challenge import Challenge
+from os3_rll.models.db import Database, UnitOfWork
+from os3_rll.models.identity_map import get_current_identity_map, identity_map_scope
+from os3_rll.models.player import Player
+
+
+class TestIdentityMap(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+        self.statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            self.statements.append(query)
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+
+    def test_identity_map_returns_the_same_player_without_loading_it_again(self):
+        with identity_map_scope():
+            with Player(self.players[0]) as p:
+                p.wins = 2
+                p.save()
+            del self.statements[:]
+            with Player(self.players[0]) as p2:
+                self.assertIs(p2, p)
+                self.assertEqual(p2.wins, 2)
+        self.assertEqual(self.statements, [])
+
+    def test_identity_map_is_not_used_outside_of_a_scope(self):
+        self.assertIsNone(get_current_identity_map())
+        with Player(self.players[0]) as p, Player(self.players[0]) as p2:
+            self.assertIsNot(p, p2)
+
+    def test_identity_map_does_not_share_instances_loaded_with_another_force(self):
+        with identity_map_scope():
+            self.assertIsNot(Player(self.players[0]), Player(self.players[0], force=True))
+
+    def test_identity_map_does_not_share_new_offline_or_prefilled_instances(self):
+        with identity_map_scope() as identity_map:
+            Player()
+            Player(self.players[0], offline=True)
+            Player.load_many(self.players)
+            self.assertEqual(len(identity_map), 0)
+
+    def test_identity_map_shares_lazy_instances(self):
+        with identity_map_scope():
+            p = Player(self.players[0], lazy=True)
+            self.assertIs(Player(self.players[0]), p)
+            self.assertEqual(p.gamertag, "gamer0")
+            self.assertIs(Player(self.players[0]), p)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_identity_map_is_used_by_load_many(self):
+        with identity_map_scope():
+            p = Player(self.players[1])
+            del self.statements[:]
+            players = Player.load_many(self.players)
+            self.assertIs(players[1], p)
+            self.assertEqual([player.gamertag for player in players], ["gamer0", "gamer1", "gamer2"])
+            self.assertEqual(len(self.statements), 1)
+            del self.statements[:]
+            self.assertEqual(Player.load_many([self.players[1]]), [p])
+            self.assertEqual(self.statements, [])
+
+    def test_identity_map_shares_challenges(self):
+        create_challenge(self.players[1], self.players[0])
+        with identity_map_scope():
+            c = Challenge(1)
+            self.assertIs(Challenge(1), c)
+            self.assertEqual(Challenge.load_many([1]), [c])
+
+    def test_identity_map_keeps_connections_until_it_is_reset(self):
+        with identity_map_scope():
+            with Player(self.players[0]) as p:
+                pass
+            self.assertFalse(p.db.closed)
+        self.assertTrue(p.db.closed)
+
+    def test_identity_map_gives_instances_of_an_ended_unit_of_work_a_new_database(self):
+        with identity_map_scope():
+            with UnitOfWork() as unit_of_work:
+                p = Player(self.players[0])
+            self.assertIs(p.db.unit_of_work, unit_of_work)
+            self.assertIs(Player(self.players[0]), p)
+            self.assertIsNone(p.db.unit_of_work)
+            p.wins = 3
+            p.save()
+        with Player(self.players[0]) as p:
+            self.assertEqual(p.wins, 3)
+
+    def test_identity_map_drops_instances_of_a_unit_of_work_that_was_rolled_back(self):
+        with identity_map_scope():
+            with self.assertRaises(RuntimeError):
+                with UnitOfWork(), Player(self.players[0]) as p:
+                    p.wins = 3
+                    p.save()
+                    raise RuntimeError("Something went wrong")
+            p2 = Player(self.players[0])
+            self.assertIsNot(p2, p)
+            self.assertEqual(p2.wins, 0)
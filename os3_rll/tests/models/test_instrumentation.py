@@ -0,0 +1,56 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.instrumentation import command_scope, fingerprint, get_current_command, QueryRegistry
+
+
+class TestFingerprint(OS3RLLTestCase):
+    def test_fingerprint_replaces_placeholders(self):
+        self.assertEqual(fingerprint("SELECT `id` FROM `users` WHERE `gamertag`=%s"), "SELECT `id` FROM `users` WHERE `gamertag`=?")
+
+    def test_fingerprint_replaces_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT `id` FROM `challenges` WHERE (`p1`=12 OR `p2`='12') ORDER BY `id` LIMIT 1"),
+            "SELECT `id` FROM `challenges` WHERE (`p1`=? OR `p2`=?) ORDER BY `id` LIMIT ?",
+        )
+
+    def test_fingerprint_keeps_numbers_in_identifiers(self):
+        self.assertEqual(fingerprint("SELECT AVG(`p1_score`) FROM `challenges`"), "SELECT AVG(`p1_score`) FROM `challenges`")
+
+    def test_fingerprint_collapses_value_lists_and_whitespace(self):
+        self.assertEqual(fingerprint("SELECT  *\n FROM `users` WHERE `id` IN (%s, %s,%s)"), "SELECT * FROM `users` WHERE `id` IN (...)")
+
+
+class TestQueryRegistry(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.registry = QueryRegistry()
+
+    def test_query_registry_groups_statements_by_fingerprint(self):
+        self.registry.record("SELECT `id` FROM `users` WHERE `id`=1", 0.1, 1)
+        self.registry.record("SELECT `id` FROM `users` WHERE `id`=2", 0.3, 1)
+        stats = self.registry.top()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["count"], 2)
+        self.assertAlmostEqual(stats[0]["total_time"], 0.4)
+        self.assertAlmostEqual(stats[0]["max_time"], 0.3)
+        self.assertEqual(stats[0]["rows"], 2)
+
+    def test_query_registry_attributes_statements_to_current_command(self):
+        with command_scope("get_ranking"):
+            self.assertEqual(get_current_command(), "get_ranking")
+            self.registry.record("SELECT 1", 0.1, 1)
+        self.registry.record("SELECT 1", 0.1, 1)
+        self.assertEqual(self.registry.top()[0]["commands"], {"get_ranking": 1, None: 1})
+
+    def test_query_registry_top_orders_by_statistic(self):
+        self.registry.record("SELECT 1", 0.5, 1)
+        self.registry.record("SELECT `id` FROM `users`", 0.1, 20)
+        self.assertEqual(self.registry.top(n=1, order_by="rows")[0]["fingerprint"], "SELECT `id` FROM `users`")
+        self.assertEqual(self.registry.top(n=1)[0]["fingerprint"], "SELECT ?")
+
+    def test_query_registry_top_raises_key_error_on_unknown_statistic(self):
+        self.registry.record("SELECT 1", 0.5, 1)
+        with self.assertRaises(KeyError):
+            self.registry.top(order_by="banaan")
+
+    def test_query_registry_ignores_unknown_row_counts(self):
+        self.registry.record("SELECT 1", 0.5, -1)
+        self.assertEqual(self.registry.top()[0]["rows"], 0)
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge
+from os3_rll.actions.player import add_player
+from os3_rll.models.db import Database
+from os3_rll.models.player import Player, PlayerException
+
+
+class TestPlayerSave(OS3RLLTestCase):
+    """
+    Saves Player models against the in-memory backend
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.player = add_player("Henk", "henkie", "Henk#1234")[0].id
+        self.statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            self.statements.append(query)
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+
+    def updates(self):
+        return [query for query in self.statements if query.startswith("UPDATE")]
+
+    def test_player_save_only_updates_modified_columns(self):
+        with Player(self.player) as p:
+            p.challenged = True
+            p.save()
+        self.assertEqual(self.updates(), ["UPDATE `users` SET `challenged`=%s, `version`=`version` + 1 WHERE `id`=%s AND `version`=%s"])
+        with Player(self.player) as p:
+            self.assertTrue(p.challenged)
+
+    def test_player_save_skips_write_when_nothing_changed(self):
+        with Player(self.player) as p:
+            p.wins = p.wins
+            p.save()
+        self.assertEqual(self.updates(), [])
+
+    def test_player_save_writes_timeout(self):
+        timeout = datetime.now() + timedelta(weeks=1)
+        with Player(self.player) as p:
+            p.timeout = timeout
+            p.save()
+            self.assertEqual(p.get_changed_columns(), ())
+        with Player(self.player) as p:
+            self.assertEqual(p.timeout, timeout.replace(microsecond=0))
+
+    def test_player_save_keeps_concurrent_changes_to_other_columns(self):
+        first, second = Player(self.player), Player(self.player)
+        first.wins = 1
+        first.save()
+        second.losses = 1
+        second.save()
+        with Player(self.player) as p:
+            self.assertEqual((p.wins, p.losses), (1, 1))
+
+    def test_player_save_of_a_timeout_keeps_concurrent_changes_to_a_player_without_timeout(self):
+        with Database() as db:
+            db.execute_prepared_statement("UPDATE `users` SET `timeout`='0000-00-00 00:00:00' WHERE `id`=%s", (self.player,))
+            db.commit()
+        first, second = Player(self.player), Player(self.player)
+        first.wins = 1
+        first.save()
+        timeout = datetime.now() + timedelta(weeks=1)
+        second.timeout = timeout
+        second.save()
+        with Player(self.player) as p:
+            self.assertEqual((p.wins, p.timeout), (1, timeout.replace(microsecond=0)))
+
+    def test_player_save_raises_on_concurrent_change_to_same_column(self):
+        first, second = Player(self.player), Player(self.player)
+        first.wins = 1
+        first.save()
+        second.wins = 2
+        with self.assertRaises(PlayerException):
+            second.save()
+
+    def test_player_save_does_not_read_the_player_again(self):
+        with Player(self.player) as p:
+            self.statements.clear()
+            p.wins = 1
+            p.save()
+        self.assertEqual(len(self.statements), 1)
+
+    def test_player_save_raises_on_concurrent_change_to_same_column_even_after_other_update(self):
+        first, second = Player(self.player), Player(self.player)
+        first.wins = 1
+        first.save()
+        with Database() as db:
+            db.execute_statement("player.shift_ranks_down", (0, 10))
+            db.commit()
+        second.wins = 2
+        with self.assertRaises(PlayerException):
+            second.save()
+
+    def test_player_save_with_force_overwrites_concurrent_change(self):
+        first, second = Player(self.player), Player(self.player, force=True)
+        first.wins = 1
+        first.save()
+        second.wins = 2
+        second.save()
+        with Player(self.player) as p:
+            self.assertEqual(p.wins, 2)
+
+    def test_player_save_writes_password_in_the_same_update(self):
+        with Player(self.player) as p:
+            p.password = "secret"
+            p.save()
+        self.assertEqual(len(self.updates()), 1)
+        self.assertIn("`password`=%s", self.updates()[0])
+
+    def test_player_save_twice_does_not_conflict_with_itself(self):
+        with Player(self.player) as p:
+            p.wins = 1
+            p.save()
+            p.wins = 2
+            p.save()
+        with Player(self.player) as p:
+            self.assertEqual(p.wins, 2)
+
+    def test_player_delete_removes_a_player_without_challenges(self):
+        with Player(self.player, force=True) as p:
+            p.delete()
+        with self.assertRaises(PlayerException):
+            Player(self.player)
+
+    def test_player_delete_refuses_a_player_with_challenges(self):
+        opponent = add_player("Piet", "pietje", "Piet#1234")[0].id
+        create_challenge(opponent, self.player)
+        with self.assertRaisesRegex(PlayerException, "has challenges"):
+            Player(self.player, force=True).delete()
+        with Player(self.player) as p:
+            self.assertEqual(p.gamertag, "henkie")
+
+
+class TestPlayerLoadMany(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+
+    def test_player_load_many_returns_players_in_order_of_ids(self):
+        players = Player.load_many([self.players[2], self.players[0]])
+        self.assertEqual([p.gamertag for p in players], ["gamer2", "gamer0"])
+        self.assertEqual([p.rank for p in players], [3, 1])
+        self.assertTrue(all(p.offline for p in players))
+
+    def test_player_load_many_uses_a_single_query(self):
+        statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            statements.append(query)
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+        Player.load_many(self.players)
+        self.assertEqual(len(statements), 1)
+
+    def test_player_load_many_raises_player_exception_for_unknown_id(self):
+        with self.assertRaises(PlayerException):
+            Player.load_many([self.players[0], 42])
+
+    def test_player_load_many_returns_empty_list_for_no_ids(self):
+        self.assertEqual(Player.load_many([]), [])
+
+    def test_player_load_many_shares_database_that_is_passed(self):
+        with Database() as db:
+            players = Player.load_many(self.players[:2], db=db)
+            self.assertTrue(all(p.db is db for p in players))
+            with players[0] as p:
+                p.wins = 3
+                p.save()
+            players[1].wins = 4
+            players[1].save()
+        with Player(self.players[1]) as p:
+            self.assertEqual(p.wins, 4)
+
+
+class TestPlayerLazy(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.player = add_player("Henk", "henkie", "Henk#1234")[0].id
+        self.database = self.set_up_patch("os3_rll.models.player.Database", Mock(side_effect=Database))
+
+    def test_lazy_player_does_not_connect_when_only_the_id_is_used(self):
+        with Player(self.player, lazy=True) as p:
+            self.assertEqual(p.id, self.player)
+        self.assertFalse(p.loaded)
+        self.assertFalse(self.database.called)
+
+    def test_lazy_player_is_loaded_when_another_attribute_is_used(self):
+        p = Player(self.player, lazy=True)
+        self.assertEqual(p.gamertag, "henkie")
+        self.assertTrue(p.loaded)
+        self.database.assert_called_once_with()
+        p.db.close()
+
+    def test_lazy_player_is_loaded_before_it_is_modified(self):
+        with Player(self.player, force=True, lazy=True) as p:
+            p.wins = 2
+        with Player(self.player) as p:
+            self.assertEqual(p.wins, 2)
+            self.assertEqual(p.gamertag, "henkie")
+
+    def test_lazy_player_raises_attribute_error_for_unknown_attributes_once_loaded(self):
+        with Player(self.player, lazy=True) as p:
+            with self.assertRaises(AttributeError):
+                p.unknown  # pylint: disable=pointless-statement
+            self.assertTrue(p.loaded)
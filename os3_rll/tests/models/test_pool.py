@@ -0,0 +1,97 @@
+from threading import Thread
+from unittest.mock import Mock
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.pool import ConnectionPool, PoolException
+
+
+class TestConnectionPool(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.factory = Mock(side_effect=lambda: Mock())
+        self.pool = ConnectionPool(self.factory, max_size=2, idle_timeout=300, max_lifetime=3600, checkout_timeout=0)
+
+    def test_pool_opens_connection_on_first_acquire(self):
+        pooled = self.pool.acquire()
+        self.factory.assert_called_once_with()
+        self.assertEqual(self.pool.size, 1)
+
+    def test_pool_reuses_released_connection(self):
+        first = self.pool.acquire()
+        self.pool.release(first)
+        second = self.pool.acquire()
+        self.assertIs(first, second)
+        self.factory.assert_called_once_with()
+
+    def test_pool_raises_pool_exception_when_exhausted(self):
+        self.pool.acquire()
+        self.pool.acquire()
+        with self.assertRaises(PoolException):
+            self.pool.acquire()
+
+    def test_pool_waits_for_released_connection(self):
+        self.pool.checkout_timeout = 5
+        first = self.pool.acquire()
+        self.pool.acquire()
+        Thread(target=self.pool.release, args=(first,)).start()
+        self.assertIs(self.pool.acquire(), first)
+
+    def test_pool_closes_connections_which_are_idle_too_long(self):
+        pooled = self.pool.acquire()
+        self.pool.release(pooled)
+        pooled.last_used -= self.pool.idle_timeout + 1
+        self.assertIsNot(self.pool.acquire(), pooled)
+        pooled.connection.close.assert_called_once_with()
+
+    def test_pool_closes_connections_exceeding_max_lifetime(self):
+        pooled = self.pool.acquire()
+        pooled.created_at -= self.pool.max_lifetime + 1
+        self.pool.release(pooled)
+        pooled.connection.close.assert_called_once_with()
+        self.assertEqual(self.pool.size, 0)
+
+    def test_pool_discards_connection_which_cannot_be_rolled_back(self):
+        pooled = self.pool.acquire()
+        pooled.connection.rollback.side_effect = IOError
+        self.pool.release(pooled)
+        self.assertEqual(self.pool.idle, 0)
+        self.assertEqual(self.pool.size, 0)
+
+    def test_pool_frees_slot_when_factory_raises(self):
+        self.factory.side_effect = IOError
+        with self.assertRaises(IOError):
+            self.pool.acquire()
+        self.assertEqual(self.pool.size, 0)
+
+    def test_pool_close_closes_idle_connections(self):
+        pooled = self.pool.acquire()
+        self.pool.release(pooled)
+        self.pool.close()
+        pooled.connection.close.assert_called_once_with()
+        self.assertEqual(self.pool.size, 0)
+
+
+class TestConnectionPoolFill(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.factory = Mock(side_effect=lambda: Mock())
+        self.pool = ConnectionPool(self.factory, max_size=3, idle_timeout=300, max_lifetime=3600, checkout_timeout=0)
+
+    def test_pool_fill_opens_idle_connections(self):
+        self.assertEqual(self.pool.fill(2), 2)
+        self.assertEqual((self.pool.size, self.pool.idle), (2, 2))
+        self.pool.acquire()
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_pool_fill_counts_connections_already_open(self):
+        self.pool.acquire()
+        self.assertEqual(self.pool.fill(2), 1)
+        self.assertEqual(self.pool.size, 2)
+
+    def test_pool_fill_does_not_exceed_max_size(self):
+        self.assertEqual(self.pool.fill(5), 3)
+        self.assertEqual(self.pool.size, 3)
+
+    def test_pool_fill_releases_slot_when_connecting_fails(self):
+        self.factory.side_effect = RuntimeError("Connection refused")
+        with self.assertRaises(RuntimeError):
+            self.pool.fill(2)
+        self.assertEqual(self.pool.size, 0)
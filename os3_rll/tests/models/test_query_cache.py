@@ -0,0 +1,86 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.query_cache import CachedResult, QueryCache, get_tables, is_write
+
+
+class TestGetTables(OS3RLLTestCase):
+    def test_get_tables_returns_tables_of_select(self):
+        self.assertEqual(get_tables("SELECT `id` FROM `users` WHERE `rank` > 0"), frozenset(["users"]))
+
+    def test_get_tables_returns_joined_tables(self):
+        query = "SELECT c.id FROM challenges c JOIN `users` u ON u.id = c.p1"
+        self.assertEqual(get_tables(query), frozenset(["challenges", "users"]))
+
+    def test_get_tables_returns_tables_of_writes(self):
+        self.assertEqual(get_tables("INSERT INTO `challenges` SET `date`=%s"), frozenset(["challenges"]))
+        self.assertEqual(get_tables("UPDATE `users` SET `rank`=%s"), frozenset(["users"]))
+        self.assertEqual(get_tables("DELETE FROM `users` WHERE `id`=%s"), frozenset(["users"]))
+
+
+class TestIsWrite(OS3RLLTestCase):
+    def test_is_write_detects_writes(self):
+        for query in ("INSERT INTO `users` SET `name`=%s", " update `users` SET `rank`=1", "DELETE FROM `users`"):
+            self.assertTrue(is_write(query))
+
+    def test_is_write_returns_false_for_reads(self):
+        self.assertFalse(is_write("SELECT `id` FROM `users` WHERE `name`='UPDATE'"))
+
+
+class TestCachedResult(OS3RLLTestCase):
+    def test_cached_result_reads_like_a_cursor(self):
+        result = CachedResult(((1,), (2,), (3,)))
+        self.assertEqual(result.rowcount, 3)
+        self.assertEqual(result.fetchone(), (1,))
+        self.assertEqual(result.fetchall(), ((2,), (3,)))
+        self.assertIsNone(result.fetchone())
+
+
+class TestQueryCache(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.cache = QueryCache(max_size=2)
+        self.query = "SELECT `id` FROM `users` WHERE `discord`=%s"
+
+    def test_query_cache_returns_cached_rows(self):
+        self.cache.set(self.query, ("Pietje#1234",), self.cache.get_versions(["users"]), [(1,)])
+        self.assertEqual(self.cache.get(self.query, ("Pietje#1234",)), ((1,),))
+        self.assertIsNone(self.cache.get(self.query, ("Henk#1234",)))
+
+    def test_query_cache_does_not_return_rows_after_table_has_been_written_to(self):
+        self.cache.set(self.query, ("Pietje#1234",), self.cache.get_versions(["users"]), [(1,)])
+        self.cache.invalidate(["users"])
+        self.assertIsNone(self.cache.get(self.query, ("Pietje#1234",)))
+        self.assertEqual(self.cache.get_statistics()["invalidations"], 1)
+
+    def test_query_cache_keeps_rows_when_other_table_is_written_to(self):
+        self.cache.set(self.query, ("Pietje#1234",), self.cache.get_versions(["users"]), [(1,)])
+        self.cache.invalidate(["challenges"])
+        self.assertEqual(self.cache.get(self.query, ("Pietje#1234",)), ((1,),))
+
+    def test_query_cache_does_not_serve_rows_read_while_table_was_written_to(self):
+        versions = self.cache.get_versions(["users"])
+        self.cache.invalidate(["users"])
+        self.cache.set(self.query, ("Pietje#1234",), versions, [(1,)])
+        self.assertIsNone(self.cache.get(self.query, ("Pietje#1234",)))
+
+    def test_query_cache_evicts_least_recently_used_result(self):
+        versions = self.cache.get_versions(["users"])
+        self.cache.set(self.query, ("a",), versions, [(1,)])
+        self.cache.set(self.query, ("b",), versions, [(2,)])
+        self.cache.get(self.query, ("a",))
+        self.cache.set(self.query, ("c",), versions, [(3,)])
+        self.assertIsNone(self.cache.get(self.query, ("b",)))
+        self.assertEqual(self.cache.get(self.query, ("a",)), ((1,),))
+        self.assertEqual(self.cache.get_statistics()["evictions"], 1)
+
+    def test_query_cache_does_not_cache_when_disabled(self):
+        cache = QueryCache(max_size=0)
+        cache.set(self.query, ("a",), cache.get_versions(["users"]), [(1,)])
+        self.assertIsNone(cache.get(self.query, ("a",)))
+
+    def test_query_cache_get_statistics_returns_hit_ratio(self):
+        self.cache.set(self.query, ("a",), self.cache.get_versions(["users"]), [(1,)])
+        self.cache.get(self.query, ("a",))
+        self.cache.get(self.query, ("b",))
+        self.cache.get(self.query, ("a",))
+        stats = self.cache.get_statistics()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 1, 1))
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge
+from os3_rll.models.challenge import ChallengeException
+from os3_rll.models.db import Database, DBException
+from os3_rll.models.player import PlayerException
+from os3_rll.models.records import ChallengeRecord, PlayerRecord
+
+
+class TestPlayerRecord(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+
+    def test_player_record_from_row_converts_the_columns(self):
+        record = PlayerRecord.from_row((1, "Henk", 2, "henkie", "Henk#1234", 3, 4, 1, 1577836800, 7))
+        self.assertEqual(record, (1, "Henk", 2, "henkie", "Henk#1234", 3, 4, True, datetime.fromtimestamp(1577836800)))
+        self.assertIsNone(PlayerRecord.from_row((1, "Henk", 2, "henkie", "Henk#1234", 3, 4, 0, None, 7)).timeout)
+
+    def test_player_record_is_immutable_and_has_no_instance_dict(self):
+        record = PlayerRecord.load_many([self.players[0]])[0]
+        with self.assertRaises(AttributeError):
+            record.rank = 3
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_player_record_load_many_returns_records_in_order_of_ids(self):
+        records = PlayerRecord.load_many([self.players[2], self.players[0]])
+        self.assertEqual([(r.gamertag, r.rank, r.challenged) for r in records], [("gamer2", 3, False), ("gamer0", 1, False)])
+
+    def test_player_record_load_many_raises_player_exception_for_unknown_id(self):
+        with self.assertRaises(PlayerException):
+            PlayerRecord.load_many([self.players[0], 42])
+
+    def test_player_record_load_many_uses_the_database_that_is_passed(self):
+        with Database() as db:
+            self.assertEqual(PlayerRecord.load_many([self.players[1]], db=db)[0].id, self.players[1])
+            self.assertFalse(db.closed)
+
+    def test_player_record_load_all_returns_all_players_ordered(self):
+        self.assertEqual([r.id for r in PlayerRecord.load_all()], self.players)
+        self.assertEqual([r.gamertag for r in PlayerRecord.load_all(order_by="id")], ["gamer0", "gamer1", "gamer2"])
+
+    def test_player_record_load_all_raises_db_exception_for_unknown_column(self):
+        with self.assertRaises(DBException):
+            PlayerRecord.load_all(order_by="password")
+
+
+class TestChallengeRecord(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(2)
+        create_challenge(self.players[1], self.players[0])
+
+    def test_challenge_record_load_many_returns_the_challenges(self):
+        record = ChallengeRecord.load_many([1])[0]
+        self.assertEqual((record.id, record.p1, record.p2, record.winner), (1, self.players[1], self.players[0], None))
+        self.assertIsInstance(record.date, datetime)
+
+    def test_challenge_record_load_many_raises_challenge_exception_for_unknown_id(self):
+        with self.assertRaises(ChallengeException):
+            ChallengeRecord.load_many([2])
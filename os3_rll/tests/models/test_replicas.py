@@ -0,0 +1,55 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.instrumentation import command_scope
+from os3_rll.models.replicas import ReplicaRouter, get_current_actor, reset_current_user, set_current_user
+
+
+class TestReplicaRouter(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.monotonic = self.set_up_patch("os3_rll.models.replicas.monotonic", return_value=100.0)
+        self.router = ReplicaRouter(["replica1", "replica2"], read_your_writes_window=5, retry_after=30)
+
+    def test_choose_returns_none_without_replicas(self):
+        self.assertIsNone(ReplicaRouter([]).choose())
+
+    def test_choose_skips_replicas_that_are_down(self):
+        self.router.mark_down("replica1")
+        self.assertEqual([self.router.choose() for _ in range(3)], ["replica2"] * 3)
+
+    def test_choose_uses_replica_again_after_retry_after(self):
+        self.router.mark_down("replica1")
+        self.monotonic.return_value = 131.0
+        self.assertEqual({self.router.choose() for _ in range(2)}, {"replica1", "replica2"})
+
+    def test_choose_returns_none_when_all_replicas_are_down(self):
+        self.router.mark_down("replica1")
+        self.router.mark_down("replica2")
+        self.assertIsNone(self.router.choose())
+
+    def test_choose_returns_none_within_read_your_writes_window(self):
+        self.router.record_write("henk#1234")
+        self.monotonic.return_value = 105.0
+        self.assertIsNone(self.router.choose("henk#1234"))
+        self.assertIsNotNone(self.router.choose("piet#1234"))
+
+    def test_choose_returns_replica_after_read_your_writes_window(self):
+        self.router.record_write("henk#1234")
+        self.monotonic.return_value = 105.1
+        self.assertIsNotNone(self.router.choose("henk#1234"))
+
+    def test_record_write_forgets_expired_writes(self):
+        self.router.record_write("henk#1234")
+        self.monotonic.return_value = 200.0
+        self.router.record_write("piet#1234")
+        self.assertEqual(list(self.router._writes), ["piet#1234"])
+
+
+class TestGetCurrentActor(OS3RLLTestCase):
+    def test_get_current_actor_prefers_the_user(self):
+        token = set_current_user("henk#1234")
+        self.addCleanup(reset_current_user, token)
+        with command_scope("get_ranking"):
+            self.assertEqual(get_current_actor(), "henk#1234")
+
+    def test_get_current_actor_falls_back_to_the_command(self):
+        with command_scope("check_expired_challenges"):
+            self.assertEqual(get_current_actor(), "check_expired_challenges")
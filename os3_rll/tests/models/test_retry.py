@@ -0,0 +1,83 @@
+from unittest.mock import Mock
+
+from pymysql import IntegrityError, OperationalError
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.db import UnitOfWork, close_connection_pool
+from os3_rll.models.retry import get_backoff_delay, retry_on_conflict, retry_statistics
+
+
+class TestRetryOnConflict(OS3RLLTestCase):
+    def setUp(self) -> None:
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.set_up_patch("os3_rll.models.backends.mysql.connect")
+        self.sleep = self.set_up_patch("os3_rll.models.retry.sleep")
+        self.set_up_patch("os3_rll.conf.settings.DB_RETRY_ATTEMPTS", 3)
+        retry_statistics.reset()
+        self.addCleanup(retry_statistics.reset)
+        self.action = Mock(__name__="complete_challenge", return_value=2)
+
+    def test_retry_on_conflict_returns_result_without_retrying(self):
+        self.assertEqual(retry_on_conflict(self.action)(1, 2), 2)
+        self.action.assert_called_once_with(1, 2)
+        self.sleep.assert_not_called()
+
+    def test_retry_on_conflict_retries_deadlocks(self):
+        self.action.side_effect = [OperationalError(1213, "Deadlock found"), 2]
+        self.assertEqual(retry_on_conflict(self.action)(), 2)
+        self.assertEqual(self.action.call_count, 2)
+        self.sleep.assert_called_once()
+
+    def test_retry_on_conflict_retries_lock_wait_timeouts(self):
+        self.action.side_effect = [OperationalError(1205, "Lock wait timeout exceeded"), 2]
+        self.assertEqual(retry_on_conflict(self.action)(), 2)
+
+    def test_retry_on_conflict_gives_up_after_the_maximum_attempts(self):
+        self.action.side_effect = OperationalError(1213, "Deadlock found")
+        with self.assertRaises(OperationalError):
+            retry_on_conflict(self.action)()
+        self.assertEqual(self.action.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_retry_on_conflict_does_not_retry_other_errors(self):
+        self.action.side_effect = IntegrityError(1062, "Duplicate entry")
+        with self.assertRaises(IntegrityError):
+            retry_on_conflict(self.action)()
+        self.action.assert_called_once_with()
+
+    def test_retry_on_conflict_does_not_retry_inside_a_unit_of_work(self):
+        self.action.side_effect = OperationalError(1213, "Deadlock found")
+        with self.assertRaises(OperationalError):
+            with UnitOfWork():
+                retry_on_conflict(self.action)()
+        self.action.assert_called_once_with()
+
+    def test_retry_on_conflict_records_statistics(self):
+        self.action.side_effect = [OperationalError(1213, "Deadlock found"), OperationalError(1205, "Lock wait timeout"), 2]
+        retry_on_conflict(self.action)()
+        self.assertEqual(
+            retry_statistics.as_list(),
+            [{"action": "complete_challenge", "calls": 1, "retries": 2, "exhausted": 0, "errors": {"deadlock": 1, "lock_wait_timeout": 1}}],
+        )
+
+    def test_retry_on_conflict_records_exhausted_retries(self):
+        self.action.side_effect = OperationalError(1213, "Deadlock found")
+        with self.assertRaises(OperationalError):
+            retry_on_conflict(self.action)()
+        self.assertEqual(retry_statistics.as_list()[0]["exhausted"], 1)
+
+
+class TestGetBackoffDelay(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_patch("os3_rll.conf.settings.DB_RETRY_BASE_DELAY", 0.1)
+        self.set_up_patch("os3_rll.conf.settings.DB_RETRY_MAX_DELAY", 0.5)
+        self.uniform = self.set_up_patch("os3_rll.models.retry.uniform")
+
+    def test_get_backoff_delay_doubles_the_upper_bound_every_attempt(self):
+        get_backoff_delay(3)
+        self.uniform.assert_called_once_with(0, 0.4)
+
+    def test_get_backoff_delay_caps_the_upper_bound(self):
+        get_backoff_delay(10)
+        self.uniform.assert_called_once_with(0, 0.5)
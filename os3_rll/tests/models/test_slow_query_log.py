@@ -0,0 +1,43 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.instrumentation import command_scope
+from os3_rll.models.slow_query_log import is_explainable, log_slow_query, redact_parameters, REDACTED
+
+
+class TestRedactParameters(OS3RLLTestCase):
+    def test_redact_parameters_redacts_password_column(self):
+        self.assertEqual(
+            redact_parameters("UPDATE `users` SET `password`=%s WHERE `id`=%s", ("secret", 1)), (REDACTED, 1),
+        )
+
+    def test_redact_parameters_redacts_password_in_middle_of_insert(self):
+        self.assertEqual(
+            redact_parameters("INSERT INTO `users` SET `name`=%s, `rank`=%s, `password` = %s, `timeout`=%s", ("henk", 1, "secret", 0)),
+            ("henk", 1, REDACTED, 0),
+        )
+
+    def test_redact_parameters_leaves_other_parameters_alone(self):
+        self.assertEqual(redact_parameters("SELECT `id` FROM `users` WHERE `gamertag`=%s", ("henk",)), ("henk",))
+
+    def test_redact_parameters_handles_missing_parameters(self):
+        self.assertIsNone(redact_parameters("SELECT 1", None))
+
+
+class TestLogSlowQuery(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.logger = self.set_up_patch("os3_rll.models.slow_query_log.logger")
+
+    def test_log_slow_query_logs_fingerprint_duration_command_and_redacted_parameters(self):
+        with command_scope("complete_challenge"):
+            log_slow_query("UPDATE `users` SET `password`=%s WHERE `id`=%s", ("secret", 1), 1.5)
+        self.logger.warning.assert_called_once_with(
+            "Slow query (1.500s) executed for complete_challenge: UPDATE `users` SET `password`=? WHERE `id`=? "
+            "parameters=('<redacted>', 1)"
+        )
+
+    def test_log_slow_query_logs_explain_rows(self):
+        log_slow_query("SELECT 1", None, 1, explain=[(1, "SIMPLE")])
+        self.assertEqual(self.logger.warning.call_count, 2)
+
+    def test_is_explainable_only_accepts_dml(self):
+        self.assertTrue(is_explainable(" select `id` FROM `users`"))
+        self.assertFalse(is_explainable("ALTER TABLE `users` ADD INDEX (`rank`)"))
@@ -0,0 +1,54 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.db import explain_query
+from os3_rll.models.statements import StatementException, StatementRegistry, get_batch_statement, get_statement, statements
+
+
+class TestStatementRegistry(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.registry = StatementRegistry()
+
+    def test_register_returns_statement(self):
+        statement = self.registry.register("player.test", "SELECT `id` FROM `users` WHERE `id`=%s")
+        self.assertEqual(self.registry.get("player.test"), statement)
+
+    def test_register_allows_registering_the_same_statement_twice(self):
+        self.registry.register("player.test", "SELECT 1")
+        self.registry.register("player.test", "SELECT 1")
+        self.assertEqual(len(self.registry), 1)
+
+    def test_register_raises_statement_exception_on_conflicting_statement(self):
+        self.registry.register("player.test", "SELECT 1")
+        with self.assertRaises(StatementException):
+            self.registry.register("player.test", "SELECT 2")
+
+    def test_get_raises_statement_exception_on_unknown_statement(self):
+        with self.assertRaises(StatementException):
+            get_statement("player.does_not_exist")
+
+
+class TestRegisteredStatements(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+
+    def test_registered_statements_are_valid_on_the_migrated_schema(self):
+        for statement in statements:
+            with self.subTest(statement=statement.name):
+                explain_query(statement.sql, (None,) * statement.sql.count("%s"))
+
+
+class TestGetBatchStatement(OS3RLLTestCase):
+    def test_get_batch_statement_rounds_placeholders_up_to_power_of_two(self):
+        statement, parameters = get_batch_statement("test.batch", "SELECT `id` FROM `users` WHERE `id` IN ({ids})", [1, 2, 3])
+        self.assertEqual(statement.name, "test.batch[4]")
+        self.assertEqual(statement.sql, "SELECT `id` FROM `users` WHERE `id` IN (%s, %s, %s, %s)")
+        self.assertEqual(parameters, (1, 2, 3, 3))
+
+    def test_get_batch_statement_reuses_registered_statement(self):
+        first, _ = get_batch_statement("test.batch", "SELECT `id` FROM `users` WHERE `id` IN ({ids})", [1, 2])
+        second, parameters = get_batch_statement("test.batch", "SELECT `id` FROM `users` WHERE `id` IN ({ids})", [5, 6])
+        self.assertIs(first, second)
+        self.assertEqual(parameters, (5, 6))
+
+    def test_get_batch_statement_raises_statement_exception_without_ids(self):
+        with self.assertRaises(StatementException):
+            get_batch_statement("test.batch", "SELECT `id` FROM `users` WHERE `id` IN ({ids})", [])
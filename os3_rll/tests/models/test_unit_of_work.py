@@ -0,0 +1,48 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.models.db import Database, UnitOfWork, close_connection_pool, get_connection_pool, get_current_unit_of_work
+
+
+class TestUnitOfWork(OS3RLLTestCase):
+    def setUp(self) -> None:
+        close_connection_pool()
+        self.addCleanup(close_connection_pool)
+        self.connect = self.set_up_patch("os3_rll.models.backends.mysql.connect")
+
+    def test_unit_of_work_is_active_inside_with_block(self):
+        with UnitOfWork() as uow:
+            self.assertIs(get_current_unit_of_work(), uow)
+        self.assertIsNone(get_current_unit_of_work())
+
+    def test_database_instances_share_the_unit_of_work_connection(self):
+        with UnitOfWork():
+            with Database() as db1, Database() as db2:
+                self.assertIs(db1.db, db2.db)
+        self.connect.assert_called_once()
+
+    def test_database_commit_is_deferred_to_the_unit_of_work(self):
+        with UnitOfWork():
+            with Database() as db:
+                db.commit()
+                db.commit()
+            self.connect.return_value.commit.assert_not_called()
+        self.connect.return_value.commit.assert_called_once_with()
+
+    def test_unit_of_work_rolls_back_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with UnitOfWork():
+                raise RuntimeError
+        self.connect.return_value.commit.assert_not_called()
+        self.connect.return_value.rollback.assert_called()
+
+    def test_unit_of_work_returns_connection_to_pool(self):
+        with UnitOfWork():
+            pass
+        self.assertEqual(get_connection_pool().idle, 1)
+
+    def test_nested_unit_of_work_joins_outer_one(self):
+        with UnitOfWork() as outer:
+            with UnitOfWork() as inner:
+                self.assertTrue(inner.joined)
+                self.assertIs(get_current_unit_of_work(), outer)
+            self.connect.return_value.commit.assert_not_called()
+        self.connect.return_value.commit.assert_called_once_with()
@@ -0,0 +1,37 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import complete_challenge, create_challenge
+from os3_rll.models.player import PlayerException
+from os3_rll.operations.challenge import get_latest_challenge_record_from_player_id
+
+
+class TestGetLatestChallengeRecordFromPlayerId(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+        create_challenge(self.players[1], self.players[0])
+
+    def test_get_latest_challenge_record_from_player_id_returns_the_open_challenge(self):
+        record = get_latest_challenge_record_from_player_id(self.players[0])
+        self.assertEqual((record.id, record.p1, record.p2), (1, self.players[1], self.players[0]))
+
+    def test_get_latest_challenge_record_from_player_id_raises_player_exception_if_player_is_not_challenged(self):
+        complete_challenge(self.players[1], self.players[0], "0-1")
+        with self.assertRaises(PlayerException) as e:
+            get_latest_challenge_record_from_player_id(self.players[0])
+        self.assertEqual(e.exception.args[0], "Player gamer0 is currently not in an active challenge")
+
+    def test_get_latest_challenge_record_from_player_id_returns_the_completed_challenge_if_should_be_completed_passed(self):
+        complete_challenge(self.players[1], self.players[0], "0-1")
+        record = get_latest_challenge_record_from_player_id(self.players[0], should_be_completed=True)
+        self.assertEqual(record.winner, self.players[0])
+
+    def test_get_latest_challenge_record_from_player_id_returns_the_latest_of_many_completed_challenges(self):
+        complete_challenge(self.players[1], self.players[0], "0-1")
+        create_challenge(self.players[2], self.players[0])
+        complete_challenge(self.players[2], self.players[0], "1-0")
+        record = get_latest_challenge_record_from_player_id(self.players[0], should_be_completed=True)
+        self.assertEqual((record.id, record.p1, record.p2, record.winner), (2, self.players[2], self.players[0], self.players[2]))
+
+    def test_get_latest_challenge_record_from_player_id_raises_player_exception_if_no_challenge_is_found(self):
+        with self.assertRaises(PlayerException):
+            get_latest_challenge_record_from_player_id(self.players[0], should_be_completed=True)
@@ -15,20 +15,26 @@ class TestGetAllPlayerIdsOrdered(OS3RLLTestCase):
         get_all_player_ids_ordered()
         calls = [
             call(),
-            call().execute_prepared_statement("SELECT `id` FROM `users` ORDER BY %s", ("rank",)),
+            call().execute_statement("player.ids_ordered_by_rank"),
             call().fetchall(),
         ]
         self.db.assert_has_calls(calls)
 
     def test_get_all_players_ids_ordered_makes_correct_database_models_calls_when_order_by_passed(self):
-        get_all_player_ids_ordered(order_by="banaan")
+        get_all_player_ids_ordered(order_by="wins")
         calls = [
             call(),
-            call().execute_prepared_statement("SELECT `id` FROM `users` ORDER BY %s", ("banaan",)),
+            call().execute_statement("player.ids_ordered_by_wins"),
             call().fetchall(),
         ]
         self.db.assert_has_calls(calls)
 
+    def test_get_all_player_ids_ordered_raises_db_exception_on_unknown_column(self):
+        with self.assertRaises(DBException) as e:
+            get_all_player_ids_ordered(order_by="banaan")
+        self.assertEqual(e.exception.args[0], "Unable to order players by banaan")
+        self.db.assert_not_called()
+
     def test_get_all_player_ids_ordered_raises_db_exception_when_rowcount_is_zero(self):
         self.db.return_value.__enter__.return_value.rowcount = 0
         with self.assertRaises(DBException) as e:
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge, complete_challenge
+from os3_rll.actions.challenge_tasks.archive_completed_challenges import archive_completed_challenges
+from os3_rll.models.db import Database
+from os3_rll.operations.player import get_average_goals_per_challenge, get_average_goals_per_challenge_of_all_players
+
+
+class TestGetAverageGoalsPerChallengeOfAllPlayers(OS3RLLTestCase):
+    """
+    Compares the grouped averages with the ones of get_average_goals_per_challenge against the in-memory backend
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(4)
+        for challenger, defender, score in ((2, 1, "3-0 1-2 2-0"), (1, 2, "2-1"), (2, 1, "0-1")):
+            create_challenge(self.players[challenger], self.players[defender])
+            complete_challenge(self.players[challenger], self.players[defender], score)
+        # An open challenge doesn't count
+        create_challenge(self.players[1], self.players[0])
+
+    def test_get_average_goals_per_challenge_of_all_players_matches_the_averages_per_player(self):
+        averages = get_average_goals_per_challenge_of_all_players()
+        self.assertEqual(averages, {player: get_average_goals_per_challenge(player) for player in self.players[1:3]})
+
+    def test_get_average_goals_per_challenge_of_all_players_leaves_out_players_without_completed_challenges(self):
+        averages = get_average_goals_per_challenge_of_all_players()
+        self.assertNotIn(self.players[0], averages)
+        self.assertNotIn(self.players[3], averages)
+
+    def test_get_average_goals_per_challenge_of_all_players_includes_archived_challenges(self):
+        averages = get_average_goals_per_challenge_of_all_players()
+        with Database() as db:
+            db.execute_prepared_statement(
+                "UPDATE `challenges` SET `date`=%s WHERE `winner` IS NOT NULL", (datetime.now() - timedelta(days=100),)
+            )
+            db.commit()
+        self.assertEqual(archive_completed_challenges(), 3)
+        self.assertEqual(get_average_goals_per_challenge_of_all_players(), averages)
+
+    def test_get_average_goals_per_challenge_of_all_players_runs_a_single_query(self):
+        statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            statements.append(query)
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+        get_average_goals_per_challenge_of_all_players()
+        self.assertEqual(len(statements), 1)
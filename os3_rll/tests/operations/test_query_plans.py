@@ -0,0 +1,86 @@
+from os3_rll.tests import OS3RLLTestCase
+from os3_rll.actions.challenge import create_challenge, complete_challenge
+from os3_rll.actions.challenge_tasks.check_uncompleted_challenges import check_uncompleted_challenges
+from os3_rll.actions.player import get_player_ranking
+from os3_rll.models.challenge import Challenge
+from os3_rll.models.db import Database, explain_query
+from os3_rll.models.player import Player
+from os3_rll.models.slow_query_log import is_explainable
+from os3_rll.operations.challenge import get_latest_challenge_from_player_id, get_player_objects_from_challenge_info
+from os3_rll.operations.player import get_all_player_ids_ordered, get_average_goals_per_challenge
+from os3_rll.operations.utils import get_max_rank
+
+
+class TestQueryPlans(OS3RLLTestCase):
+    """
+    Runs the lookups against the in-memory backend and checks the query plan of every statement they execute
+    """
+
+    def setUp(self) -> None:
+        self.set_up_memory_database()
+        self.players = self.add_memory_players(3)
+        create_challenge(self.players[1], self.players[0])
+        complete_challenge(self.players[1], self.players[0], "1-0")
+        create_challenge(self.players[2], self.players[1])
+        self.statements = []
+        record = Database._record
+
+        def capture(db, query, parameters, duration, rows):
+            self.statements.append((query, parameters))
+            record(db, query, parameters, duration, rows)
+
+        self.set_up_patch("os3_rll.models.db.Database._record", capture)
+
+    def assert_statements_use_an_index(self):
+        self.assertTrue(self.statements)
+        for query, parameters in self.statements:
+            if not is_explainable(query):
+                continue
+            derived_tables = set()
+            for row in explain_query(query, parameters):
+                detail = row[-1]
+                if detail.startswith(("CO-ROUTINE", "MATERIALIZE")):
+                    derived_tables.add(detail.split()[1])
+                # Reading the rows of a subquery is fine, the subquery itself is checked separately
+                if detail.startswith("SCAN") and detail.split()[1] not in derived_tables:
+                    self.assertIn("INDEX", detail, "{} does not use an index: {}".format(query, detail))
+
+    def test_get_player_objects_from_challenge_info_uses_an_index(self):
+        get_player_objects_from_challenge_info(self.players[2])
+        get_player_objects_from_challenge_info(self.players[1], should_be_completed=True)
+        self.assert_statements_use_an_index()
+
+    def test_get_latest_challenge_from_player_id_uses_an_index(self):
+        get_latest_challenge_from_player_id(self.players[2])
+        get_latest_challenge_from_player_id(self.players[0], should_be_completed=True)
+        self.assert_statements_use_an_index()
+
+    def test_get_latest_challenge_from_player_uses_an_index(self):
+        Challenge.get_latest_challenge_from_player(self.players[2], self.players[1])
+        Challenge.get_latest_challenge_from_player(self.players[1], self.players[0], should_be_completed=True)
+        self.assert_statements_use_an_index()
+
+    def test_get_all_player_ids_ordered_uses_an_index(self):
+        get_all_player_ids_ordered()
+        self.assert_statements_use_an_index()
+
+    def test_get_average_goals_per_challenge_uses_an_index(self):
+        get_average_goals_per_challenge(self.players[1])
+        self.assert_statements_use_an_index()
+
+    def test_get_max_rank_uses_an_index(self):
+        get_max_rank()
+        self.assert_statements_use_an_index()
+
+    def test_get_player_id_by_username_uses_an_index(self):
+        Player.get_player_id_by_username("gamer1")
+        Player.get_player_id_by_username("player1#0001", discord_name=True)
+        self.assert_statements_use_an_index()
+
+    def test_get_player_ranking_uses_an_index(self):
+        get_player_ranking()
+        self.assert_statements_use_an_index()
+
+    def test_check_uncompleted_challenges_uses_an_index(self):
+        check_uncompleted_challenges()
+        self.assert_statements_use_an_index()
@@ -36,3 +36,54 @@ class TestRLLMain(OS3RLLTestCase):
         with self.assertRaises(SystemExit):
             main(["--version"])
         self.client.assert_not_called()
+
+
+class TestRLLMainMigrate(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.client = self.set_up_patch("os3_rll.rocket_league_ladder.discord_client")
+        self.set_up_patch("os3_rll.rocket_league_ladder.setup_console_logging")
+        self.apply_migrations = self.set_up_patch("os3_rll.rocket_league_ladder.apply_migrations")
+        self.verify_migrations = self.set_up_patch("os3_rll.rocket_league_ladder.verify_migrations")
+        self.verify_migrations.return_value = []
+
+    def test_main_applies_migrations(self):
+        with self.assertRaises(SystemExit) as e:
+            main(["migrate", "--target", "1"])
+        self.apply_migrations.assert_called_once_with(target=1)
+        self.assertEqual(e.exception.code, 0)
+
+    def test_main_does_not_call_discord_client_when_migrating(self):
+        with self.assertRaises(SystemExit):
+            main(["migrate"])
+        self.client.assert_not_called()
+
+    def test_main_verifies_migrations_without_applying_them(self):
+        with self.assertRaises(SystemExit) as e:
+            main(["migrate", "--verify"])
+        self.apply_migrations.assert_not_called()
+        self.assertEqual(e.exception.code, 0)
+
+    def test_main_exits_1_when_verify_finds_problems(self):
+        self.verify_migrations.return_value = ["Migration 0002_foo has not been applied"]
+        with self.assertRaises(SystemExit) as e:
+            main(["migrate", "--verify"])
+        self.assertEqual(e.exception.code, 1)
+
+
+class TestRLLMainArchive(OS3RLLTestCase):
+    def setUp(self) -> None:
+        self.client = self.set_up_patch("os3_rll.rocket_league_ladder.discord_client")
+        self.set_up_patch("os3_rll.rocket_league_ladder.setup_console_logging")
+        self.archive = self.set_up_patch("os3_rll.rocket_league_ladder.archive_completed_challenges")
+
+    def test_main_archives_completed_challenges(self):
+        with self.assertRaises(SystemExit) as e:
+            main(["archive", "--days", "30"])
+        self.archive.assert_called_once_with(days=30)
+        self.assertEqual(e.exception.code, 0)
+        self.client.assert_not_called()
+
+    def test_main_archives_with_default_horizon(self):
+        with self.assertRaises(SystemExit):
+            main(["archive"])
+        self.archive.assert_called_once_with(days=None)
@@ -20,3 +20,20 @@ class TestRLLParseArgs(OS3RLLTestCase):
         args = parse_args(["--version", "--verbose"])
         self.assertTrue(args.verbose)
         self.assertTrue(args.version)
+
+    def test_parse_args_runs_the_bot_without_command(self):
+        args = parse_args([])
+        self.assertIsNone(args.command)
+
+    def test_parse_args_sets_command_to_migrate_when_passed(self):
+        args = parse_args(["migrate"])
+        self.assertEqual(args.command, "migrate")
+        self.assertFalse(args.verify)
+        self.assertFalse(args.list)
+        self.assertIsNone(args.target)
+
+    def test_parse_args_parses_the_migrate_options(self):
+        args = parse_args(["--verbose", "migrate", "--verify", "--target", "2"])
+        self.assertTrue(args.verbose)
+        self.assertTrue(args.verify)
+        self.assertEqual(args.target, 2)
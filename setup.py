@@ -13,6 +13,8 @@ setup(
     url="https://github.com/Erik-Lamers1/OS3-RRL-Python",
     packages=find_packages(exclude=["tests", "tests.*", "os3_rll.tests", "os3_rll.tests.*"]),
     author="Erik Lamers, Vincent Breider, Vincent van der Eijk",
+    # contextvars and contextlib.nullcontext
+    python_requires=">=3.7",
     install_requires=["discord.py", "unipath", "colorama", "six", "PyMySQL", "tabulate"],
     entry_points={"console_scripts": ["os3-rocket-league-ladder = os3_rll.rocket_league_ladder:main",],},
 )